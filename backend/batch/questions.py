@@ -0,0 +1,43 @@
+import csv
+import json
+import os
+import sys
+from typing import Dict, Iterator, Optional, TextIO
+
+
+def _open(path: str) -> TextIO:
+    if path == "-":
+        return sys.stdin
+    return open(path, encoding="utf-8", newline="")
+
+
+def _question(number: int, record: Dict, source: str) -> Dict[str, str]:
+    question = (record.get("question") or "").strip()
+    if not question:
+        raise ValueError(f"{source}: record {number} has no question")
+    return {"id": str(record.get("id") or number), "question": question}
+
+
+def read_questions(path: str, input_format: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Yields ``{"id", "question"}`` records from a JSONL file (one object with a
+    ``question`` and an optional ``id`` per line, or a bare JSON string) or a
+    CSV file with a ``question`` and an optional ``id`` column. The format is
+    taken from the file extension unless given; ``-`` reads JSONL from stdin.
+    """
+    if input_format is None:
+        input_format = "csv" if os.path.splitext(path)[1].lower() == ".csv" else "jsonl"
+    with _open(path) as file:
+        if input_format == "csv":
+            for number, record in enumerate(csv.DictReader(file), start=1):
+                yield _question(number, record, path)
+            return
+        number = 0
+        for line in file:
+            if not line.strip():
+                continue
+            number += 1
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"question": record}
+            yield _question(number, record, path)
@@ -0,0 +1,182 @@
+"""
+Runs many questions against one database: the schema is resolved once and
+shared by every question, questions run concurrently on the async graph, and
+each result is written as a JSONL line as soon as it finishes.
+
+    python -m backend.batch.runner questions.jsonl --output results.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, TextIO
+
+from langchain_core.messages import HumanMessage
+
+from backend.batch.questions import read_questions
+from backend.config import LLM_REQUESTS_PER_SECOND
+from backend.metrics.instrument import timed_nodes
+
+# Seconds per node for the request running in the current task
+_stage_timings: ContextVar[Dict[str, float]] = ContextVar("stage_timings")
+
+RESOLVED_SCHEMA_FIELDS = (
+    "schema_fingerprint",
+    "db_schema",
+    "database_schema",
+    "schema_prompt",
+)
+
+
+def _record_stage(name: str, elapsed: float) -> None:
+    timings = _stage_timings.get(None)
+    if timings is not None:
+        # Nodes retried by the SQL repair loop add up
+        timings[name] = timings.get(name, 0.0) + elapsed
+
+
+async def resolve_schema(db_config: Dict[str, str]) -> Dict[str, any]:
+    """
+    Runs the schema branch of the graph once (connection check, schema cache,
+    introspection and formatting) and returns the state fields that let every
+    question of the batch skip it.
+    """
+    from backend.graph.nodes.db_config_checker import adb_config_checker
+    from backend.graph.nodes.fetch_db_schema import afetch_db_schema_details
+    from backend.graph.nodes.format_db_schema import aformat_db_schema
+    from backend.graph.nodes.schema_cache_lookup import aschema_cache_lookup
+
+    state = {"db_config": db_config}
+    update = await adb_config_checker(state)
+    if update.get("is_error"):
+        raise ConnectionError(update.get("error_explanation"))
+    state.update(await aschema_cache_lookup(state))
+    if not state["schema_cache_hit"]:
+        state.update(await afetch_db_schema_details(state))
+        state.update(await aformat_db_schema(state))
+    return {field: state.get(field) for field in RESOLVED_SCHEMA_FIELDS}
+
+
+def result_record(question: Dict[str, str], result: Dict[str, any]) -> Dict:
+    data = result.get("data")
+    error = None
+    if result.get("is_error") in (True, "True"):
+        error = result.get("error_explanation") or "unknown error"
+    return {
+        **question,
+        "sql": result.get("sql"),
+        "rows": data.to_dicts() if data is not None else None,
+        "row_count": len(data) if data is not None else None,
+        "is_truncated": result.get("is_truncated"),
+        "explanation": result.get("explanation"),
+        "error": error,
+        "sql_cache_hit": result.get("sql_cache_hit"),
+        "result_cache_hit": result.get("result_cache_hit"),
+    }
+
+
+async def run_batch(
+    questions: List[Dict[str, str]],
+    db_config: Dict[str, str],
+    output: TextIO,
+    concurrency: int,
+) -> Dict[str, int]:
+    """
+    Answers ``questions`` with at most ``concurrency`` in flight and writes one
+    JSON line per question to ``output`` in completion order.
+    """
+    from backend.db.async_pool import async_connection_pools
+    from backend.graph.graph import ASYNC_NODES, build_graph
+
+    graph = build_graph(timed_nodes(ASYNC_NODES, _record_stage))
+    semaphore = asyncio.Semaphore(concurrency)
+    summary = {"questions": len(questions), "answered": 0, "failed": 0}
+
+    try:
+        schema = await resolve_schema(db_config)
+
+        async def run_one(question: Dict[str, str]) -> None:
+            async with semaphore:
+                timings = {}
+                _stage_timings.set(timings)
+                started = time.perf_counter()
+                try:
+                    result = await graph.ainvoke(
+                        {
+                            "messages": [HumanMessage(question["question"])],
+                            "db_config": db_config,
+                            **schema,
+                        }
+                    )
+                    record = result_record(question, result)
+                except Exception as e:
+                    record = {**question, "error": f"{type(e).__name__}: {e}"}
+                record["timings"] = {
+                    "total": round(time.perf_counter() - started, 4),
+                    **{name: round(value, 4) for name, value in timings.items()},
+                }
+            summary["failed" if record.get("error") else "answered"] += 1
+            # default=str covers dates, decimals and UUIDs in the rows
+            output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+
+        await asyncio.gather(*(run_one(question) for question in questions))
+    finally:
+        await async_connection_pools.close_all()
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="JSONL or CSV file of questions, - for stdin")
+    parser.add_argument("--format", choices=["jsonl", "csv"], dest="input_format")
+    parser.add_argument("--output", default="-", help="JSONL results, - for stdout")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--llm-rps",
+        type=float,
+        default=LLM_REQUESTS_PER_SECOND,
+        help="LLM calls per second across all questions; 0 is unlimited",
+    )
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default="6432")
+    parser.add_argument("--database", default="online_store")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="password")
+    args = parser.parse_args(argv)
+
+    from backend.graph.chains.llm import set_rate_limit
+
+    set_rate_limit(args.llm_rps)
+    questions = list(read_questions(args.input, args.input_format))
+    db_config = {
+        "host": args.host,
+        "port": args.port,
+        "database": args.database,
+        "username": args.username,
+        "password": args.password,
+    }
+    output = (
+        sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    )
+    try:
+        summary = asyncio.run(
+            run_batch(questions, db_config, output, max(args.concurrency, 1))
+        )
+    except ConnectionError as e:
+        sys.exit(f"Cannot use the database: {e}")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(
+        f"{summary['answered']} of {summary['questions']} questions answered, "
+        f"{summary['failed']} failed",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
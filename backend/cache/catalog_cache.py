@@ -0,0 +1,44 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+from backend.config import SCHEMA_CACHE_MAX_ENTRIES
+from backend.db.introspection import DatabaseCatalog
+
+
+class CatalogSnapshot(NamedTuple):
+    signatures: Dict[str, str]
+    catalog: DatabaseCatalog
+
+
+class CatalogCache:
+    """
+    Last introspected catalog of each database role with the table signatures it
+    was read at, so the next refresh only re-reads the tables that changed.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CatalogSnapshot] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CatalogSnapshot]:
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                self._entries.move_to_end(key)
+            return snapshot
+
+    def set(self, key: str, snapshot: CatalogSnapshot) -> None:
+        with self._lock:
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+catalog_cache = CatalogCache(SCHEMA_CACHE_MAX_ENTRIES)
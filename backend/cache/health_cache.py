@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from backend.cache.lru_cache import LruCache
+from backend.config import (
+    DB_HEALTH_ERROR_TTL,
+    DB_HEALTH_TTL,
+    ERROR_EXPLANATION_CACHE_MAX_ENTRIES,
+)
+from backend.db.pool import pool_key
+
+
+class HealthCache:
+    """
+    Outcome of the last connection check per database configuration. Healthy
+    results are reused for ``ttl`` seconds and failures for ``error_ttl``
+    seconds, so a misconfigured client does not reconnect on every question.
+    """
+
+    def __init__(self, ttl: float, error_ttl: float):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self._entries: Dict[Tuple, Tuple[Dict[str, Any], float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db_config: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        key = pool_key(db_config)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            result, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            return result
+
+    def set(self, db_config: Dict[str, str], result: Dict[str, Any]) -> None:
+        ttl = self.error_ttl if result.get("is_error") else self.ttl
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for key, (_, expires_at) in list(self._entries.items()):
+                if now >= expires_at:
+                    del self._entries[key]
+            self._entries[pool_key(db_config)] = (result, now + ttl)
+
+    def invalidate(self, db_config: Dict[str, str]) -> None:
+        with self._lock:
+            self._entries.pop(pool_key(db_config), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+db_health_cache = HealthCache(DB_HEALTH_TTL, DB_HEALTH_ERROR_TTL)
+
+# LLM explanations of unrecognised connection errors keyed by error signature
+error_explanation_cache = LruCache(ERROR_EXPLANATION_CACHE_MAX_ENTRIES)
@@ -0,0 +1,108 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from backend.config import RESULT_CACHE_MAX_BYTES, RESULT_CACHE_TTL
+from backend.db.result import ColumnarResult
+
+# Quoted literals and identifiers are kept verbatim, whitespace elsewhere is collapsed
+_SQL_TOKENS = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|(\s+)")
+
+
+def normalize_sql(sql: str) -> str:
+    normalized = _SQL_TOKENS.sub(
+        lambda match: match.group(1) if match.group(1) else " ", sql
+    )
+    return normalized.strip().rstrip(";").rstrip()
+
+
+class CachedResult(NamedTuple):
+    data: ColumnarResult
+    is_truncated: bool
+    total_row_count: Optional[int]
+    size: int
+    created_at: float
+
+
+class ResultCache:
+    """
+    Query results keyed by database role, schema fingerprint and normalized SQL.
+    Entries expire after ``ttl`` seconds; the least recently used entries are
+    dropped once the summed result size exceeds ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[Tuple[str, str, str], CachedResult] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+
+    def get(self, role: str, fingerprint: str, sql: str) -> Optional[CachedResult]:
+        key = (role, fingerprint, normalize_sql(sql))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry.created_at > self.ttl:
+                self._pop(key)
+                self._expired += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def set(
+        self,
+        role: str,
+        fingerprint: str,
+        sql: str,
+        data: ColumnarResult,
+        is_truncated: bool,
+        total_row_count: Optional[int],
+    ) -> None:
+        size = data.nbytes
+        if size > self.max_bytes:
+            return
+        key = (role, fingerprint, normalize_sql(sql))
+        entry = CachedResult(data, is_truncated, total_row_count, size, time.time())
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "expired": self._expired,
+                "evictions": self._evictions,
+            }
+
+    def _pop(self, key: Tuple[str, str, str]) -> None:
+        self._size -= self._entries.pop(key).size
+
+
+result_cache = ResultCache(RESULT_CACHE_MAX_BYTES, RESULT_CACHE_TTL)
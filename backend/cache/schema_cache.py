@@ -0,0 +1,68 @@
+import hashlib
+import os
+import tempfile
+from typing import Optional
+
+from backend.cache.lru_cache import LruCache
+from backend.config import (
+    SCHEMA_CACHE_DIR,
+    SCHEMA_CACHE_MAX_ENTRIES,
+    SCHEMA_DESCRIPTION_CACHE_MAX_ENTRIES,
+)
+
+
+class SchemaCache(LruCache):
+    """
+    Formatted database schemas keyed by database role and catalog fingerprint.
+    Entries live in an in-memory LRU and, if a directory is given, are also
+    written to disk so they survive process restarts.
+    """
+
+    def __init__(self, max_entries: int, cache_dir: Optional[str] = None):
+        super().__init__(max_entries)
+        self.cache_dir = cache_dir
+
+    def get(self, key: str) -> Optional[str]:
+        schema = super().get(key)
+        if schema is not None:
+            return schema
+        schema = self._read_from_disk(key)
+        if schema is not None:
+            super().set(key, schema)
+        return schema
+
+    def set(self, key: str, schema: str) -> None:
+        super().set(key, schema)
+        self._write_to_disk(key, schema)
+
+    def _path(self, key: str) -> str:
+        file_name = hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json"
+        return os.path.join(self.cache_dir, file_name)
+
+    def _read_from_disk(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def _write_to_disk(self, key: str, schema: str) -> None:
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to a temp file first so concurrent readers never see partial JSON
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(schema)
+        os.replace(tmp_path, self._path(key))
+
+
+schema_cache = SchemaCache(SCHEMA_CACHE_MAX_ENTRIES, SCHEMA_CACHE_DIR)
+
+# LLM generated table descriptions keyed by a hash of the table structure, so
+# databases sharing tables (e.g. staging and production) also share descriptions
+schema_description_cache = SchemaCache(
+    SCHEMA_DESCRIPTION_CACHE_MAX_ENTRIES, SCHEMA_CACHE_DIR
+)
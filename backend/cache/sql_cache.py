@@ -0,0 +1,171 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from backend.config import (
+    SQL_CACHE_MAX_ENTRIES,
+    SQL_CACHE_SQLITE_PATH,
+    SQL_CACHE_TTL,
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.;]+$")
+
+
+def normalize_question(question: str) -> str:
+    question = unicodedata.normalize("NFKC", question).casefold()
+    question = _WHITESPACE.sub(" ", question).strip()
+    return _TRAILING_PUNCTUATION.sub("", question)
+
+
+class SqlCache:
+    """
+    Generated SQL keyed by database role, schema fingerprint and normalized
+    question.
+    Entries expire after ``ttl`` seconds and the least recently used entry is
+    dropped beyond ``max_entries``. With ``sqlite_path`` set, entries are also
+    kept in a SQLite file so they survive process restarts.
+
+    Because the fingerprint is part of the key, a schema change never hits old
+    entries; they are purged the first time the new fingerprint is seen.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, sqlite_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Tuple[str, str, str], Tuple[str, float]] = (
+            OrderedDict()
+        )
+        self._fingerprints: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._db = None
+        if sqlite_path:
+            directory = os.path.dirname(sqlite_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sql_cache ("
+                "role TEXT, fingerprint TEXT, question TEXT, sql TEXT, "
+                "created_at REAL, PRIMARY KEY (role, fingerprint, question))"
+            )
+            self._db.commit()
+
+    def get(self, role: str, fingerprint: str, question: str) -> Optional[str]:
+        key = (role, fingerprint, normalize_question(question))
+        now = time.time()
+        with self._lock:
+            self._check_fingerprint(role, fingerprint)
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                entry = self._read(key)
+                if entry is not None:
+                    self._remember(key, entry)
+            if entry is not None and now - entry[1] > self.ttl:
+                self._forget(key)
+                self._expired += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def set(self, role: str, fingerprint: str, question: str, sql: str) -> None:
+        key = (role, fingerprint, normalize_question(question))
+        entry = (sql, time.time())
+        with self._lock:
+            self._check_fingerprint(role, fingerprint)
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sql_cache VALUES (?, ?, ?, ?, ?)",
+                    key + entry,
+                )
+                self._db.commit()
+
+    def forget(self, role: str, fingerprint: str, question: str) -> None:
+        with self._lock:
+            self._forget((role, fingerprint, normalize_question(question)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._fingerprints.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM sql_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "expired": self._expired,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+    def _check_fingerprint(self, role: str, fingerprint: str) -> None:
+        previous = self._fingerprints.get(role)
+        self._fingerprints[role] = fingerprint
+        if previous is None or previous == fingerprint:
+            return
+        # The schema changed, so SQL generated for the old one may no longer run
+        for key in [key for key in self._entries if key[0] == role]:
+            if key[1] != fingerprint:
+                del self._entries[key]
+                self._invalidations += 1
+        if self._db is not None:
+            self._db.execute(
+                "DELETE FROM sql_cache WHERE role = ? AND fingerprint != ?",
+                (role, fingerprint),
+            )
+            self._db.commit()
+
+    def _remember(self, key: Tuple[str, str, str], entry: Tuple[str, float]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._evictions += 1
+            if self._db is not None:
+                self._delete(evicted)
+
+    def _forget(self, key: Tuple[str, str, str]) -> None:
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._delete(key)
+
+    def _read(self, key: Tuple[str, str, str]) -> Optional[Tuple[str, float]]:
+        row = self._db.execute(
+            "SELECT sql, created_at FROM sql_cache "
+            "WHERE role = ? AND fingerprint = ? AND question = ?",
+            key,
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def _delete(self, key: Tuple[str, str, str]) -> None:
+        self._db.execute(
+            "DELETE FROM sql_cache "
+            "WHERE role = ? AND fingerprint = ? AND question = ?",
+            key,
+        )
+        self._db.commit()
+
+
+sql_cache = SqlCache(SQL_CACHE_MAX_ENTRIES, SQL_CACHE_TTL, SQL_CACHE_SQLITE_PATH)
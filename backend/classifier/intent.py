@@ -0,0 +1,169 @@
+import json
+import math
+import os
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+from backend.config import INPUT_CLASSIFIER_MODEL_PATH, INPUT_CLASSIFIER_THRESHOLD
+
+_WORDS = re.compile(r"[a-z0-9_@.]+")
+# Politeness prefixes hide the leading verb that decides the intent
+_PREFIX = re.compile(
+    r"^(?:(?:please|kindly|can you|could you|would you|will you|"
+    r"i want to|i would like to|i'd like to|let's|lets)\s+)+"
+)
+_SQL_DML = re.compile(
+    r"\b(?:delete\s+from|insert\s+into|update\s+\w+\s+set|drop\s+(?:table|database|schema|view|index)"
+    r"|truncate\s+(?:table\s+)?\w+|alter\s+table|create\s+(?:table|database|schema|view|index)"
+    r"|grant\s+\w+|revoke\s+\w+)\b"
+)
+_DML_VERBS = (
+    "delete", "remove", "drop", "truncate", "insert", "update", "modify", "alter",
+    "create", "rename", "grant", "revoke", "erase", "wipe", "purge", "change",
+    "set", "add", "replace", "cancel", "reset", "deactivate", "archive", "edit",
+)  # fmt: skip
+# What makes a leading verb act on stored data: a determiner ("delete all
+# orders", "set the price ..."), a record id ("update product 5") or a table
+# noun. Without one, "add up sales" or "change in revenue" is left to the model.
+_DML_OBJECT = re.compile(
+    r"^(?:(?:the|all|every|each|this|these|those|a|an|any|some|my|our|their)\b"
+    r"|[a-z_]+ #?\d+\b"
+    r"|(?:[a-z_]+ )?(?:tables?|rows?|records?|columns?|entry|entries)\b)"
+)
+_DML_WORDS = re.compile(
+    r"\b(?:delet|remov|drop|truncat|insert|updat|modif|alter|creat|renam|grant|revok|eras|wip"
+    r"|purg|chang|set|add|replac|cancel|reset|deactivat|archiv|edit|assign|mark|restock|clear"
+    r"|rid|doubl|tripl|halv|increas|decreas|rais|reduc|deduct|zero\w* out)\w*"
+)
+_SELECT_START = re.compile(
+    r"^(?:what|which|who|whom|whose|when|where|why|how|is there|are there|was there|"
+    r"were there|do|does|did|list|show|display|find|get (?:me|us|the|all|a list|list)|give me|fetch|count|compare|"
+    r"top|average|avg|total|sum|number of|percentage|distribution|median|report)\b"
+)
+
+
+class IntentDecision(NamedTuple):
+    is_error: bool
+    error_explanation: Optional[str]
+    source: str
+
+
+def _strip_prefix(question: str) -> str:
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return _PREFIX.sub("", question)
+
+
+def features(question: str) -> List[str]:
+    text = _strip_prefix(question)
+    words = _WORDS.findall(text)
+    if not words:
+        return []
+    return words + ["^" + words[0]]
+
+
+class NaiveBayesModel:
+    """Multinomial naive Bayes over ``features``, trained by ``backend.classifier.train``."""
+
+    def __init__(self, model: Dict):
+        self.labels: List[str] = model["labels"]
+        self.priors: Dict[str, float] = model["priors"]
+        self.likelihoods: Dict[str, Dict[str, float]] = model["likelihoods"]
+        self.unknown: Dict[str, float] = model["unknown"]
+        self.vocabulary = set().union(*self.likelihoods.values())
+
+    def predict(self, question: str) -> Dict[str, float]:
+        tokens = [token for token in features(question) if token in self.vocabulary]
+        scores = {
+            label: self.priors[label]
+            + sum(
+                self.likelihoods[label].get(token, self.unknown[label])
+                for token in tokens
+            )
+            for label in self.labels
+        }
+        top = max(scores.values())
+        total = sum(math.exp(score - top) for score in scores.values())
+        return {label: math.exp(score - top) / total for label, score in scores.items()}
+
+    @classmethod
+    def load(cls, path: str) -> Optional["NaiveBayesModel"]:
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as file:
+            return cls(json.load(file))
+
+
+def _dml_explanation(request: str) -> str:
+    return (
+        f"The question {request}, which is a data modification (DML) operation. "
+        "Only data selection queries are supported."
+    )
+
+
+class IntentClassifier:
+    """
+    Decides locally whether a question is a data selection or a data
+    modification request. Clear cases are settled by patterns, then by the
+    trained model when its confidence reaches ``threshold``; anything else
+    returns ``None`` so the caller can escalate to the LLM validator.
+    """
+
+    def __init__(self, model: Optional[NaiveBayesModel], threshold: float):
+        self.model = model
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._counts = {"accepted": 0, "rejected": 0, "escalated": 0}
+
+    def classify(self, question: str) -> Optional[IntentDecision]:
+        decision = self._classify(question)
+        with self._lock:
+            if decision is None:
+                self._counts["escalated"] += 1
+            elif decision.is_error:
+                self._counts["rejected"] += 1
+            else:
+                self._counts["accepted"] += 1
+        return decision
+
+    def _classify(self, question: str) -> Optional[IntentDecision]:
+        text = _strip_prefix(question)
+        if not text:
+            return None
+        sql_dml = _SQL_DML.search(text)
+        if sql_dml:
+            return IntentDecision(
+                True,
+                _dml_explanation(f"contains a {sql_dml.group(0).upper()} statement"),
+                "rules",
+            )
+        verb, _, rest = text.partition(" ")
+        if verb in _DML_VERBS and _DML_OBJECT.match(rest):
+            return IntentDecision(
+                True, _dml_explanation(f"asks to {verb} data"), "rules"
+            )
+        select_start = _SELECT_START.match(text)
+        if select_start and not _DML_WORDS.search(text):
+            return IntentDecision(False, None, "rules")
+
+        if self.model is None:
+            return None
+        probabilities = self.model.predict(question)
+        if probabilities.get("dml", 0.0) >= self.threshold:
+            return IntentDecision(
+                True, _dml_explanation("asks to modify data"), "model"
+            )
+        # The model only confirms questions that read as a selection, since
+        # phrasings it has not seen ("double the salary ...") can look like one
+        if select_start and probabilities.get("select", 0.0) >= self.threshold:
+            return IntentDecision(False, None, "model")
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+intent_classifier = IntentClassifier(
+    NaiveBayesModel.load(INPUT_CLASSIFIER_MODEL_PATH), INPUT_CLASSIFIER_THRESHOLD
+)
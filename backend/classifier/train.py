@@ -0,0 +1,47 @@
+"""
+Trains the naive Bayes intent model from training_data.jsonl:
+
+    python -m backend.classifier.train
+"""
+
+import json
+import math
+import os
+from collections import Counter
+from typing import Dict, List
+
+from backend.classifier.intent import features
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+TRAINING_DATA_PATH = os.path.join(DIRECTORY, "training_data.jsonl")
+MODEL_PATH = os.path.join(DIRECTORY, "intent_model.json")
+
+
+def train(examples: List[Dict[str, str]], smoothing: float = 1.0) -> Dict:
+    label_counts = Counter(example["label"] for example in examples)
+    token_counts = {label: Counter() for label in label_counts}
+    for example in examples:
+        token_counts[example["label"]].update(features(example["text"]))
+
+    vocabulary = set().union(*token_counts.values())
+    labels = sorted(label_counts)
+    model = {"labels": labels, "priors": {}, "likelihoods": {}, "unknown": {}}
+    for label in labels:
+        denominator = sum(token_counts[label].values()) + smoothing * len(vocabulary)
+        model["priors"][label] = round(math.log(label_counts[label] / len(examples)), 6)
+        model["likelihoods"][label] = {
+            token: round(math.log((count + smoothing) / denominator), 6)
+            for token, count in sorted(token_counts[label].items())
+        }
+        model["unknown"][label] = round(math.log(smoothing / denominator), 6)
+    return model
+
+
+if __name__ == "__main__":
+    with open(TRAINING_DATA_PATH, encoding="utf-8") as file:
+        examples = [json.loads(line) for line in file if line.strip()]
+    model = train(examples)
+    with open(MODEL_PATH, "w", encoding="utf-8") as file:
+        json.dump(model, file, indent=1, sort_keys=True)
+        file.write("\n")
+    print(f"Trained on {len(examples)} examples, wrote {MODEL_PATH}")
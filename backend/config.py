@@ -0,0 +1,122 @@
+import os
+
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv())
+
+
+def _get_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _get_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _get_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+# Connection pools, one per distinct db_config
+DB_POOL_MIN_SIZE = _get_int("DB_POOL_MIN_SIZE", 1)
+DB_POOL_MAX_SIZE = _get_int("DB_POOL_MAX_SIZE", 5)
+DB_POOL_IDLE_TIMEOUT = _get_float("DB_POOL_IDLE_TIMEOUT", 300.0)
+DB_POOL_MAX_POOLS = _get_int("DB_POOL_MAX_POOLS", 16)
+DB_POOL_ACQUIRE_TIMEOUT = _get_float("DB_POOL_ACQUIRE_TIMEOUT", 30.0)
+
+# Schema cache: in-memory LRU, plus an on-disk tier when SCHEMA_CACHE_DIR is set
+SCHEMA_CACHE_MAX_ENTRIES = _get_int("SCHEMA_CACHE_MAX_ENTRIES", 32)
+SCHEMA_CACHE_DIR = os.getenv("SCHEMA_CACHE_DIR") or None
+
+# Let the LLM add natural-language table/column descriptions to the catalog schema
+SCHEMA_DESCRIPTIONS_ENABLED = _get_bool("SCHEMA_DESCRIPTIONS_ENABLED", True)
+# Tables are described in batches of about this many tokens of schema JSON,
+# keeping foreign key neighbours together, with this many calls in flight
+SCHEMA_DESCRIPTION_BATCH_TOKENS = _get_int("SCHEMA_DESCRIPTION_BATCH_TOKENS", 2000)
+SCHEMA_DESCRIPTION_CONCURRENCY = _get_int("SCHEMA_DESCRIPTION_CONCURRENCY", 4)
+# Descriptions are cached per table, keyed by a hash of the table's structure
+SCHEMA_DESCRIPTION_CACHE_MAX_ENTRIES = _get_int(
+    "SCHEMA_DESCRIPTION_CACHE_MAX_ENTRIES", 4096
+)
+
+# Sample rows per table included in the schema DDL; 0 disables the sample queries
+SCHEMA_SAMPLE_ROWS = _get_int("SCHEMA_SAMPLE_ROWS", 0)
+# Seconds between background schema refreshes of the databases in use, so DDL
+# changes are picked up before the next question; 0 disables the refresher
+SCHEMA_REFRESH_INTERVAL = _get_float("SCHEMA_REFRESH_INTERVAL", 0.0)
+
+# Result fetching: rows are streamed in batches and capped per request
+FETCH_SERVER_SIDE_CURSOR = _get_bool("FETCH_SERVER_SIDE_CURSOR", True)
+FETCH_ITERSIZE = _get_int("FETCH_ITERSIZE", 2000)
+FETCH_MAX_ROWS = _get_int("FETCH_MAX_ROWS", 10000)
+FETCH_MAX_BYTES = _get_int("FETCH_MAX_BYTES", 64 * 1024 * 1024)
+# Count the rows beyond the cap on the server (runs the rest of the query)
+FETCH_COUNT_TRUNCATED_ROWS = _get_bool("FETCH_COUNT_TRUNCATED_ROWS", False)
+
+# Result profile sent to the data explainer instead of the raw rows
+PROFILE_TOP_K = _get_int("PROFILE_TOP_K", 5)
+PROFILE_SAMPLE_ROWS = _get_int("PROFILE_SAMPLE_ROWS", 20)
+
+# Generated SQL cached per normalized question and schema fingerprint
+SQL_CACHE_ENABLED = _get_bool("SQL_CACHE_ENABLED", True)
+SQL_CACHE_MAX_ENTRIES = _get_int("SQL_CACHE_MAX_ENTRIES", 1024)
+SQL_CACHE_TTL = _get_float("SQL_CACHE_TTL", 24 * 60 * 60.0)
+# Optional SQLite file so cached SQL survives process restarts
+SQL_CACHE_SQLITE_PATH = os.getenv("SQL_CACHE_SQLITE_PATH") or None
+
+# Query results cached per schema fingerprint and SQL text, bounded by total size
+RESULT_CACHE_ENABLED = _get_bool("RESULT_CACHE_ENABLED", True)
+RESULT_CACHE_TTL = _get_float("RESULT_CACHE_TTL", 300.0)
+RESULT_CACHE_MAX_BYTES = _get_int("RESULT_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+
+# Only the tables relevant to the question are sent to the SQL generator once the
+# schema has more than SCHEMA_RETRIEVAL_MIN_TABLES tables
+SCHEMA_RETRIEVAL_ENABLED = _get_bool("SCHEMA_RETRIEVAL_ENABLED", True)
+SCHEMA_RETRIEVAL_MIN_TABLES = _get_int("SCHEMA_RETRIEVAL_MIN_TABLES", 15)
+SCHEMA_RETRIEVAL_TOP_K = _get_int("SCHEMA_RETRIEVAL_TOP_K", 6)
+SCHEMA_RETRIEVAL_MAX_JOIN_HOPS = _get_int("SCHEMA_RETRIEVAL_MAX_JOIN_HOPS", 3)
+
+# Local intent classifier in front of the LLM input validator
+INPUT_CLASSIFIER_ENABLED = _get_bool("INPUT_CLASSIFIER_ENABLED", True)
+INPUT_CLASSIFIER_MODEL_PATH = os.getenv("INPUT_CLASSIFIER_MODEL_PATH") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "classifier", "intent_model.json"
+)
+# Minimum model probability to decide without the LLM
+INPUT_CLASSIFIER_THRESHOLD = _get_float("INPUT_CLASSIFIER_THRESHOLD", 0.95)
+
+# Cached db_config health checks: successes and failures expire separately
+DB_HEALTH_TTL = _get_float("DB_HEALTH_TTL", 30.0)
+DB_HEALTH_ERROR_TTL = _get_float("DB_HEALTH_ERROR_TTL", 10.0)
+# LLM explanations of unrecognised connection errors, memoized by error signature
+ERROR_EXPLANATION_CACHE_MAX_ENTRIES = _get_int(
+    "ERROR_EXPLANATION_CACHE_MAX_ENTRIES", 256
+)
+
+# Generated SQL runs in a read-only transaction with this statement timeout
+SQL_STATEMENT_TIMEOUT_MS = _get_int("SQL_STATEMENT_TIMEOUT_MS", 30000)
+# EXPLAIN cost gate before execution; SQL_COST_ACTION is one of
+# "limit" (append a LIMIT, block if still too expensive), "block" or "regenerate"
+SQL_GUARD_ENABLED = _get_bool("SQL_GUARD_ENABLED", True)
+SQL_MAX_COST = _get_float("SQL_MAX_COST", 1_000_000.0)
+SQL_MAX_PLAN_ROWS = _get_float("SQL_MAX_PLAN_ROWS", 1_000_000.0)
+SQL_COST_ACTION = (os.getenv("SQL_COST_ACTION") or "limit").strip().lower()
+# SQL generations per request, including regenerations asked for by the cost gate
+SQL_MAX_ATTEMPTS = _get_int("SQL_MAX_ATTEMPTS", 3)
+
+# Per-node and per-chain metrics (latency, tokens, rows, state size, cache hits);
+# nodes are not wrapped at all when disabled. METRICS_PORT serves /metrics and
+# /metrics.json from the Streamlit app when set
+METRICS_ENABLED = _get_bool("METRICS_ENABLED", False)
+METRICS_PORT = _get_int("METRICS_PORT", 0)
+
+# LLM calls per second across all chains and concurrent requests; 0 is unlimited
+LLM_REQUESTS_PER_SECOND = _get_float("LLM_REQUESTS_PER_SECOND", 0.0)
+
+# Approximate token budget of the compact schema sent to the SQL generator;
+# column notes and then table descriptions are dropped to fit
+SCHEMA_PROMPT_MAX_TOKENS = _get_int("SCHEMA_PROMPT_MAX_TOKENS", 4000)
@@ -0,0 +1,231 @@
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Tuple
+
+import psycopg
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool
+
+from backend.config import (
+    DB_POOL_ACQUIRE_TIMEOUT,
+    DB_POOL_IDLE_TIMEOUT,
+    DB_POOL_MAX_POOLS,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_MIN_SIZE,
+)
+from backend.db.pool import pool_key
+
+
+def _conninfo(db_config: Dict[str, str]) -> str:
+    return make_conninfo(
+        host=db_config.get("host"),
+        port=db_config.get("port"),
+        dbname=db_config.get("database"),
+        user=db_config.get("username"),
+        password=db_config.get("password"),
+    )
+
+
+class _AsyncPoolEntry:
+    def __init__(self, pool: AsyncConnectionPool):
+        self.pool = pool
+        self.in_use = 0
+        self.checkouts = 0
+        self.last_used = time.monotonic()
+
+
+class _LoopPools:
+    """Pools of one event loop, with a lock created on that loop."""
+
+    def __init__(self):
+        self.pools: OrderedDict[Tuple, _AsyncPoolEntry] = OrderedDict()
+        self.lock = asyncio.Lock()
+        self.closer = None
+
+
+def _fail_fast_connection_class(failed: asyncio.Future):
+    class FailFastConnection(psycopg.AsyncConnection):
+        # The pool only logs failed attempts and retries until its timeout, so
+        # the first error is handed to the opening pool instead
+        @classmethod
+        async def connect(cls, *args, **kwargs):
+            try:
+                return await super().connect(*args, **kwargs)
+            except psycopg.Error as e:
+                if not failed.done():
+                    failed.set_exception(e)
+                raise
+
+    return FailFastConnection
+
+
+class AsyncConnectionPoolRegistry:
+    """
+    asyncio counterpart of ``ConnectionPoolRegistry`` backed by psycopg 3
+    pools, with the same keying, idle timeout and LRU eviction. Pools are
+    bound to an event loop, so each running loop gets its own pools, which
+    are closed when ``asyncio.run`` shuts that loop down.
+    """
+
+    def __init__(
+        self,
+        min_size: int,
+        max_size: int,
+        idle_timeout: float,
+        max_pools: int,
+        acquire_timeout: float,
+    ):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_pools = max_pools
+        self.acquire_timeout = acquire_timeout
+        self._loops: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._created = 0
+        self._evicted = 0
+
+    @asynccontextmanager
+    async def connection(self, db_config: Dict[str, str]):
+        entry = await self._get_pool(db_config)
+        entry.in_use += 1
+        entry.checkouts += 1
+        try:
+            async with entry.pool.connection(timeout=self.acquire_timeout) as conn:
+                yield conn
+        finally:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+
+    async def _loop_pools(self) -> _LoopPools:
+        loop = asyncio.get_running_loop()
+        loop_pools = self._loops.get(loop)
+        if loop_pools is None:
+            loop_pools = self._loops[loop] = _LoopPools()
+            # asyncio.run finalizes the loop's async generators before closing
+            # it, which closes the pools while their loop still runs
+            loop_pools.closer = self._close_with_loop(loop, loop_pools)
+            await loop_pools.closer.__anext__()
+        return loop_pools
+
+    async def _close_with_loop(
+        self, loop: asyncio.AbstractEventLoop, loop_pools: _LoopPools
+    ) -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            self._loops.pop(loop, None)
+            for key in list(loop_pools.pools):
+                try:
+                    await self._close(loop_pools, key)
+                except asyncio.CancelledError:
+                    # asyncio.run cancels the pool workers first, so close()
+                    # stops at joining them; the idle connections it already
+                    # took out of the pool are closed once it is collected
+                    continue
+
+    async def _open_pool(self, db_config: Dict[str, str]) -> AsyncConnectionPool:
+        failed = asyncio.get_running_loop().create_future()
+        pool = AsyncConnectionPool(
+            _conninfo(db_config),
+            min_size=self.min_size,
+            max_size=self.max_size,
+            max_idle=self.idle_timeout,
+            timeout=self.acquire_timeout,
+            connection_class=_fail_fast_connection_class(failed),
+            open=False,
+        )
+        opening = asyncio.ensure_future(
+            pool.open(wait=True, timeout=self.acquire_timeout)
+        )
+        await asyncio.wait([opening, failed], return_when=asyncio.FIRST_COMPLETED)
+        if failed.done():
+            # Surface errors like a wrong password at once, not as a PoolTimeout
+            opening.cancel()
+            await asyncio.gather(opening, return_exceptions=True)
+            await pool.close()
+            failed.result()
+        # Later failures (e.g. while growing) are left to the pool's retries
+        failed.cancel()
+        await opening
+        return pool
+
+    async def _get_pool(self, db_config: Dict[str, str]) -> _AsyncPoolEntry:
+        key = pool_key(db_config)
+        loop_pools = await self._loop_pools()
+        async with loop_pools.lock:
+            await self._close_idle_pools(loop_pools)
+            entry = loop_pools.pools.get(key)
+            if entry is not None:
+                loop_pools.pools.move_to_end(key)
+                entry.last_used = time.monotonic()
+                return entry
+
+        pool = await self._open_pool(db_config)
+
+        async with loop_pools.lock:
+            entry = loop_pools.pools.get(key)
+            if entry is not None:
+                await pool.close()
+                return entry
+            entry = _AsyncPoolEntry(pool)
+            loop_pools.pools[key] = entry
+            self._created += 1
+            await self._evict_pools(loop_pools)
+            return entry
+
+    async def _close_idle_pools(self, loop_pools: _LoopPools) -> None:
+        now = time.monotonic()
+        for key, entry in list(loop_pools.pools.items()):
+            if entry.in_use == 0 and now - entry.last_used > self.idle_timeout:
+                await self._close(loop_pools, key)
+
+    async def _evict_pools(self, loop_pools: _LoopPools) -> None:
+        for key, entry in list(loop_pools.pools.items()):
+            if len(loop_pools.pools) <= self.max_pools:
+                break
+            if entry.in_use == 0:
+                await self._close(loop_pools, key)
+
+    async def _close(self, loop_pools: _LoopPools, key: Tuple) -> None:
+        entry = loop_pools.pools.pop(key)
+        self._evicted += 1
+        await entry.pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "pools_created": self._created,
+            "pools_evicted": self._evicted,
+            "pools": [
+                {
+                    "database": f"{key[3]}@{key[0]}:{key[1]}/{key[2]}",
+                    "min_size": self.min_size,
+                    "max_size": self.max_size,
+                    "in_use": entry.in_use,
+                    "checkouts": entry.checkouts,
+                    "idle_seconds": round(now - entry.last_used, 3),
+                    **entry.pool.get_stats(),
+                }
+                for loop_pools in list(self._loops.values())
+                for key, entry in loop_pools.pools.items()
+            ],
+        }
+
+    async def close_all(self) -> None:
+        """Closes the pools of the running event loop."""
+        loop_pools = await self._loop_pools()
+        async with loop_pools.lock:
+            for key in list(loop_pools.pools):
+                await self._close(loop_pools, key)
+
+
+async_connection_pools = AsyncConnectionPoolRegistry(
+    min_size=DB_POOL_MIN_SIZE,
+    max_size=DB_POOL_MAX_SIZE,
+    idle_timeout=DB_POOL_IDLE_TIMEOUT,
+    max_pools=DB_POOL_MAX_POOLS,
+    acquire_timeout=DB_POOL_ACQUIRE_TIMEOUT,
+)
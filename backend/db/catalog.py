@@ -0,0 +1,129 @@
+from typing import Dict
+
+# Hash over the table, column and constraint metadata of the current schema.
+# Any DDL change (new table, altered column type, dropped FK, ...) changes it,
+# while data changes do not, so it can be used as a schema version.
+CATALOG_FINGERPRINT_QUERY = """
+SELECT md5(coalesce(string_agg(entry, '|' ORDER BY entry), ''))
+FROM (
+    SELECT format('t:%s', c.relname) AS entry
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p')
+    UNION ALL
+    SELECT format(
+        'c:%s:%s:%s:%s:%s',
+        c.relname,
+        a.attnum,
+        a.attname,
+        pg_catalog.format_type(a.atttypid, a.atttypmod),
+        a.attnotnull
+    )
+    FROM pg_catalog.pg_attribute a
+    JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema()
+      AND c.relkind IN ('r', 'p')
+      AND a.attnum > 0
+      AND NOT a.attisdropped
+    UNION ALL
+    SELECT format(
+        'k:%s:%s:%s', c.relname, con.conname, pg_catalog.pg_get_constraintdef(con.oid)
+    )
+    FROM pg_catalog.pg_constraint con
+    JOIN pg_catalog.pg_class c ON c.oid = con.conrelid
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema()
+) AS entries
+"""
+
+
+# One hash per table over everything introspect_database reads for it (columns,
+# types, defaults, comments, constraints and indexes), so a refresh can tell
+# which tables changed with a single query
+TABLE_SIGNATURES_QUERY = """
+SELECT
+    c.relname,
+    md5(concat_ws(
+        '|',
+        pg_catalog.obj_description(c.oid, 'pg_class'),
+        (
+            SELECT string_agg(
+                format(
+                    '%s:%s:%s:%s:%s:%s',
+                    a.attnum,
+                    a.attname,
+                    pg_catalog.format_type(a.atttypid, a.atttypmod),
+                    a.attnotnull,
+                    pg_catalog.pg_get_expr(d.adbin, d.adrelid),
+                    pg_catalog.col_description(c.oid, a.attnum)
+                ),
+                ',' ORDER BY a.attnum
+            )
+            FROM pg_catalog.pg_attribute a
+            LEFT JOIN pg_catalog.pg_attrdef d
+                ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+            WHERE a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+        ),
+        (
+            SELECT string_agg(
+                format('%s:%s', con.conname, pg_catalog.pg_get_constraintdef(con.oid)),
+                ',' ORDER BY con.conname
+            )
+            FROM pg_catalog.pg_constraint con
+            WHERE con.conrelid = c.oid AND con.contype IN ('p', 'u', 'f')
+        ),
+        (
+            SELECT string_agg(
+                pg_catalog.pg_get_indexdef(i.indexrelid), ',' ORDER BY i.indexrelid
+            )
+            FROM pg_catalog.pg_index i
+            WHERE i.indrelid = c.oid
+        )
+    ))
+FROM pg_catalog.pg_class c
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p')
+ORDER BY c.relname
+"""
+
+
+def fetch_catalog_fingerprint(conn) -> str:
+    with conn.cursor() as cursor:
+        cursor.execute(CATALOG_FINGERPRINT_QUERY)
+        return cursor.fetchone()[0]
+
+
+async def afetch_catalog_fingerprint(conn) -> str:
+    async with conn.cursor() as cursor:
+        await cursor.execute(CATALOG_FINGERPRINT_QUERY)
+        return (await cursor.fetchone())[0]
+
+
+def fetch_table_signatures(conn) -> Dict[str, str]:
+    with conn.cursor() as cursor:
+        cursor.execute(TABLE_SIGNATURES_QUERY)
+        return dict(cursor.fetchall())
+
+
+async def afetch_table_signatures(conn) -> Dict[str, str]:
+    async with conn.cursor() as cursor:
+        await cursor.execute(TABLE_SIGNATURES_QUERY)
+        return dict(await cursor.fetchall())
+
+
+def database_key(db_config: Dict[str, str]) -> str:
+    return (
+        f"{db_config.get('host')}:{db_config.get('port')}/{db_config.get('database')}"
+    )
+
+
+def role_key(db_config: Dict[str, str]) -> str:
+    # Row-level security and grants differ per role, so anything derived from
+    # the rows a role can see is cached per role, not per database
+    return f"{db_config.get('username') or ''}@{database_key(db_config)}"
+
+
+def schema_cache_key(db_config: Dict[str, str], fingerprint: str) -> str:
+    # Sampled example values make the formatted schema role-specific as well
+    return f"{role_key(db_config)}@{fingerprint}"
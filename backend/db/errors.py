@@ -0,0 +1,156 @@
+import hashlib
+import re
+from typing import List, Optional, Tuple
+
+from backend.graph.chains.db_connection_error_explainer import DBConnectionValidator
+
+_FIX_SEPARATOR = " Suggested fixes: "
+
+# SQLSTATE codes reported by the server, see the PostgreSQL "Error Codes" appendix
+SQLSTATE_EXPLANATIONS = {
+    "28P01": (
+        "The password was rejected for the given user.",
+        [
+            "Verify the username and password.",
+            "Check that pg_hba.conf allows password authentication for this user and host.",
+            "Reset the password with ALTER USER if needed.",
+        ],
+    ),
+    "28000": (
+        "The server does not allow this user to connect from this host.",
+        [
+            "Add a matching entry to pg_hba.conf and reload the server.",
+            "Check that the user exists and has the LOGIN privilege.",
+        ],
+    ),
+    "3D000": (
+        "The database does not exist on this server.",
+        [
+            "Check the database name for typos (names are case sensitive).",
+            "List the available databases with \\l in psql.",
+        ],
+    ),
+    "42501": (
+        "The user is not allowed to connect to this database.",
+        ["Grant CONNECT on the database to the user, or use a user that has it."],
+    ),
+    "53300": (
+        "The server has reached its maximum number of connections.",
+        [
+            "Retry shortly, or close idle connections from other clients.",
+            "Raise max_connections or put a pooler such as PgBouncer in front of the server.",
+        ],
+    ),
+    "57P03": (
+        "The server is starting up, shutting down or in recovery and does not accept connections yet.",
+        ["Wait a moment and retry.", "Check the server log for the startup progress."],
+    ),
+}
+
+# Connection failures raised by libpq before any SQLSTATE is available
+MESSAGE_EXPLANATIONS: List[Tuple[re.Pattern, str, List[str]]] = [
+    (
+        re.compile(r"password authentication failed|no password supplied", re.I),
+        *SQLSTATE_EXPLANATIONS["28P01"],
+    ),
+    (re.compile(r"no pg_hba\.conf entry", re.I), *SQLSTATE_EXPLANATIONS["28000"]),
+    (
+        re.compile(r'database ".*" does not exist', re.I),
+        *SQLSTATE_EXPLANATIONS["3D000"],
+    ),
+    (
+        re.compile(r'role ".*" does not exist', re.I),
+        "The user does not exist on this server.",
+        [
+            "Check the username for typos.",
+            "Create the role with CREATE ROLE ... LOGIN.",
+        ],
+    ),
+    (
+        re.compile(r"too many (?:clients|connections)", re.I),
+        *SQLSTATE_EXPLANATIONS["53300"],
+    ),
+    (
+        re.compile(r"the database system is (?:starting up|shutting down)", re.I),
+        *SQLSTATE_EXPLANATIONS["57P03"],
+    ),
+    (
+        re.compile(r"connection refused", re.I),
+        "Nothing accepts connections on the given host and port: the server is not running or listens elsewhere.",
+        [
+            "Check that the PostgreSQL server is running.",
+            "Verify the host and port.",
+            "Check listen_addresses in postgresql.conf and any firewall in between.",
+        ],
+    ),
+    (
+        re.compile(
+            r"could not translate host name|name or service not known|nodename nor servname",
+            re.I,
+        ),
+        "The host name could not be resolved.",
+        ["Check the host name for typos.", "Use the server's IP address instead."],
+    ),
+    (
+        # Raised by our own pools, not by the server
+        re.compile(
+            r"timed out waiting for a database connection|couldn't get a connection",
+            re.I,
+        ),
+        "All pooled connections to this database stayed busy for the whole acquire timeout.",
+        [
+            "Retry once the running queries finish.",
+            "Raise DB_POOL_MAX_SIZE or DB_POOL_ACQUIRE_TIMEOUT.",
+        ],
+    ),
+    (
+        re.compile(r"timeout expired|timed out", re.I),
+        "The server did not answer in time.",
+        [
+            "Check that the host and port are reachable from this machine.",
+            "Check for firewalls or network rules dropping the connection.",
+        ],
+    ),
+    (
+        re.compile(r"ssl", re.I),
+        "The SSL/TLS negotiation with the server failed.",
+        [
+            "Check the server's SSL settings and certificates.",
+            "Adjust sslmode for the connection to match the server.",
+        ],
+    ),
+]
+
+
+def _sqlstate(error: Exception) -> Optional[str]:
+    # psycopg2 exposes pgcode, psycopg 3 sqlstate
+    return getattr(error, "pgcode", None) or getattr(error, "sqlstate", None)
+
+
+def _format(summary: str, fixes: List[str]) -> str:
+    steps = " ".join(f"{number}. {fix}" for number, fix in enumerate(fixes, 1))
+    return summary + _FIX_SEPARATOR + steps
+
+
+def explain_locally(error: Exception) -> Optional[DBConnectionValidator]:
+    """Canned explanation for well-known connection errors, ``None`` otherwise."""
+    known = SQLSTATE_EXPLANATIONS.get(_sqlstate(error) or "")
+    if known is None:
+        message = str(error)
+        for pattern, summary, fixes in MESSAGE_EXPLANATIONS:
+            if pattern.search(message):
+                known = (summary, fixes)
+                break
+    if known is None:
+        return None
+    return DBConnectionValidator(is_error=True, error_explanation=_format(*known))
+
+
+def error_signature(error: Exception) -> str:
+    message = " ".join(str(error).split())
+    return (
+        "error@"
+        + hashlib.sha256(
+            f"{type(error).__name__}:{_sqlstate(error)}:{message}".encode("utf-8")
+        ).hexdigest()
+    )
@@ -0,0 +1,289 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from psycopg import sql as async_sql
+from psycopg2 import sql
+from pydantic import BaseModel, Field
+
+TABLES_QUERY = """
+SELECT
+    c.relname,
+    pg_catalog.obj_description(c.oid, 'pg_class'),
+    CASE WHEN c.reltuples < 0 THEN NULL ELSE c.reltuples::bigint END
+FROM pg_catalog.pg_class c
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p')
+ORDER BY c.relname
+"""
+
+COLUMNS_QUERY = """
+SELECT
+    c.relname,
+    a.attname,
+    pg_catalog.format_type(a.atttypid, a.atttypmod),
+    a.attnotnull,
+    pg_catalog.pg_get_expr(d.adbin, d.adrelid),
+    pg_catalog.col_description(c.oid, a.attnum)
+FROM pg_catalog.pg_attribute a
+JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_catalog.pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+WHERE n.nspname = current_schema()
+  AND c.relkind IN ('r', 'p')
+  AND a.attnum > 0
+  AND NOT a.attisdropped
+ORDER BY c.relname, a.attnum
+"""
+
+CONSTRAINTS_QUERY = """
+SELECT
+    c.relname,
+    con.conname,
+    con.contype,
+    ARRAY(
+        SELECT a.attname FROM unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_catalog.pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+        ORDER BY k.ord
+    ),
+    r.relname,
+    ARRAY(
+        SELECT a.attname FROM unnest(con.confkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_catalog.pg_attribute a ON a.attrelid = con.confrelid AND a.attnum = k.attnum
+        ORDER BY k.ord
+    ),
+    pg_catalog.pg_get_constraintdef(con.oid)
+FROM pg_catalog.pg_constraint con
+JOIN pg_catalog.pg_class c ON c.oid = con.conrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_catalog.pg_class r ON r.oid = con.confrelid
+WHERE n.nspname = current_schema() AND con.contype IN ('p', 'u', 'f')
+ORDER BY c.relname, con.contype, con.conname
+"""
+
+INDEXES_QUERY = """
+SELECT
+    c.relname,
+    i.relname,
+    pg_catalog.pg_get_indexdef(ix.indexrelid),
+    ix.indisunique,
+    ix.indisprimary
+FROM pg_catalog.pg_index ix
+JOIN pg_catalog.pg_class c ON c.oid = ix.indrelid
+JOIN pg_catalog.pg_class i ON i.oid = ix.indexrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p')
+ORDER BY c.relname, i.relname
+"""
+
+# Sample rows for many tables are fetched in one round trip per batch
+SAMPLE_ROWS_BATCH_SIZE = 50
+
+
+class CatalogColumn(BaseModel):
+    name: str
+    type: str
+    not_null: bool = False
+    default: Optional[str] = None
+    comment: Optional[str] = None
+
+
+class CatalogConstraint(BaseModel):
+    name: str
+    kind: str = Field(description="'p' primary key, 'u' unique, 'f' foreign key")
+    columns: List[str]
+    referenced_table: Optional[str] = None
+    referenced_columns: List[str] = Field(default_factory=list)
+    definition: str
+
+
+class CatalogIndex(BaseModel):
+    name: str
+    definition: str
+    is_unique: bool = False
+    is_primary: bool = False
+
+
+class CatalogTable(BaseModel):
+    name: str
+    comment: Optional[str] = None
+    row_estimate: Optional[int] = None
+    columns: List[CatalogColumn] = Field(default_factory=list)
+    constraints: List[CatalogConstraint] = Field(default_factory=list)
+    indexes: List[CatalogIndex] = Field(default_factory=list)
+    sample_rows: Optional[List[Dict[str, Any]]] = None
+
+
+class DatabaseCatalog(BaseModel):
+    tables: List[CatalogTable] = Field(default_factory=list)
+
+
+CATALOG_QUERIES = (TABLES_QUERY, COLUMNS_QUERY, CONSTRAINTS_QUERY, INDEXES_QUERY)
+
+
+def _for_tables(query: str) -> str:
+    head, order_by = query.rsplit("ORDER BY", 1)
+    return head + "  AND c.relname = ANY(%(tables)s)\nORDER BY" + order_by
+
+
+# Same queries restricted to the given tables, for incremental refreshes
+TABLE_CATALOG_QUERIES = tuple(_for_tables(query) for query in CATALOG_QUERIES)
+
+
+def build_catalog(
+    table_rows: List[tuple],
+    column_rows: List[tuple],
+    constraint_rows: List[tuple],
+    index_rows: List[tuple],
+) -> DatabaseCatalog:
+    tables = {
+        name: CatalogTable(name=name, comment=comment, row_estimate=row_estimate)
+        for name, comment, row_estimate in table_rows
+    }
+    for table_name, name, type_, not_null, default, comment in column_rows:
+        tables[table_name].columns.append(
+            CatalogColumn(
+                name=name,
+                type=type_,
+                not_null=not_null,
+                default=default,
+                comment=comment,
+            )
+        )
+    for row in constraint_rows:
+        table_name, name, kind, columns, referenced_table, referenced_columns = row[:6]
+        tables[table_name].constraints.append(
+            CatalogConstraint(
+                name=name,
+                kind=kind,
+                columns=columns,
+                referenced_table=referenced_table,
+                referenced_columns=referenced_columns or [],
+                definition=row[6],
+            )
+        )
+    for table_name, name, definition, is_unique, is_primary in index_rows:
+        tables[table_name].indexes.append(
+            CatalogIndex(
+                name=name,
+                definition=definition,
+                is_unique=is_unique,
+                is_primary=is_primary,
+            )
+        )
+    return DatabaseCatalog(tables=list(tables.values()))
+
+
+def sample_rows_queries(sql_module, table_names: List[str], limit: int) -> List:
+    """
+    One UNION ALL query per batch of tables. ``sql_module`` is ``psycopg2.sql``
+    or ``psycopg.sql``, matching the driver that runs the queries.
+    """
+    queries = []
+    for start in range(0, len(table_names), SAMPLE_ROWS_BATCH_SIZE):
+        batch = table_names[start : start + SAMPLE_ROWS_BATCH_SIZE]
+        queries.append(
+            sql_module.SQL(" UNION ALL ").join(
+                sql_module.SQL(
+                    "SELECT {name}, (SELECT coalesce(json_agg(s), '[]'::json) "
+                    "FROM (SELECT * FROM {table} LIMIT {limit}) AS s)"
+                ).format(
+                    name=sql_module.Literal(name),
+                    table=sql_module.Identifier(name),
+                    limit=sql_module.Literal(limit),
+                )
+                for name in batch
+            )
+        )
+    return queries
+
+
+def apply_sample_rows(catalog: DatabaseCatalog, rows: List[tuple]) -> None:
+    tables_by_name = {table.name: table for table in catalog.tables}
+    for name, sample_rows in rows:
+        tables_by_name[name].sample_rows = sample_rows
+
+
+def _catalog_queries(tables: Optional[List[str]]) -> List[Tuple[str, Any]]:
+    if tables is None:
+        return [(query, None) for query in CATALOG_QUERIES]
+    return [(query, {"tables": list(tables)}) for query in TABLE_CATALOG_QUERIES]
+
+
+def introspect_database(
+    conn, sample_rows: int = 0, tables: Optional[List[str]] = None
+) -> DatabaseCatalog:
+    """Reads the whole schema, or only ``tables`` when given."""
+    with conn.cursor() as cursor:
+        results = []
+        for query, params in _catalog_queries(tables):
+            cursor.execute(query, params)
+            results.append(cursor.fetchall())
+        catalog = build_catalog(*results)
+
+        if sample_rows > 0:
+            table_names = [table.name for table in catalog.tables]
+            for query in sample_rows_queries(sql, table_names, sample_rows):
+                cursor.execute(query)
+                apply_sample_rows(catalog, cursor.fetchall())
+    return catalog
+
+
+async def aintrospect_database(
+    conn, sample_rows: int = 0, tables: Optional[List[str]] = None
+) -> DatabaseCatalog:
+    async with conn.cursor() as cursor:
+        results = []
+        for query, params in _catalog_queries(tables):
+            await cursor.execute(query, params)
+            results.append(await cursor.fetchall())
+        catalog = build_catalog(*results)
+
+        if sample_rows > 0:
+            table_names = [table.name for table in catalog.tables]
+            for query in sample_rows_queries(async_sql, table_names, sample_rows):
+                await cursor.execute(query)
+                apply_sample_rows(catalog, await cursor.fetchall())
+    return catalog
+
+
+def render_ddl(catalog: DatabaseCatalog) -> str:
+    statements = []
+    for table in catalog.tables:
+        lines = []
+        for column in table.columns:
+            line = f"\t{column.name} {column.type}"
+            if column.not_null:
+                line += " NOT NULL"
+            if column.default is not None:
+                line += f" DEFAULT {column.default}"
+            lines.append(line)
+        for constraint in table.constraints:
+            lines.append(f"\tCONSTRAINT {constraint.name} {constraint.definition}")
+        statement = f"CREATE TABLE {table.name} (\n" + ",\n".join(lines) + "\n)"
+
+        comments = []
+        if table.row_estimate is not None:
+            comments.append(f"estimated rows: {table.row_estimate}")
+        comments.extend(
+            index.definition for index in table.indexes if not index.is_primary
+        )
+        if comments:
+            statement += "\n/*\n" + "\n".join(comments) + "\n*/"
+        if table.sample_rows:
+            statement += "\n" + _render_sample_rows(table)
+        statements.append(statement)
+    return "\n\n".join(statements)
+
+
+def _render_sample_rows(table: CatalogTable) -> str:
+    column_names = [column.name for column in table.columns]
+    rows = [
+        "\t".join(str(row.get(name)) for name in column_names)
+        for row in table.sample_rows
+    ]
+    return (
+        f"/*\n{len(table.sample_rows)} rows from {table.name} table:\n"
+        + "\t".join(column_names)
+        + "\n"
+        + "\n".join(rows)
+        + "\n*/"
+    )
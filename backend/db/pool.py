@@ -0,0 +1,175 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Tuple
+
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+from backend.config import (
+    DB_POOL_ACQUIRE_TIMEOUT,
+    DB_POOL_IDLE_TIMEOUT,
+    DB_POOL_MAX_POOLS,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_MIN_SIZE,
+)
+
+
+def pool_key(db_config: Dict[str, str]) -> Tuple[str, str, str, str, str]:
+    password = db_config.get("password") or ""
+    return (
+        (db_config.get("host") or "localhost").strip().lower(),
+        str(db_config.get("port") or "5432").strip(),
+        (db_config.get("database") or "").strip(),
+        (db_config.get("username") or "").strip(),
+        # Keep the key printable in stats without exposing the password
+        hashlib.sha256(password.encode("utf-8")).hexdigest(),
+    )
+
+
+class _PoolEntry:
+    def __init__(self, db_config: Dict[str, str], min_size: int, max_size: int):
+        self.pool = ThreadedConnectionPool(
+            min_size,
+            max_size,
+            host=db_config.get("host"),
+            port=db_config.get("port"),
+            database=db_config.get("database"),
+            user=db_config.get("username"),
+            password=db_config.get("password"),
+        )
+        # psycopg2 raises instead of waiting when the pool is exhausted
+        self.available = threading.BoundedSemaphore(max_size)
+        self.in_use = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.last_used = time.monotonic()
+
+
+class ConnectionPoolRegistry:
+    """
+    One psycopg2 connection pool per database configuration. Pools idle for
+    longer than ``idle_timeout`` seconds are closed, and when more than
+    ``max_pools`` distinct databases are in use the least recently used pool
+    is closed as a whole.
+    """
+
+    def __init__(
+        self,
+        min_size: int,
+        max_size: int,
+        idle_timeout: float,
+        max_pools: int,
+        acquire_timeout: float,
+    ):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_pools = max_pools
+        self.acquire_timeout = acquire_timeout
+        self._pools: OrderedDict[Tuple, _PoolEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._evicted = 0
+
+    @contextmanager
+    def connection(self, db_config: Dict[str, str]):
+        entry = self._get_pool(db_config)
+        if not entry.available.acquire(blocking=False):
+            with self._lock:
+                entry.waits += 1
+            if not entry.available.acquire(timeout=self.acquire_timeout):
+                raise PoolError("timed out waiting for a database connection")
+        try:
+            conn = entry.pool.getconn()
+        except Exception:
+            entry.available.release()
+            raise
+        with self._lock:
+            entry.in_use += 1
+            entry.checkouts += 1
+        try:
+            yield conn
+        finally:
+            # putconn rolls back any open transaction and drops broken connections
+            entry.pool.putconn(conn, close=bool(conn.closed))
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+            entry.available.release()
+
+    def _get_pool(self, db_config: Dict[str, str]) -> _PoolEntry:
+        key = pool_key(db_config)
+        with self._lock:
+            self._close_idle_pools()
+            entry = self._pools.get(key)
+            if entry is not None:
+                self._pools.move_to_end(key)
+                entry.last_used = time.monotonic()
+                return entry
+
+        # Connecting can be slow, so the new pool is created outside the lock
+        new_entry = _PoolEntry(db_config, self.min_size, self.max_size)
+        with self._lock:
+            entry = self._pools.get(key)
+            if entry is not None:
+                new_entry.pool.closeall()
+                return entry
+            self._pools[key] = new_entry
+            self._created += 1
+            self._evict_pools()
+            return new_entry
+
+    def _close_idle_pools(self) -> None:
+        now = time.monotonic()
+        for key, entry in list(self._pools.items()):
+            if entry.in_use == 0 and now - entry.last_used > self.idle_timeout:
+                self._close(key)
+
+    def _evict_pools(self) -> None:
+        for key, entry in list(self._pools.items()):
+            if len(self._pools) <= self.max_pools:
+                break
+            if entry.in_use == 0:
+                self._close(key)
+
+    def _close(self, key: Tuple) -> None:
+        entry = self._pools.pop(key)
+        entry.pool.closeall()
+        self._evicted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "pools_created": self._created,
+                "pools_evicted": self._evicted,
+                "pools": [
+                    {
+                        "database": f"{key[3]}@{key[0]}:{key[1]}/{key[2]}",
+                        "min_size": self.min_size,
+                        "max_size": self.max_size,
+                        "in_use": entry.in_use,
+                        "idle": len(entry.pool._pool),
+                        "checkouts": entry.checkouts,
+                        "waits": entry.waits,
+                        "idle_seconds": round(now - entry.last_used, 3),
+                    }
+                    for key, entry in self._pools.items()
+                ],
+            }
+
+    def close_all(self) -> None:
+        with self._lock:
+            for key in list(self._pools):
+                self._close(key)
+
+
+connection_pools = ConnectionPoolRegistry(
+    min_size=DB_POOL_MIN_SIZE,
+    max_size=DB_POOL_MAX_SIZE,
+    idle_timeout=DB_POOL_IDLE_TIMEOUT,
+    max_pools=DB_POOL_MAX_POOLS,
+    acquire_timeout=DB_POOL_ACQUIRE_TIMEOUT,
+)
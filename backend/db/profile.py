@@ -0,0 +1,81 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from backend.db.result import ColumnarResult, _to_python
+
+
+def _column_type(series: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(series):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(series):
+        return "integer"
+    if pd.api.types.is_numeric_dtype(series):
+        return "number"
+    if pd.api.types.infer_dtype(series, skipna=True) == "decimal":
+        # NUMERIC columns are kept as exact Decimal objects
+        return "number"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime"
+    non_null = series.dropna()
+    if non_null.empty:
+        return "unknown"
+    return type(non_null.iloc[0]).__name__
+
+
+def _profile_column(name: str, series: pd.Series, top_k: int) -> Dict[str, Any]:
+    column_type = _column_type(series)
+    profile = {
+        "name": name,
+        "type": column_type,
+        "null_count": int(series.isna().sum()),
+    }
+    non_null = series.dropna()
+    if non_null.empty:
+        return profile
+
+    if column_type in ("integer", "number", "datetime"):
+        profile["min"] = _to_python(non_null.min())
+        profile["max"] = _to_python(non_null.max())
+        if column_type != "datetime":
+            profile["mean"] = round(float(non_null.mean()), 4)
+
+    try:
+        counts = non_null.value_counts()
+    except TypeError:
+        # Unhashable values such as json or array columns
+        return profile
+    profile["distinct_count"] = int(len(counts))
+    if len(counts) == len(non_null):
+        # Every value is unique, so frequencies carry no information
+        return profile
+    profile["top_values"] = [
+        {"value": _to_python(value), "count": int(count)}
+        for value, count in counts.head(top_k).items()
+    ]
+    return profile
+
+
+def _sample_indices(row_count: int, sample_size: int) -> List[int]:
+    if row_count <= sample_size:
+        return list(range(row_count))
+    # Evenly spaced rows, so ordered results show their first, middle and last values
+    return sorted(set(np.linspace(0, row_count - 1, sample_size).astype(int).tolist()))
+
+
+def profile_result(
+    result: ColumnarResult, top_k: int = 5, sample_size: int = 20
+) -> Dict[str, Any]:
+    frame = result.to_pandas()
+    return {
+        "row_count": len(result),
+        "column_count": len(result.columns),
+        "columns": [
+            _profile_column(name, frame.iloc[:, position], top_k)
+            for position, name in enumerate(result.columns)
+        ],
+        "sample_rows": [
+            result[index] for index in _sample_indices(len(result), sample_size)
+        ],
+    }
@@ -0,0 +1,152 @@
+import datetime
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+
+def _to_array(values: List[Any]) -> np.ndarray:
+    non_null = [value for value in values if value is not None]
+    has_nulls = len(non_null) != len(values)
+    kinds = {type(value) for value in non_null}
+
+    if not kinds:
+        return np.array(values, dtype=object)
+    if kinds == {bool} and not has_nulls:
+        return np.array(values, dtype=bool)
+    if kinds == {int} and not has_nulls:
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            return np.array(values, dtype=object)
+    # Integers with NULLs stay exact as objects (to_pandas makes them nullable
+    # Int64), and so do NUMERIC values, which float64 would round
+    if kinds <= {int, float} and kinds != {int}:
+        return np.array(
+            [np.nan if value is None else float(value) for value in values],
+            dtype=np.float64,
+        )
+    if kinds == {datetime.datetime} and all(v.tzinfo is None for v in non_null):
+        return np.array(values, dtype="datetime64[us]")
+    if kinds == {datetime.date}:
+        return np.array(values, dtype="datetime64[D]")
+    return np.array(values, dtype=object)
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+def _pandas_column(array: np.ndarray):
+    if array.dtype != object:
+        return array
+    if pd.api.types.infer_dtype(array, skipna=True) != "integer":
+        return array
+    mask = _read_only(np.array([value is None for value in array], dtype=bool))
+    try:
+        values = np.array([0 if value is None else value for value in array], np.int64)
+    except OverflowError:
+        return array
+    return pd.arrays.IntegerArray(_read_only(values), mask)
+
+
+def _to_python(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+class ColumnarResult(Sequence):
+    """
+    Query result stored as one typed numpy array per column. Indexing and
+    iterating yield row dictionaries, so it can be used wherever the former
+    list of row dicts was expected, while ``to_pandas`` hands the arrays to
+    pandas without copying them.
+
+    Results are shared through the result cache, so the arrays are read-only
+    and writing to them, or to the values of a frame from ``to_pandas``,
+    raises ``ValueError``.
+    """
+
+    def __init__(self, columns: List[str], arrays: List[np.ndarray]):
+        self.columns = columns
+        self.arrays = [_read_only(array) for array in arrays]
+        self._frame = None
+
+    @classmethod
+    def from_columns(
+        cls, columns: List[str], values: List[List[Any]]
+    ) -> "ColumnarResult":
+        return cls(columns, [_to_array(column_values) for column_values in values])
+
+    @classmethod
+    def from_rows(cls, columns: List[str], rows: List[tuple]) -> "ColumnarResult":
+        values = [list(column) for column in zip(*rows)] or [[] for _ in columns]
+        return cls.from_columns(columns, values)
+
+    def __len__(self) -> int:
+        return len(self.arrays[0]) if self.arrays else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row index out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.to_dicts())
+
+    def __repr__(self) -> str:
+        return f"ColumnarResult(columns={self.columns!r}, rows={len(self)})"
+
+    def _row(self, index: int) -> Dict[str, Any]:
+        return {
+            name: _to_python(array[index])
+            for name, array in zip(self.columns, self.arrays)
+        }
+
+    def column(self, name: str) -> np.ndarray:
+        return self.arrays[self.columns.index(name)]
+
+    @property
+    def nbytes(self) -> int:
+        total = 0
+        for array in self.arrays:
+            total += array.nbytes
+            if array.dtype == object:
+                total += sum(len(str(value)) for value in array)
+        return total
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        column_values = [
+            [_to_python(value) for value in array.tolist()] for array in self.arrays
+        ]
+        return [dict(zip(self.columns, row)) for row in zip(*column_values)]
+
+    def to_pandas(self) -> pd.DataFrame:
+        if self._frame is None:
+            # Positional keys keep duplicate column names (e.g. two "id" columns)
+            frame = pd.DataFrame(
+                dict(enumerate(_pandas_column(array) for array in self.arrays)),
+                copy=False,
+            )
+            frame.columns = self.columns
+            self._frame = frame
+        # A shallow copy: callers may add, drop or rename columns of their own
+        # frame, while the shared values stay read-only
+        return self._frame.copy(deep=False)
+
+    def to_arrow(self):
+        # pyarrow is optional and only needed for Arrow consumers
+        import pyarrow as pa
+
+        return pa.table(
+            [pa.array(array) for array in self.arrays], names=list(self.columns)
+        )
@@ -0,0 +1,78 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.db.introspection import CatalogTable, DatabaseCatalog
+from backend.graph.chains.db_schema_formatter import (
+    ColumnInfo,
+    DatabaseSchema,
+    TableInfo,
+)
+
+
+def build_database_schema(catalog: DatabaseCatalog) -> DatabaseSchema:
+    foreign_key_notes: Dict[Tuple[str, str], str] = {}
+    references: Dict[Tuple[str, str], str] = {}
+    primary_keys: Dict[str, List[str]] = {}
+    related_tables: Dict[str, List[str]] = defaultdict(list)
+
+    for table in catalog.tables:
+        for constraint in table.constraints:
+            if constraint.kind == "p":
+                primary_keys[table.name] = constraint.columns
+            if constraint.kind != "f":
+                continue
+            referenced_table = constraint.referenced_table
+            for column, referenced_column in zip(
+                constraint.columns, constraint.referenced_columns
+            ):
+                references[(table.name, column)] = (
+                    f"{referenced_table}.{referenced_column}"
+                )
+                foreign_key_notes[(table.name, column)] = (
+                    f"Foreign key referencing {referenced_table}.{referenced_column}"
+                )
+            for name, other in (
+                (table.name, referenced_table),
+                (referenced_table, table.name),
+            ):
+                if other != name and other not in related_tables[name]:
+                    related_tables[name].append(other)
+
+    tables = []
+    for table in catalog.tables:
+        columns = []
+        for column in table.columns:
+            is_primary_key = column.name in primary_keys.get(table.name, [])
+            explanation = column.comment or foreign_key_notes.get(
+                (table.name, column.name)
+            )
+            if explanation is None and is_primary_key:
+                explanation = "Primary key"
+            columns.append(
+                ColumnInfo(
+                    name=column.name,
+                    type=column.type,
+                    explanation=explanation,
+                    is_primary_key=is_primary_key or None,
+                    references=references.get((table.name, column.name)),
+                    example=_example_value(table, column.name),
+                )
+            )
+        tables.append(
+            TableInfo(
+                table_name=table.name,
+                description=table.comment,
+                columns=columns,
+                relation_ship=", ".join(related_tables[table.name]) or None,
+            )
+        )
+    return DatabaseSchema(tables=tables)
+
+
+def _example_value(table: CatalogTable, column: str) -> Optional[str]:
+    for row in table.sample_rows or []:
+        value: Any = row.get(column)
+        if value is not None:
+            text = str(value)
+            return text if len(text) <= 40 else text[:37] + "..."
+    return None
@@ -0,0 +1,134 @@
+import math
+import re
+from typing import List
+
+from backend.graph.chains.db_schema_formatter import (
+    ColumnInfo,
+    DatabaseSchema,
+    TableInfo,
+)
+from backend.retrieval.table_index import _related_tables
+
+# Long PostgreSQL type names and their short forms
+_TYPE_ALIASES = (
+    (re.compile(r"^character varying(\(\d+\))?$"), "varchar"),
+    (re.compile(r"^character(\(\d+\))?$"), "char"),
+    (re.compile(r"^timestamp(\(\d+\))? without time zone$"), "timestamp"),
+    (re.compile(r"^timestamp(\(\d+\))? with time zone$"), "timestamptz"),
+    (re.compile(r"^time(\(\d+\))? without time zone$"), "time"),
+    (re.compile(r"^integer$"), "int"),
+    (re.compile(r"^double precision$"), "float8"),
+    (re.compile(r"^boolean$"), "bool"),
+)
+
+# Explanations generated from the constraints; the pk/fk markers say the same
+_KEY_NOTES = re.compile(r"^(Primary key|Foreign key referencing \S+)$")
+
+# Detail levels, tried from the most to the least verbose
+COLUMN_NOTES = 2
+TABLE_DESCRIPTIONS = 1
+NAMES_ONLY = 0
+
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token for English text and identifiers
+    return math.ceil(len(text) / 4)
+
+
+def short_type(column_type: str) -> str:
+    for pattern, alias in _TYPE_ALIASES:
+        if pattern.match(column_type):
+            return alias
+    return column_type
+
+
+def _column(column: ColumnInfo, detail: int) -> str:
+    text = f"{column.name} {short_type(column.type)}"
+    if column.is_primary_key:
+        text += " pk"
+    if column.references:
+        text += f" fk→{column.references}"
+    if detail >= COLUMN_NOTES:
+        if column.explanation and not _KEY_NOTES.match(column.explanation):
+            text += f" [{column.explanation}]"
+        # Example values of key columns do not tell the model anything
+        if column.example is not None and not (
+            column.is_primary_key or column.references
+        ):
+            text += f" e.g. {column.example!r}"
+    return text
+
+
+def render_table(table: TableInfo, detail: int = COLUMN_NOTES) -> str:
+    """``orders(order_id int pk, user_id int fk→users.user_id, ...) -- description``"""
+    line = (
+        f"{table.table_name}("
+        + ", ".join(_column(column, detail) for column in table.columns)
+        + ")"
+    )
+    if detail >= TABLE_DESCRIPTIONS and table.description:
+        line += f" -- {table.description}"
+    return line
+
+
+def render_compact_schema(schema: DatabaseSchema, max_tokens: int) -> str:
+    """
+    One line per table, in schema order. Column notes and then table
+    descriptions are dropped while the rendering exceeds ``max_tokens``; if
+    the bare lines still do not fit, the remaining tables are left out.
+    """
+    for detail in (COLUMN_NOTES, TABLE_DESCRIPTIONS, NAMES_ONLY):
+        lines = [render_table(table, detail) for table in schema.tables]
+        text = "\n".join(lines)
+        if estimate_tokens(text) <= max_tokens:
+            return text
+
+    kept: List[str] = []
+    used = 0
+    for line in lines:
+        used += estimate_tokens(line) + 1
+        if used > max_tokens:
+            break
+        kept.append(line)
+    kept.append(f"-- {len(lines) - len(kept)} more tables not shown")
+    return "\n".join(kept)
+
+
+def _clustered(tables: List[TableInfo]) -> List[TableInfo]:
+    # Breadth-first over foreign key relationships, so connected tables end up
+    # next to each other and usually in the same batch
+    by_name = {table.table_name: table for table in tables}
+    ordered, seen = [], set()
+    for table in tables:
+        if table.table_name in seen:
+            continue
+        seen.add(table.table_name)
+        queue = [table]
+        while queue:
+            current = queue.pop(0)
+            ordered.append(current)
+            for name in _related_tables(current):
+                if name in by_name and name not in seen:
+                    seen.add(name)
+                    queue.append(by_name[name])
+    return ordered
+
+
+def schema_batches(tables: List[TableInfo], max_tokens: int) -> List[List[TableInfo]]:
+    """
+    Splits tables into batches of at most ``max_tokens`` of JSON each (a
+    larger table gets a batch of its own), keeping foreign key clusters together.
+    """
+    batches: List[List[TableInfo]] = []
+    current: List[TableInfo] = []
+    used = 0
+    for table in _clustered(tables):
+        tokens = estimate_tokens(table.model_dump_json(exclude_none=True))
+        if current and used + tokens > max_tokens:
+            batches.append(current)
+            current, used = [], 0
+        current.append(table)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
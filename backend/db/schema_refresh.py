@@ -0,0 +1,97 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from backend.cache.catalog_cache import CatalogSnapshot, catalog_cache
+from backend.db.catalog import (
+    afetch_table_signatures,
+    fetch_table_signatures,
+    role_key,
+)
+from backend.db.introspection import (
+    DatabaseCatalog,
+    aintrospect_database,
+    introspect_database,
+)
+
+
+class SchemaChanges(NamedTuple):
+    added: List[str]
+    altered: List[str]
+    dropped: List[str]
+
+    @property
+    def changed(self) -> List[str]:
+        # Tables whose catalog entries have to be read again
+        return self.added + self.altered
+
+
+def diff_signatures(old: Dict[str, str], new: Dict[str, str]) -> SchemaChanges:
+    return SchemaChanges(
+        added=[name for name in new if name not in old],
+        altered=[name for name in new if name in old and old[name] != new[name]],
+        dropped=[name for name in old if name not in new],
+    )
+
+
+def merge_catalog(
+    catalog: DatabaseCatalog, changed: DatabaseCatalog, signatures: Dict[str, str]
+) -> DatabaseCatalog:
+    tables = {table.name: table for table in catalog.tables}
+    tables.update({table.name: table for table in changed.tables})
+    # Signatures come in catalog order, so the merged catalog matches a full read
+    return DatabaseCatalog(
+        tables=[tables[name] for name in signatures if name in tables]
+    )
+
+
+def _refreshed(
+    db_config: Dict[str, str], signatures: Dict[str, str]
+) -> Tuple[Optional[CatalogSnapshot], SchemaChanges]:
+    stored = catalog_cache.get(role_key(db_config))
+    if stored is None:
+        return None, SchemaChanges(list(signatures), [], [])
+    return stored, diff_signatures(stored.signatures, signatures)
+
+
+def refresh_catalog(
+    conn, db_config: Dict[str, str], sample_rows: int = 0
+) -> Tuple[DatabaseCatalog, SchemaChanges]:
+    """
+    Brings the stored catalog of the database up to date with one signature
+    query, reading only the added and altered tables again. The first refresh
+    of a database reads the whole catalog.
+    """
+    signatures = fetch_table_signatures(conn)
+    stored, changes = _refreshed(db_config, signatures)
+    if stored is None:
+        catalog = introspect_database(conn, sample_rows=sample_rows)
+    elif not (changes.changed or changes.dropped):
+        return stored.catalog, changes
+    else:
+        changed = DatabaseCatalog()
+        if changes.changed:
+            changed = introspect_database(
+                conn, sample_rows=sample_rows, tables=changes.changed
+            )
+        catalog = merge_catalog(stored.catalog, changed, signatures)
+    catalog_cache.set(role_key(db_config), CatalogSnapshot(signatures, catalog))
+    return catalog, changes
+
+
+async def arefresh_catalog(
+    conn, db_config: Dict[str, str], sample_rows: int = 0
+) -> Tuple[DatabaseCatalog, SchemaChanges]:
+    signatures = await afetch_table_signatures(conn)
+    stored, changes = _refreshed(db_config, signatures)
+    if stored is None:
+        catalog = await aintrospect_database(conn, sample_rows=sample_rows)
+    elif not (changes.changed or changes.dropped):
+        return stored.catalog, changes
+    else:
+        changed = DatabaseCatalog()
+        if changes.changed:
+            changed = await aintrospect_database(
+                conn, sample_rows=sample_rows, tables=changes.changed
+            )
+        catalog = merge_catalog(stored.catalog, changed, signatures)
+    catalog_cache.set(role_key(db_config), CatalogSnapshot(signatures, catalog))
+    return catalog, changes
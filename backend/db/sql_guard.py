@@ -0,0 +1,118 @@
+import json
+import re
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple
+
+# Comments, quoted literals/identifiers and dollar-quoted bodies are matched
+# first so keywords and semicolons inside them are ignored
+_TOKENS = re.compile(
+    r"(?P<comment>--[^\n]*|/\*.*?\*/)"
+    r"|(?P<string>[eE]?'(?:[^'\\]|''|\\.)*'|\"(?:[^\"]|\"\")*\")"
+    r"|(?P<dollar>\$(?P<tag>[A-Za-z_]\w*)?\$.*?\$(?P=tag)?\$)"
+    r"|(?P<word>[A-Za-z_][A-Za-z0-9_$]*)"
+    r"|(?P<symbol>[();])"
+    r"|(?P<other>\S)",
+    re.S,
+)
+
+READ_STATEMENTS = {"select", "with", "values", "table"}
+# Statements that can be nested in a read query as a data-modifying CTE
+WRITE_STATEMENTS = {"insert", "update", "delete", "merge"}
+# SELECT ... FOR UPDATE / FOR SHARE / FOR NO KEY UPDATE / FOR KEY SHARE take row locks
+LOCKING_CLAUSES = {"update", "share", "no", "key"}
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    depth: int
+
+
+class SqlPlanEstimate(NamedTuple):
+    total_cost: float
+    plan_rows: float
+
+
+def tokenize(sql: str) -> Iterator[Token]:
+    depth = 0
+    for match in _TOKENS.finditer(sql):
+        kind = match.lastgroup if match.lastgroup != "tag" else "dollar"
+        text = match.group(0)
+        if kind == "comment":
+            continue
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth = max(depth - 1, 0)
+        yield Token(kind, text.lower() if kind == "word" else text, depth)
+
+
+def _statements(sql: str) -> List[List[Token]]:
+    statements = [[]]
+    for token in tokenize(sql):
+        if token.text == ";":
+            statements.append([])
+        else:
+            statements[-1].append(token)
+    return [statement for statement in statements if statement]
+
+
+def check_read_only(sql: str) -> Optional[str]:
+    """Returns why the SQL may not be executed, or ``None`` for a single read-only query."""
+    statements = _statements(sql)
+    if not statements:
+        return "The generated SQL is empty."
+    if len(statements) > 1:
+        return "The generated SQL contains more than one statement."
+    statement = statements[0]
+    first = statement[0].text
+    if first not in READ_STATEMENTS:
+        return f"Only SELECT queries can be run, not {first.upper()} statements."
+    for previous, token in zip(statement, statement[1:]):
+        if token.kind != "word":
+            continue
+        if token.text in WRITE_STATEMENTS and previous.text == "(":
+            return f"The query contains a data-modifying {token.text.upper()}."
+        if previous.text == "for" and token.text in LOCKING_CLAUSES:
+            return "The query locks rows with FOR UPDATE/SHARE, which is not allowed."
+        if token.text == "into":
+            return "SELECT ... INTO creates a table and is not allowed."
+    return None
+
+
+def has_top_level_limit(sql: str) -> bool:
+    return any(
+        token.kind == "word" and token.depth == 0 and token.text in ("limit", "fetch")
+        for token in tokenize(sql)
+    )
+
+
+def add_limit(sql: str, limit: int) -> str:
+    return f"{sql.strip().rstrip(';').rstrip()}\nLIMIT {int(limit)}"
+
+
+def parse_plan(value: Any) -> SqlPlanEstimate:
+    # psycopg2 and psycopg 3 decode the json column; keep text input working too
+    plan = json.loads(value) if isinstance(value, str) else value
+    root = plan[0]["Plan"]
+    return SqlPlanEstimate(float(root["Total Cost"]), float(root["Plan Rows"]))
+
+
+def explain_query(sql: str) -> str:
+    return "EXPLAIN (FORMAT JSON) " + sql.strip().rstrip(";")
+
+
+def read_only_statements(
+    statement_timeout_ms: int,
+) -> List[Tuple[str, Optional[Tuple]]]:
+    """
+    Statements that start a read-only transaction with a statement timeout.
+    ``set_config(..., true)`` is transaction scoped, so pooled connections are
+    back to their defaults after the rollback on check-in.
+    """
+    return [
+        ("SET TRANSACTION READ ONLY", None),
+        (
+            "SELECT set_config('statement_timeout', %s, true)",
+            (str(int(statement_timeout_ms)),),
+        ),
+    ]
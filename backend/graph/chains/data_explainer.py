@@ -1,15 +1,13 @@
-from langchain.chains.question_answering.map_reduce_prompt import messages
-from langchain_core.output_parsers import PydanticOutputParser
+import functools
+import json
+
 from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
+from langchain_core.runnables import Runnable
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
-
-from dotenv import load_dotenv, find_dotenv
 
-from backend.graph.nodes.fetch_data import fetch_db_data
-from backend.graph.state import QueryState
-
-load_dotenv(find_dotenv())
+from backend.db.profile import profile_result
+from backend.graph.chains.llm import chat_model
+from backend.metrics.instrument import instrument_chain
 
 
 class DataExplain(BaseModel):
@@ -19,29 +17,41 @@ class DataExplain(BaseModel):
     )
 
 
-llm = ChatOpenAI(temperature=0, model="gpt-4")
-structured_llm_explainer = llm.with_structured_output(DataExplain)
-
 system_role = """
     You are a smart assistant for analyzing and explaining tabular data based on a user query. Your task is to:
-    1. Analyze the provided data, which is a list of dictionaries where each dictionary represents a row of a table, and keys are the column names.
+    1. Analyze the provided data profile. Instead of every row, you receive a summary of the query result computed locally:
+       - `row_count` and `column_count` of the result.
+       - `columns`: for every column its name, inferred type, `null_count`, `distinct_count`, `min`/`max`/`mean` for 
+         numeric and date columns, and `top_values` with their counts for columns with repeated values.
+       - `sample_rows`: a small representative sample of the rows (all rows when the result is small).
+       - `is_truncated` and `total_row_count` when only part of the result was fetched.
     2. Relate the analysis to the given user query:
        - Summarize how the data satisfies or does not satisfy the query conditions.
        - Provide relevant observations based on the query.
     3. Summarize the structure of the data:
-       - List all column names and their data types (inferred from the values).
+       - List all column names and their data types.
        - Describe the number of rows and columns.
     4. Highlight key observations:
        - Summarize trends, patterns, or anomalies in the data (e.g., average values, frequent items, empty fields).
        - If applicable, describe relationships between columns.
-    5. If the data is empty (`[]` or 'None'), explain that no data is available, relate this to the query, suggest potential reasons, and provide possible next steps.
+       - Only state facts supported by the profile; do not guess values of rows that are not in the sample.
+    5. If the data is empty (`row_count` is 0), explain that no data is available, relate this to the query, suggest potential reasons, and provide possible next steps.
     
     ### Input Format:
     {
-        "data": [
-            {"order_id": 101, "total_amount": 500.0, "first_name": "John", "last_name": "Doe", "product_name": "Laptop", "quantity": 1},
-            {"order_id": 102, "total_amount": 450.0, "first_name": "Jane", "last_name": "Smith", "product_name": "Phone", "quantity": 2}
-        ],
+        "data": {
+            "row_count": 2,
+            "column_count": 3,
+            "columns": [
+                {"name": "order_id", "type": "integer", "null_count": 0, "min": 101, "max": 102, "mean": 101.5, "distinct_count": 2},
+                {"name": "total_amount", "type": "number", "null_count": 0, "min": 450.0, "max": 500.0, "mean": 475.0, "distinct_count": 2},
+                {"name": "first_name", "type": "str", "null_count": 0, "distinct_count": 2}
+            ],
+            "sample_rows": [
+                {"order_id": 101, "total_amount": 500.0, "first_name": "John"},
+                {"order_id": 102, "total_amount": 450.0, "first_name": "Jane"}
+            ]
+        },
         "messages": [
             ("type": "human", "content": "Get me the orders whose amount is greater than 400.")
         ]
@@ -56,7 +66,7 @@ system_role = """
         
     ### Input Example for Empty Data:
     {
-        "data": [],
+        "data": {"row_count": 0, "column_count": 3, "columns": [...], "sample_rows": []},
         "query": "Get me the orders whose amount is greater than 400."
     }
     
@@ -73,14 +83,22 @@ data_explainer_prompt = ChatPromptTemplate.from_messages(
     [
         ("system", system_role),
         ("placeholder", "{messages}"),
-        HumanMessagePromptTemplate.from_template("Data is {data}"),
+        HumanMessagePromptTemplate.from_template("Data profile is {data}"),
     ],
     template_format="jinja2",
 )
 
-data_explainer_chain = data_explainer_prompt | structured_llm_explainer
+
+@functools.lru_cache(maxsize=None)
+def get_data_explainer_chain() -> Runnable:
+    structured_llm = chat_model("gpt-4").with_structured_output(DataExplain)
+    return instrument_chain("data_explainer", data_explainer_prompt | structured_llm)
+
 
 if __name__ == "__main__":
+    from backend.graph.nodes.fetch_data import fetch_db_data
+    from backend.graph.state import QueryState
+
     db_config = {
         "host": "localhost",
         "port": "6432",
@@ -102,5 +120,6 @@ if __name__ == "__main__":
             "is there any customer who order multiple times"
         ).format()
     ]
-    result = data_explainer_chain.invoke({"messages": messages, "data": data["data"]})
+    profile = json.dumps(profile_result(data["data"]), default=str)
+    result = get_data_explainer_chain().invoke({"messages": messages, "data": profile})
     print(result)
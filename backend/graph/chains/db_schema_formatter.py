@@ -1,13 +1,12 @@
-from langchain_core.output_parsers import StrOutputParser
+import functools
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
 
 from typing import List, Optional
 
-from dotenv import load_dotenv, find_dotenv
-
-load_dotenv(find_dotenv())
+from backend.graph.chains.llm import chat_model
+from backend.metrics.instrument import instrument_chain
 
 
 class ColumnInfo(BaseModel):
@@ -15,14 +14,27 @@ class ColumnInfo(BaseModel):
     type: str = Field(
         description="Specifies the data type of the column, such as VARCHAR, INT, etc."
     )
-    explanation: str = Field(
-        description="Provides a description of the column's purpose or usage"
+    explanation: Optional[str] = Field(
+        description="Provides a description of the column's purpose or usage",
+        default=None,
+    )
+    is_primary_key: Optional[bool] = Field(
+        description="True if the column is part of the primary key", default=None
+    )
+    references: Optional[str] = Field(
+        description="Referenced table.column if the column is a foreign key",
+        default=None,
+    )
+    example: Optional[str] = Field(
+        description="An example value taken from the sample rows", default=None
     )
 
 
 class TableInfo(BaseModel):
     table_name: str = Field(description="Specifies the name of the table")
-    description: str = Field(description="Provides a description/summary of the table")
+    description: Optional[str] = Field(
+        description="Provides a description/summary of the table", default=None
+    )
     columns: List[ColumnInfo] = Field(description="Lists all the columns in the table")
     relation_ship: Optional[str] = Field(
         description="Lists related tables, separated by commas, indicating relationships with this table",
@@ -36,46 +48,76 @@ class DatabaseSchema(BaseModel):
     )
 
 
-llm = ChatOpenAI(temperature=0)
-structured_llm_formatter = llm.with_structured_output(DatabaseSchema)
+class ColumnDescription(BaseModel):
+    name: str = Field(description="Specifies the name of the column")
+    explanation: str = Field(
+        description="Provides a description of the column's purpose or usage"
+    )
 
-system_role = """
-    You are a database schema analyzer and formatter. Your task is to analyze a given SQL DDL string containing definitions 
-    for multiple tables and format it into a structured schema using the provided Pydantic model format. The input may 
-    include additional lines that are not part of table definitions—these should be ignored.
 
-    ### Input:
-    A string containing DDL statements for tables in SQL. Each table includes its name, columns, and optionally relationships or constraints.
+class TableDescription(BaseModel):
+    table_name: str = Field(description="Specifies the name of the table")
+    description: str = Field(description="Provides a description/summary of the table")
+    columns: List[ColumnDescription] = Field(
+        description="Explanations for the columns that do not have one yet"
+    )
 
-    ### Output:
-    A valid Pydantic model representation of the schema, adhering to the following structure:
 
-    1. **`ColumnInfo`**:
-       - `name`: Name of the column.
-       - `type`: Data type of the column (e.g., VARCHAR, INT).
-       - `explanation`: Provide an explanation if available (from comments or constraints). If not available, please your own. Must capture the foreign key relationship in detail
+class SchemaDescriptions(BaseModel):
+    tables: List[TableDescription] = Field(
+        description="Descriptions for all the tables in the database schema"
+    )
+
 
-    2. **`TableInfo`**:
-       - `table_name`: Name of the table.
-       - `columns`: List of `ColumnInfo` for the table.
-       - `relation_ship`:
-           - A comma-separated list of directly related tables inferred from foreign keys.
-       - `description`:provides a description/summary of the table
+system_role = """
+    You are a database schema documentation assistant. You are given a database schema as JSON. Table names, columns, 
+    types and relationships have already been extracted from the database catalog and must not be changed. Your task is 
+    to write the missing natural-language documentation.
 
-    3. **`DatabaseSchema`**:
-       - `tables`: List of all `TableInfo`.
+    ### Input:
+    A JSON object with a list of tables. Each table has `table_name`, an optional `description`, `columns` (each with 
+    `name`, `type` and an optional `explanation`) and an optional `relation_ship` listing directly related tables.
+
+    ### Output:
+    1. **`TableDescription`** for every table:
+       - `table_name`: Name of the table, exactly as given.
+       - `description`: A precise description/summary of the table, using its columns and relationships.
+       - `columns`: A `ColumnDescription` (`name`, `explanation`) for every column whose `explanation` is missing.
 
     ### Additional Notes:
-    - Include only table definitions; ignore non-table lines.
-    - Preserve column order from the DDL.
-    - Extract relationships from foreign key constraints, if any.
+    - Do not invent tables or columns.
     - Ensure descriptions are precise, even if inferred.
 """
 
-user_input_validator_prompt = ChatPromptTemplate.from_messages(
+db_schema_formatter_prompt = ChatPromptTemplate.from_messages(
     [
         ("system", system_role),
-        ("human", "DDL string: \n\n {ddl}"),
+        ("human", "Database schema: \n\n {schema}"),
     ]
 )
-db_schema_formatter_chain = user_input_validator_prompt | structured_llm_formatter
+
+
+@functools.lru_cache(maxsize=None)
+def get_db_schema_formatter_chain() -> Runnable:
+    structured_llm = chat_model().with_structured_output(SchemaDescriptions)
+    return instrument_chain(
+        "db_schema_formatter", db_schema_formatter_prompt | structured_llm
+    )
+
+
+def apply_schema_descriptions(
+    schema: DatabaseSchema, descriptions: SchemaDescriptions
+) -> DatabaseSchema:
+    described = schema.model_copy(deep=True)
+    descriptions_by_table = {table.table_name: table for table in descriptions.tables}
+    for table in described.tables:
+        table_description = descriptions_by_table.get(table.table_name)
+        if table_description is None:
+            continue
+        table.description = table.description or table_description.description
+        explanations = {
+            column.name: column.explanation for column in table_description.columns
+        }
+        for column in table.columns:
+            column.explanation = column.explanation or explanations.get(column.name)
+    return described
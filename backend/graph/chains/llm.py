@@ -0,0 +1,43 @@
+import functools
+from typing import TYPE_CHECKING, Optional
+
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+# Also loads .env, so OPENAI_API_KEY is set before the first client is created
+from backend.config import LLM_REQUESTS_PER_SECOND
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+_rate_limiter: Optional[InMemoryRateLimiter] = None
+
+
+def set_rate_limit(requests_per_second: float) -> None:
+    """
+    Makes every chat model created afterwards share one token bucket of
+    ``requests_per_second`` LLM calls; 0 removes the limit. Chains are built on
+    first use, so call this before running the graph.
+    """
+    global _rate_limiter
+    _rate_limiter = None
+    if requests_per_second > 0:
+        _rate_limiter = InMemoryRateLimiter(requests_per_second=requests_per_second)
+    chat_model.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def chat_model(model: Optional[str] = None) -> "ChatOpenAI":
+    """
+    ChatOpenAI client shared by every chain using ``model``. The client, and
+    the openai SDK behind it, are only loaded by the first chain that runs.
+    """
+    from langchain_openai import ChatOpenAI
+
+    # stream_usage keeps token counts when the UI streams the graph's LLM calls
+    options = {"temperature": 0, "rate_limiter": _rate_limiter, "stream_usage": True}
+    if model is None:
+        return ChatOpenAI(**options)
+    return ChatOpenAI(model=model, **options)
+
+
+set_rate_limit(LLM_REQUESTS_PER_SECOND)
@@ -1,17 +1,13 @@
+import functools
 from typing import Optional
 
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
+from langchain_core.runnables import Runnable
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
 
-from dotenv import load_dotenv, find_dotenv
-
-from backend.graph.nodes.fetch_db_schema import fetch_db_schema_details
-from backend.graph.nodes.format_db_schema import format_db_schema
-from backend.graph.state import QueryState
-
-load_dotenv(find_dotenv())
+from backend.graph.chains.llm import chat_model
+from backend.metrics.instrument import instrument_chain
 
 
 class SQLQueryResult(BaseModel):
@@ -40,8 +36,6 @@ system_role = """
        - If you cannot infer or establish the required relationships between tables to generate the query, set `is_error=True`.
        - Provide a clear `error_explanation` describing why the query could not be generated or why the request is invalid.
 """
-llm = ChatOpenAI(temperature=0, model="gpt-4")
-structured_llm_generator = llm.with_structured_output(SQLQueryResult)
 
 sql_query_generator_prompt = ChatPromptTemplate.from_messages(
     [
@@ -50,9 +44,21 @@ sql_query_generator_prompt = ChatPromptTemplate.from_messages(
     ],
     template_format="jinja2",
 )
-sql_query_generator_chain = sql_query_generator_prompt | structured_llm_generator
+
+
+@functools.lru_cache(maxsize=None)
+def get_sql_query_generator_chain() -> Runnable:
+    structured_llm = chat_model("gpt-4").with_structured_output(SQLQueryResult)
+    return instrument_chain(
+        "sql_query_generator", sql_query_generator_prompt | structured_llm
+    )
+
 
 if __name__ == "__main__":
+    from backend.graph.nodes.fetch_db_schema import fetch_db_schema_details
+    from backend.graph.nodes.format_db_schema import format_db_schema, schema_message
+    from backend.graph.state import QueryState
+
     messages = [
         HumanMessagePromptTemplate.from_template(
             "is there any customer who order multiple times"
@@ -66,8 +72,9 @@ if __name__ == "__main__":
         "password": "password",
     }
     state = QueryState(db_config=db_config, messages=messages)
-    state["messages"].append(fetch_db_schema_details(state)["messages"][-1])
-    state["messages"].append(format_db_schema(state)["messages"][-1])
-    # print(state["messages"][-1])
-    result = sql_query_generator_chain.invoke({"messages": state["messages"]})
+    state.update(fetch_db_schema_details(state))
+    state.update(format_db_schema(state))
+    result = get_sql_query_generator_chain().invoke(
+        {"messages": messages + [schema_message(state["schema_prompt"])]}
+    )
     print(result.model_dump_json())
@@ -1,9 +1,11 @@
+import functools
+
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv, find_dotenv
 
-load_dotenv(find_dotenv())
+from backend.graph.chains.llm import chat_model
+from backend.metrics.instrument import instrument_chain
 
 
 class UserInputValidator(BaseModel):
@@ -15,9 +17,6 @@ class UserInputValidator(BaseModel):
     )
 
 
-llm = ChatOpenAI(temperature=0)
-structured_llm_validator = llm.with_structured_output(UserInputValidator)
-
 system_role = """
 You are an intelligent assistant specialized in understanding natural language database queries. Your task is to analyze a given query in plain English and determine:
 
@@ -41,10 +40,17 @@ user_input_validator_prompt = ChatPromptTemplate.from_messages(
     ]
 )
 
-user_input_validator_chain = user_input_validator_prompt | structured_llm_validator
+
+@functools.lru_cache(maxsize=None)
+def get_user_input_validator_chain() -> Runnable:
+    structured_llm = chat_model().with_structured_output(UserInputValidator)
+    return instrument_chain(
+        "user_input_validator", user_input_validator_prompt | structured_llm
+    )
+
 
 if __name__ == "__main__":
-    result = user_input_validator_chain.invoke(
+    result = get_user_input_validator_chain().invoke(
         {"question": "get list of people who watch movie matrix"}
     )
     print(result)
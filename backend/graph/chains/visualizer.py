@@ -0,0 +1,330 @@
+import datetime
+import functools
+import json
+import re
+from typing import Dict, List, Union, Optional
+
+from langchain_core.prompts import (
+    HumanMessagePromptTemplate,
+    ChatPromptTemplate,
+    SystemMessagePromptTemplate,
+)
+from langchain_core.runnables import Runnable
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from backend.db.profile import profile_result
+from backend.db.result import ColumnarResult
+from backend.graph.chains.llm import chat_model
+from backend.metrics.instrument import instrument_chain
+
+
+class VisualizationOptions(BaseModel):
+    """
+    Additional options for visualization, such as tooltip columns.
+    """
+
+    tooltip: Optional[List[str]] = Field(
+        None,
+        description="List of column names to display as tooltips on the visualization.",
+    )
+
+
+class VisualizationConfig(BaseModel):
+    """
+    Main model for visualization configuration. Represents the structure for determining
+    if visualization is possible and how it should be rendered. The chart is drawn from
+    the query result already in memory, so the data itself is not part of the config.
+    """
+
+    is_visualization_possible: bool = Field(
+        ..., description="Indicates whether the data can be visualized."
+    )
+    chart_type: Optional[str] = Field(
+        None,
+        description="The type of chart suitable for visualization, e.g., 'Line Chart', 'Bar Chart'.",
+    )
+    explanation: Optional[str] = Field(
+        None,
+        description="Explanation of why the suggested chart type is suitable, or why visualization is not possible.",
+    )
+    x_axis: Optional[str] = Field(
+        None,
+        description="The column name to be used as the X-axis in the visualization.",
+    )
+    y_axis: Optional[Union[str, List[str]]] = Field(
+        None,
+        description="The column name or list of column names to be used as the Y-axis in the visualization.",
+    )
+    other_options: Optional[VisualizationOptions] = Field(
+        None, description="Additional options for customization, such as tooltips."
+    )
+
+
+system_role = """
+    You are an AI assistant responsible for generating visualization configurations based on provided SQL query results 
+    or data structure. Your task is to determine if the data can be visualized, suggest the appropriate chart type, and 
+    provide a detailed configuration for rendering the chart dynamically.
+    
+    ### Instructions:
+    1. **Analyze the Data**:
+       - Examine the provided data profile (row count, columns, data types, value ranges, frequent values and a 
+         sample of rows).
+       - Identify patterns like time-series data, categorical values, or numerical relationships.
+    
+    2. **Chart Types**:
+       - Suggest a suitable chart type based on the data. Only these chart types can be rendered:
+         - **Line Chart**: For time-series or continuous numerical data.
+         - **Bar Chart**: For categorical data with numerical values.
+         - **Pie Chart**: For proportions or percentages.
+       - If none of them fits, visualization is not possible.
+       - `x_axis`, `y_axis` and tooltip columns must be column names from the profile.
+    
+    3. **Output Format**:
+       - If visualization is possible, generate a JSON object with the following structure:
+         ```json
+         {
+             "is_visualization_possible": true,
+             "chart_type": "<chosen_chart_type>",
+             "explanation": "<why this chart type is suitable>",
+             "x_axis": "<x_axis_column>",
+             "y_axis": "<y_axis_column_or_columns>",
+             "other_options": {
+                 "tooltip": ["<columns_to_display_in_tooltips>"]
+             }
+         }
+         ```
+       - If visualization is not possible, generate a JSON object with this structure:
+         ```json
+         {
+             "is_visualization_possible": false,
+             "explanation": "<reason why visualization is not possible>"
+         }
+         ```
+    
+    4. **Examples**:
+    
+    #### Example 1:
+    **Input:**
+    - SQL Query: `SELECT order_date, SUM(total_amount) AS daily_sales FROM orders GROUP BY order_date;`
+    - Data profile:
+      ```json
+      {
+          "row_count": 3,
+          "column_count": 2,
+          "columns": [
+              {"name": "order_date", "type": "date", "null_count": 0, "distinct_count": 3},
+              {"name": "daily_sales", "type": "number", "null_count": 0, "min": 3000.0, "max": 5000.0, "mean": 4166.6667}
+          ],
+          "sample_rows": [
+              {"order_date": "2023-12-01", "daily_sales": 5000.0},
+              {"order_date": "2023-12-02", "daily_sales": 3000.0},
+              {"order_date": "2023-12-03", "daily_sales": 4500.0}
+          ]
+      }
+    ```
+    **Output:**
+    ```json
+    {
+        "is_visualization_possible": true,
+        "chart_type": "Line Chart",
+        "explanation": "The data contains time-series information (order_date) with numerical aggregation (daily_sales), making it suitable for a line chart.",
+        "x_axis": "order_date",
+        "y_axis": "daily_sales",
+        "other_options": {
+            "tooltip": ["order_date", "daily_sales"]
+        }
+    }
+    ```
+"""
+
+visualizer_prompt = ChatPromptTemplate.from_messages(
+    [
+        SystemMessagePromptTemplate.from_template(
+            system_role, template_format="jinja2"
+        ),
+        HumanMessagePromptTemplate.from_template(
+            "SQL Query: {sql} \n Data profile: {data}"
+        ),
+    ],
+)
+
+
+@functools.lru_cache(maxsize=None)
+def get_visualizer_chain() -> Runnable:
+    structured_llm = chat_model("gpt-4").with_structured_output(VisualizationConfig)
+    return instrument_chain("visualizer", visualizer_prompt | structured_llm)
+
+
+# Bar charts with more categories than this are left to the LLM to decide
+MAX_BAR_CATEGORIES = 30
+LLM_PROFILE_SAMPLE_ROWS = 10
+# Integer columns such as "year" or "order_month" that label periods
+_CALENDAR_PART = re.compile(r"(?:^|_)(?:year|yr|quarter|month|week|day)(?:_|$)")
+
+
+def _is_identifier(name: str) -> bool:
+    name = name.lower()
+    return name == "id" or name.endswith("_id")
+
+
+def _is_temporal(name: str, series: pd.Series) -> bool:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return True
+    if pd.api.types.is_integer_dtype(series) and _CALENDAR_PART.search(name.lower()):
+        return True
+    non_null = series.dropna()
+    return not non_null.empty and isinstance(
+        non_null.iloc[0], (datetime.date, datetime.datetime)
+    )
+
+
+def _is_measure(name: str, series: pd.Series) -> bool:
+    numeric = pd.api.types.is_numeric_dtype(series) or (
+        pd.api.types.infer_dtype(series, skipna=True) == "decimal"
+    )
+    return (
+        numeric and not pd.api.types.is_bool_dtype(series) and not _is_identifier(name)
+    )
+
+
+def _tooltip(df: pd.DataFrame, columns: List[str]) -> List[str]:
+    others = [column for column in df.columns if column not in columns]
+    return list(dict.fromkeys(columns + others[:2]))
+
+
+def plan_visualization(df: pd.DataFrame) -> Optional[VisualizationConfig]:
+    """
+    Picks a chart from column types and cardinality. Returns None when the
+    shape of the data is ambiguous and should be decided by the LLM.
+    """
+    if df.empty:
+        return VisualizationConfig(
+            is_visualization_possible=False,
+            explanation="The query returned no rows to visualize.",
+        )
+    if df.columns.duplicated().any():
+        return None
+
+    measures, temporals, categories = [], [], []
+    for name in df.columns:
+        series = df[name]
+        if _is_temporal(name, series):
+            temporals.append(name)
+        elif _is_measure(name, series):
+            measures.append(name)
+        elif not _is_identifier(name):
+            categories.append(name)
+
+    if not measures:
+        return VisualizationConfig(
+            is_visualization_possible=False,
+            explanation="The result has no numeric columns to plot.",
+        )
+    if len(df) == 1 and not temporals and not categories:
+        return VisualizationConfig(
+            is_visualization_possible=False,
+            explanation="The result is a single row of values, which is best read as a table.",
+        )
+
+    y_axis = measures[0] if len(measures) == 1 else measures
+    # With categories as well (e.g. date, region, sales) the rows hold one series
+    # per category, which may call for grouped lines or bars: left to the LLM
+    if len(temporals) == 1 and not categories:
+        return VisualizationConfig(
+            is_visualization_possible=True,
+            chart_type="Line Chart",
+            explanation=f"{temporals[0]} is a time column with numeric values, "
+            "making it suitable for a line chart.",
+            x_axis=temporals[0],
+            y_axis=y_axis,
+            other_options=VisualizationOptions(
+                tooltip=_tooltip(df, temporals + measures)
+            ),
+        )
+    if (
+        not temporals
+        and len(categories) == 1
+        and df[categories[0]].nunique() <= MAX_BAR_CATEGORIES
+    ):
+        return VisualizationConfig(
+            is_visualization_possible=True,
+            chart_type="Bar Chart",
+            explanation=f"{categories[0]} is categorical with numeric values, "
+            "making it suitable for a bar chart.",
+            x_axis=categories[0],
+            y_axis=y_axis,
+            other_options=VisualizationOptions(
+                tooltip=_tooltip(df, categories + measures)
+            ),
+        )
+    return None
+
+
+def _has_columns(config: VisualizationConfig, df: pd.DataFrame) -> bool:
+    y_axis = config.y_axis if isinstance(config.y_axis, list) else [config.y_axis]
+    return all(column in df.columns for column in [config.x_axis] + y_axis)
+
+
+def _visualizer_input(sql: str, result: ColumnarResult) -> Dict[str, str]:
+    profile = profile_result(result, sample_size=LLM_PROFILE_SAMPLE_ROWS)
+    return {"sql": sql, "data": json.dumps(profile, default=str)}
+
+
+def _checked_config(
+    config: VisualizationConfig, df: pd.DataFrame
+) -> VisualizationConfig:
+    if config.is_visualization_possible and not _has_columns(config, df):
+        return VisualizationConfig(
+            is_visualization_possible=False,
+            explanation="The suggested chart refers to columns that are not in the result.",
+        )
+    return config
+
+
+def suggest_visualization(sql: str, result: ColumnarResult) -> VisualizationConfig:
+    df = result.to_pandas()
+    config = plan_visualization(df)
+    if config is not None:
+        return config
+    config = get_visualizer_chain().invoke(_visualizer_input(sql, result))
+    return _checked_config(config, df)
+
+
+async def asuggest_visualization(
+    sql: str, result: ColumnarResult
+) -> VisualizationConfig:
+    df = result.to_pandas()
+    config = plan_visualization(df)
+    if config is not None:
+        return config
+    config = await get_visualizer_chain().ainvoke(_visualizer_input(sql, result))
+    return _checked_config(config, df)
+
+
+if __name__ == "__main__":
+    # Imported here because QueryState itself depends on this module
+    from backend.graph.nodes.fetch_data import fetch_db_data
+    from backend.graph.state import QueryState
+
+    db_config = {
+        "host": "localhost",
+        "port": "6432",
+        "database": "online_store",
+        "username": "admin",
+        "password": "password",
+    }
+    sql = """
+        WITH max_order AS (SELECT MAX(total_amount) AS max_total FROM orders) 
+        SELECT o.order_id, o.total_amount, u.first_name, u.last_name, p.product_name, 
+        oi.quantity FROM orders o JOIN users u ON o.user_id = u.user_id JOIN 
+        order_items oi ON o.order_id = oi.order_id JOIN products p ON oi.product_id = p.product_id 
+        WHERE o.total_amount = (SELECT max_total FROM max_order);
+        """
+    state = QueryState(
+        db_config=db_config,
+        sql=sql,
+    )
+    data = fetch_db_data(state)
+    result = suggest_visualization(sql, data["data"])
+    print(result)
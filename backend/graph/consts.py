@@ -5,3 +5,10 @@ FORMAT_DB_SCHEMA_NODE = "format_db_schema_node"
 SQL_GENERATION_NODE = "sql_generation_node"
 DATA_FETCH_NODE = "data_fetch_node"
 DATA_EXPLAINER_NODE = "data_explainer_node"
+SCHEMA_CACHE_NODE = "schema_cache_node"
+PREPARE_REQUEST_NODE = "prepare_request_node"
+SCHEMA_PREPARATION_NODE = "schema_preparation_node"
+PREPARATION_JOIN_NODE = "preparation_join_node"
+VISUALIZATION_NODE = "visualization_node"
+SQL_CACHE_NODE = "sql_cache_node"
+SQL_CHECK_NODE = "sql_check_node"
@@ -1,4 +1,9 @@
-from langgraph.graph import END, StateGraph
+import functools
+import sys
+from typing import Callable, Dict
+
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.state import CompiledStateGraph
 
 from backend.graph.consts import (
     DB_CONFIG_VALIDATOR_NODE,
@@ -8,72 +13,248 @@ from backend.graph.consts import (
     SQL_GENERATION_NODE,
     FORMAT_DB_SCHEMA_NODE,
     DATA_EXPLAINER_NODE,
+    SCHEMA_CACHE_NODE,
+    PREPARE_REQUEST_NODE,
+    SCHEMA_PREPARATION_NODE,
+    PREPARATION_JOIN_NODE,
+    VISUALIZATION_NODE,
+    SQL_CACHE_NODE,
+    SQL_CHECK_NODE,
+)
+from backend.graph.nodes.data_explain import aexplain_data, explain_data
+from backend.graph.nodes.db_config_checker import adb_config_checker, db_config_checker
+from backend.graph.nodes.fetch_data import afetch_db_data, fetch_db_data
+from backend.graph.nodes.fetch_db_schema import (
+    afetch_db_schema_details,
+    fetch_db_schema_details,
+)
+from backend.graph.nodes.format_db_schema import aformat_db_schema, format_db_schema
+from backend.graph.nodes.prepare_request import prepare_request
+from backend.graph.nodes.schema_cache_lookup import (
+    aschema_cache_lookup,
+    schema_cache_lookup,
+)
+from backend.graph.nodes.sql_cache_lookup import asql_cache_lookup, sql_cache_lookup
+from backend.graph.nodes.sql_check import acheck_sql, check_sql
+from backend.graph.nodes.sql_generation import asql_generation, sql_generation
+from backend.graph.nodes.user_input_checker import (
+    auser_input_validator_agent,
+    user_input_validator_agent,
 )
-from backend.graph.nodes.data_explain import explain_data
-from backend.graph.nodes.db_config_checker import db_config_checker
-from backend.graph.nodes.fetch_data import fetch_db_data
-from backend.graph.nodes.fetch_db_schema import fetch_db_schema_details
-from backend.graph.nodes.format_db_schema import format_db_schema
-from backend.graph.nodes.sql_generation import sql_generation
-from backend.graph.nodes.user_input_checker import user_input_validator_agent
-from backend.graph.state import QueryState
+from backend.graph.nodes.visualization import aplan_chart, plan_chart
+from backend.graph.state import QueryState, SchemaPreparationOutput, is_cancelled
+from backend.metrics.instrument import instrument_node
 
 
-def is_user_input_valid(state: QueryState):
-    if state["is_error"]:
-        return END
-    return DB_CONFIG_VALIDATOR_NODE
+def is_sql_cached(state: QueryState):
+    if state["sql_cache_hit"]:
+        return DATA_FETCH_NODE
+    return [USER_INPUT_VALIDATOR_NODE, SCHEMA_PREPARATION_NODE]
 
 
 def is_db_config_valid(state: QueryState):
-    state["is_error"] = (
-        state["is_error"] == "True"
-        if isinstance(state["is_error"], str)
-        else state["is_error"]
-    )
-    if state["is_error"]:
+    if state["is_error"] or is_cancelled(state):
+        return END
+    return SCHEMA_CACHE_NODE
+
+
+def is_schema_cached(state: QueryState):
+    if state["schema_cache_hit"] or is_cancelled(state):
         return END
     return FETCH_DB_SCHEMA_NODE
 
 
+def is_schema_fetched(state: QueryState):
+    if is_cancelled(state):
+        return END
+    return FORMAT_DB_SCHEMA_NODE
+
+
+def is_request_prepared(state: QueryState):
+    if state["is_error"]:
+        return END
+    return SQL_GENERATION_NODE
+
+
 def is_sql_generated(state: QueryState):
-    state["is_error"] = (
-        state["is_error"] == "True"
-        if isinstance(state["is_error"], str)
-        else state["is_error"]
-    )
+    if state["is_error"]:
+        return END
+    return SQL_CHECK_NODE
+
+
+def is_sql_checked(state: QueryState):
+    if state.get("sql_feedback"):
+        return SQL_GENERATION_NODE
     if state["is_error"]:
         return END
     return DATA_FETCH_NODE
 
 
-workflow = StateGraph(QueryState)
-workflow.add_node(USER_INPUT_VALIDATOR_NODE, user_input_validator_agent)
-workflow.add_node(DB_CONFIG_VALIDATOR_NODE, db_config_checker)
-workflow.add_node(FETCH_DB_SCHEMA_NODE, fetch_db_schema_details)
-workflow.add_node(FORMAT_DB_SCHEMA_NODE, format_db_schema)
-workflow.add_node(SQL_GENERATION_NODE, sql_generation)
-workflow.add_node(DATA_FETCH_NODE, fetch_db_data)
-workflow.add_node(DATA_EXPLAINER_NODE, explain_data)
+def is_data_fetched(state: QueryState):
+    # A fixable database error goes back to SQL generation with the error
+    if state.get("sql_feedback"):
+        if not state.get("db_schema"):
+            # Failed cached SQL: the cache hit skipped validation and the schema
+            return [USER_INPUT_VALIDATOR_NODE, SCHEMA_PREPARATION_NODE]
+        return SQL_GENERATION_NODE
+    if state["is_error"]:
+        return END
+    return [DATA_EXPLAINER_NODE, VISUALIZATION_NODE]
+
+
+def noop(state: QueryState):
+    # None writes nothing; an empty dict is rejected as an update by langgraph 0.2.54
+    return None
+
+
+SYNC_NODES = {
+    PREPARE_REQUEST_NODE: prepare_request,
+    SQL_CACHE_NODE: sql_cache_lookup,
+    USER_INPUT_VALIDATOR_NODE: user_input_validator_agent,
+    DB_CONFIG_VALIDATOR_NODE: db_config_checker,
+    SCHEMA_CACHE_NODE: schema_cache_lookup,
+    FETCH_DB_SCHEMA_NODE: fetch_db_schema_details,
+    FORMAT_DB_SCHEMA_NODE: format_db_schema,
+    SQL_GENERATION_NODE: sql_generation,
+    SQL_CHECK_NODE: check_sql,
+    DATA_FETCH_NODE: fetch_db_data,
+    DATA_EXPLAINER_NODE: explain_data,
+    VISUALIZATION_NODE: plan_chart,
+}
+
+# Same graph with coroutine nodes: LLM calls use ainvoke and database access
+# goes through the asyncio connection pools
+ASYNC_NODES = {
+    **SYNC_NODES,
+    SQL_CACHE_NODE: asql_cache_lookup,
+    USER_INPUT_VALIDATOR_NODE: auser_input_validator_agent,
+    DB_CONFIG_VALIDATOR_NODE: adb_config_checker,
+    SCHEMA_CACHE_NODE: aschema_cache_lookup,
+    FETCH_DB_SCHEMA_NODE: afetch_db_schema_details,
+    FORMAT_DB_SCHEMA_NODE: aformat_db_schema,
+    SQL_GENERATION_NODE: asql_generation,
+    SQL_CHECK_NODE: acheck_sql,
+    DATA_FETCH_NODE: afetch_db_data,
+    DATA_EXPLAINER_NODE: aexplain_data,
+    VISUALIZATION_NODE: aplan_chart,
+}
+
+
+def build_graph(nodes: Dict[str, Callable]) -> CompiledStateGraph:
+    nodes = {name: instrument_node(name, node) for name, node in nodes.items()}
+    # Schema branch: runs as a single node of the main graph so that all of its
+    # stages overlap with the user input validation
+    schema_workflow = StateGraph(QueryState, output=SchemaPreparationOutput)
+    schema_workflow.add_node(DB_CONFIG_VALIDATOR_NODE, nodes[DB_CONFIG_VALIDATOR_NODE])
+    schema_workflow.add_node(SCHEMA_CACHE_NODE, nodes[SCHEMA_CACHE_NODE])
+    schema_workflow.add_node(FETCH_DB_SCHEMA_NODE, nodes[FETCH_DB_SCHEMA_NODE])
+    schema_workflow.add_node(FORMAT_DB_SCHEMA_NODE, nodes[FORMAT_DB_SCHEMA_NODE])
+
+    schema_workflow.set_entry_point(DB_CONFIG_VALIDATOR_NODE)
+    schema_workflow.add_conditional_edges(
+        DB_CONFIG_VALIDATOR_NODE,
+        is_db_config_valid,
+        {SCHEMA_CACHE_NODE: SCHEMA_CACHE_NODE, END: END},
+    )
+    schema_workflow.add_conditional_edges(
+        SCHEMA_CACHE_NODE,
+        is_schema_cached,
+        {FETCH_DB_SCHEMA_NODE: FETCH_DB_SCHEMA_NODE, END: END},
+    )
+    schema_workflow.add_conditional_edges(
+        FETCH_DB_SCHEMA_NODE,
+        is_schema_fetched,
+        {FORMAT_DB_SCHEMA_NODE: FORMAT_DB_SCHEMA_NODE, END: END},
+    )
+    schema_workflow.add_edge(FORMAT_DB_SCHEMA_NODE, END)
+    schema_graph = schema_workflow.compile()
+
+    workflow = StateGraph(QueryState)
+    workflow.add_node(PREPARE_REQUEST_NODE, nodes[PREPARE_REQUEST_NODE])
+    workflow.add_node(SQL_CACHE_NODE, nodes[SQL_CACHE_NODE])
+    workflow.add_node(USER_INPUT_VALIDATOR_NODE, nodes[USER_INPUT_VALIDATOR_NODE])
+    workflow.add_node(SCHEMA_PREPARATION_NODE, schema_graph)
+    workflow.add_node(PREPARATION_JOIN_NODE, noop)
+    workflow.add_node(SQL_GENERATION_NODE, nodes[SQL_GENERATION_NODE])
+    workflow.add_node(SQL_CHECK_NODE, nodes[SQL_CHECK_NODE])
+    workflow.add_node(DATA_FETCH_NODE, nodes[DATA_FETCH_NODE])
+    workflow.add_node(DATA_EXPLAINER_NODE, nodes[DATA_EXPLAINER_NODE])
+    workflow.add_node(VISUALIZATION_NODE, nodes[VISUALIZATION_NODE])
+
+    workflow.add_edge(START, PREPARE_REQUEST_NODE)
+    workflow.add_edge(PREPARE_REQUEST_NODE, SQL_CACHE_NODE)
+    # A previously answered question skips validation, schema and SQL generation
+    workflow.add_conditional_edges(
+        SQL_CACHE_NODE,
+        is_sql_cached,
+        {
+            DATA_FETCH_NODE: DATA_FETCH_NODE,
+            USER_INPUT_VALIDATOR_NODE: USER_INPUT_VALIDATOR_NODE,
+            SCHEMA_PREPARATION_NODE: SCHEMA_PREPARATION_NODE,
+        },
+    )
+    # Waits for both branches before deciding whether to generate SQL
+    workflow.add_edge(
+        [USER_INPUT_VALIDATOR_NODE, SCHEMA_PREPARATION_NODE], PREPARATION_JOIN_NODE
+    )
+    workflow.add_conditional_edges(
+        PREPARATION_JOIN_NODE,
+        is_request_prepared,
+        {SQL_GENERATION_NODE: SQL_GENERATION_NODE, END: END},
+    )
+    workflow.add_conditional_edges(
+        SQL_GENERATION_NODE,
+        is_sql_generated,
+        {SQL_CHECK_NODE: SQL_CHECK_NODE, END: END},
+    )
+    # Cached SQL was checked before it was stored, so only generated SQL goes here
+    workflow.add_conditional_edges(
+        SQL_CHECK_NODE,
+        is_sql_checked,
+        {
+            DATA_FETCH_NODE: DATA_FETCH_NODE,
+            SQL_GENERATION_NODE: SQL_GENERATION_NODE,
+            END: END,
+        },
+    )
+    workflow.add_conditional_edges(
+        DATA_FETCH_NODE,
+        is_data_fetched,
+        {
+            USER_INPUT_VALIDATOR_NODE: USER_INPUT_VALIDATOR_NODE,
+            SCHEMA_PREPARATION_NODE: SCHEMA_PREPARATION_NODE,
+            SQL_GENERATION_NODE: SQL_GENERATION_NODE,
+            DATA_EXPLAINER_NODE: DATA_EXPLAINER_NODE,
+            VISUALIZATION_NODE: VISUALIZATION_NODE,
+            END: END,
+        },
+    )
+    workflow.add_edge(DATA_EXPLAINER_NODE, END)
+    workflow.add_edge(VISUALIZATION_NODE, END)
+    return workflow.compile()
+
+
+@functools.lru_cache(maxsize=None)
+def compiled_graph(use_async: bool = False) -> CompiledStateGraph:
+    return build_graph(ASYNC_NODES if use_async else SYNC_NODES)
+
+
+def __getattr__(name: str):
+    # ``graph`` and ``async_graph`` are compiled on first access, so importing
+    # this module does not build either of them.
+    # Use ``async_graph`` with ``await async_graph.ainvoke(...)`` or
+    # ``async for ... in async_graph.astream(...)``
+    if name == "graph":
+        return compiled_graph()
+    if name == "async_graph":
+        return compiled_graph(use_async=True)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def render_graph_png(output_file_path: str = "graph.png") -> None:
+    # Uses the mermaid.ink web service
+    compiled_graph().get_graph().draw_mermaid_png(output_file_path=output_file_path)
 
-workflow.set_entry_point(USER_INPUT_VALIDATOR_NODE)
-workflow.add_conditional_edges(
-    USER_INPUT_VALIDATOR_NODE,
-    is_user_input_valid,
-    {DB_CONFIG_VALIDATOR_NODE: DB_CONFIG_VALIDATOR_NODE, END: END},
-)
-workflow.add_conditional_edges(
-    DB_CONFIG_VALIDATOR_NODE,
-    is_db_config_valid,
-    {FETCH_DB_SCHEMA_NODE: FETCH_DB_SCHEMA_NODE, END: END},
-)
-workflow.add_edge(FETCH_DB_SCHEMA_NODE, FORMAT_DB_SCHEMA_NODE)
-workflow.add_edge(FORMAT_DB_SCHEMA_NODE, SQL_GENERATION_NODE)
-workflow.add_conditional_edges(
-    SQL_GENERATION_NODE, is_sql_generated, {DATA_FETCH_NODE: DATA_FETCH_NODE, END: END}
-)
-workflow.add_edge(DATA_FETCH_NODE, DATA_EXPLAINER_NODE)
-workflow.add_edge(DATA_EXPLAINER_NODE, END)
 
-graph = workflow.compile()
-graph.get_graph().draw_mermaid_png(output_file_path="graph.png")
+if __name__ == "__main__":
+    render_graph_png(sys.argv[1] if len(sys.argv) > 1 else "graph.png")
@@ -1,11 +1,27 @@
+import json
 from typing import Dict
 
+from backend.config import PROFILE_SAMPLE_ROWS, PROFILE_TOP_K
+from backend.db.profile import profile_result
 from backend.graph.state import QueryState
-from backend.graph.chains.data_explainer import data_explainer_chain
+from backend.graph.chains.data_explainer import get_data_explainer_chain
 
 
-def explain_data(state: QueryState) -> Dict[str, str]:
-    result = data_explainer_chain.invoke(
-        {"messages": state["messages"], "data": state["data"]}
+def _explainer_input(state: QueryState) -> Dict[str, any]:
+    profile = profile_result(
+        state["data"], top_k=PROFILE_TOP_K, sample_size=PROFILE_SAMPLE_ROWS
     )
+    if state.get("is_truncated"):
+        profile["is_truncated"] = True
+        profile["total_row_count"] = state.get("total_row_count")
+    return {"messages": state["messages"], "data": json.dumps(profile, default=str)}
+
+
+def explain_data(state: QueryState) -> Dict[str, str]:
+    result = get_data_explainer_chain().invoke(_explainer_input(state))
+    return {"explanation": result.explanation}
+
+
+async def aexplain_data(state: QueryState) -> Dict[str, str]:
+    result = await get_data_explainer_chain().ainvoke(_explainer_input(state))
     return {"explanation": result.explanation}
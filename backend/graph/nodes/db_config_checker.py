@@ -1,31 +1,84 @@
 from typing import Dict
+import psycopg
 import psycopg2
 
+from backend.cache.health_cache import db_health_cache, error_explanation_cache
+from backend.db.async_pool import async_connection_pools
+from backend.db.errors import error_signature, explain_locally
+from backend.db.pool import connection_pools
 from backend.graph.state import QueryState
 from backend.graph.chains.db_connection_error_explainer import (
-    db_connection_error_explain_chain,
+    DBConnectionValidator,
+    get_db_connection_error_explain_chain,
 )
 
 
+def _error_update(result: DBConnectionValidator) -> Dict[str, any]:
+    return {
+        "is_error": result.is_error,
+        "error_explanation": result.error_explanation,
+    }
+
+
+def explain_connection_error(error: Exception) -> Dict[str, any]:
+    result = explain_locally(error)
+    if result is None:
+        signature = error_signature(error)
+        cached = error_explanation_cache.get(signature)
+        if cached is not None:
+            result = DBConnectionValidator.model_validate_json(cached)
+        else:
+            result = get_db_connection_error_explain_chain().invoke(
+                {"error": str(error)}
+            )
+            error_explanation_cache.set(signature, result.model_dump_json())
+    return _error_update(result)
+
+
+async def aexplain_connection_error(error: Exception) -> Dict[str, any]:
+    result = explain_locally(error)
+    if result is None:
+        signature = error_signature(error)
+        cached = error_explanation_cache.get(signature)
+        if cached is not None:
+            result = DBConnectionValidator.model_validate_json(cached)
+        else:
+            result = await get_db_connection_error_explain_chain().ainvoke(
+                {"error": str(error)}
+            )
+            error_explanation_cache.set(signature, result.model_dump_json())
+    return _error_update(result)
+
+
 def db_config_checker(state: QueryState) -> Dict[str, any]:
+    db_config = state["db_config"]
+    cached = db_health_cache.get(db_config)
+    if cached is not None:
+        return cached
     try:
-        db_config = state["db_config"]
-        conn = psycopg2.connect(
-            host=db_config.get("host"),
-            port=db_config.get("port"),
-            database=db_config.get("database"),
-            user=db_config.get("username"),
-            password=db_config.get("password"),
-        )
-        conn.close()
-        return {"is_error": False}
+        with connection_pools.connection(db_config) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        result = {"is_error": False}
     except psycopg2.Error as e:
-        error_message = str(e)
-        result = db_connection_error_explain_chain.invoke({"error": error_message})
-        return {
-            "is_error": result.is_error,
-            "error_explanation": result.error_explanation,
-        }
+        result = explain_connection_error(e)
+    db_health_cache.set(db_config, result)
+    return result
+
+
+async def adb_config_checker(state: QueryState) -> Dict[str, any]:
+    db_config = state["db_config"]
+    cached = db_health_cache.get(db_config)
+    if cached is not None:
+        return cached
+    try:
+        async with async_connection_pools.connection(db_config) as conn:
+            await conn.execute("SELECT 1")
+        result = {"is_error": False}
+    except psycopg.Error as e:
+        result = await aexplain_connection_error(e)
+    db_health_cache.set(db_config, result)
+    return result
 
 
 if __name__ == "__main__":
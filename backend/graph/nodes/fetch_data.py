@@ -1,38 +1,237 @@
-from typing import Dict
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
 
+import psycopg
 import psycopg2
-from langchain_core.prompts import HumanMessagePromptTemplate
 
+from backend.config import (
+    FETCH_COUNT_TRUNCATED_ROWS,
+    FETCH_ITERSIZE,
+    FETCH_MAX_BYTES,
+    FETCH_MAX_ROWS,
+    FETCH_SERVER_SIDE_CURSOR,
+    RESULT_CACHE_ENABLED,
+    SQL_STATEMENT_TIMEOUT_MS,
+)
+from backend.cache.result_cache import result_cache
+from backend.db.async_pool import async_connection_pools
+from backend.db.catalog import role_key
+from backend.db.pool import connection_pools
+from backend.db.result import ColumnarResult
+from backend.db.sql_guard import read_only_statements
+from backend.graph.nodes.sql_cache_lookup import remember_sql
+from backend.graph.nodes.sql_errors import attempt_entry, sql_error_update
 from backend.graph.state import QueryState
 
+CURSOR_NAME = "fetch_db_data"
+
+
+def _row_size(row: Tuple) -> int:
+    return sum(sys.getsizeof(value) for value in row)
+
+
+class _BoundedCollector:
+    """
+    Collects fetched batches column by column until FETCH_MAX_ROWS or
+    FETCH_MAX_BYTES is reached, so rows are never held twice (as tuples and
+    as columns). Shared by the sync and async fetch paths.
+    """
+
+    def __init__(self):
+        self.columns = []
+        self.row_count = 0
+        # Rows fetched with the batch that hit the cap but not kept
+        self.skipped = 0
+        self.size = 0
+        self.is_truncated = False
+
+    def add(self, batch: List[Tuple]) -> bool:
+        """Adds a batch and returns whether fetching should continue."""
+        if not batch:
+            return False
+        kept = []
+        for row in batch:
+            self.size += _row_size(row)
+            if self.row_count >= FETCH_MAX_ROWS or self.size > FETCH_MAX_BYTES:
+                self.is_truncated = True
+                self.skipped = len(batch) - len(kept)
+                break
+            kept.append(row)
+            self.row_count += 1
+        if kept:
+            if not self.columns:
+                self.columns = [[] for _ in kept[0]]
+            for values, batch_values in zip(self.columns, zip(*kept)):
+                values.extend(batch_values)
+        return not self.is_truncated
+
+    def result(self, cursor) -> ColumnarResult:
+        column_names = [desc[0] for desc in cursor.description]
+        return ColumnarResult.from_columns(
+            column_names, self.columns or [[] for _ in column_names]
+        )
+
+
+def _fetch_bounded(cursor) -> _BoundedCollector:
+    collector = _BoundedCollector()
+    while collector.add(cursor.fetchmany(FETCH_ITERSIZE)):
+        pass
+    return collector
 
-def fetch_db_data(state: QueryState) -> Dict[str, any]:
-    db_config_details = state["db_config"]
-    sql_query = state["sql"]
 
-    connection_string = (
-        f"dbname={db_config_details.get('database')} "
-        f"user={db_config_details.get('username')} "
-        f"password={db_config_details.get('password')} "
-        f"host={db_config_details.get('host')} "
-        f"port={db_config_details.get('port')}"
+async def _afetch_bounded(cursor) -> _BoundedCollector:
+    collector = _BoundedCollector()
+    while collector.add(await cursor.fetchmany(FETCH_ITERSIZE)):
+        pass
+    return collector
+
+
+def _count_remaining_rows(conn) -> Optional[int]:
+    # MOVE runs the rest of the query on the server without sending any rows
+    with conn.cursor() as cursor:
+        cursor.execute(f'MOVE FORWARD ALL IN "{CURSOR_NAME}"')
+        return cursor.rowcount if cursor.rowcount >= 0 else None
+
+
+async def _acount_remaining_rows(conn) -> Optional[int]:
+    cursor = await conn.execute(f'MOVE FORWARD ALL IN "{CURSOR_NAME}"')
+    return cursor.rowcount if cursor.rowcount >= 0 else None
+
+
+def _fetch_update(
+    collector: _BoundedCollector, cursor, remaining: Optional[int]
+) -> Dict[str, any]:
+    total_row_count = None
+    if not collector.is_truncated:
+        total_row_count = collector.row_count
+    elif remaining is not None:
+        # MOVE only counts the rows after the last fetched batch
+        total_row_count = collector.row_count + collector.skipped + remaining
+    elif not FETCH_SERVER_SIDE_CURSOR and cursor.rowcount >= 0:
+        total_row_count = cursor.rowcount
+    return {
+        "data": collector.result(cursor),
+        "is_truncated": collector.is_truncated,
+        "total_row_count": total_row_count,
+        "result_cache_hit": False,
+    }
+
+
+def _use_result_cache(state: QueryState) -> bool:
+    return (
+        RESULT_CACHE_ENABLED
+        and state.get("use_result_cache", True)
+        and bool(state.get("schema_fingerprint"))
     )
 
+
+def _cached_result(state: QueryState) -> Optional[Dict[str, any]]:
+    if not _use_result_cache(state):
+        return None
+    cached = result_cache.get(
+        role_key(state["db_config"]), state["schema_fingerprint"], state["sql"]
+    )
+    if cached is None:
+        return None
+    return {
+        "data": cached.data,
+        "is_truncated": cached.is_truncated,
+        "total_row_count": cached.total_row_count,
+        "result_cache_hit": True,
+    }
+
+
+def _remember_result(state: QueryState, update: Dict[str, any]) -> None:
+    # Opting out only skips the lookup, so the fresh result still refreshes the cache
+    if RESULT_CACHE_ENABLED and state.get("schema_fingerprint"):
+        result_cache.set(
+            role_key(state["db_config"]),
+            state["schema_fingerprint"],
+            state["sql"],
+            update["data"],
+            update["is_truncated"],
+            update["total_row_count"],
+        )
+
+
+def _count_truncated(collector: _BoundedCollector) -> bool:
+    return (
+        collector.is_truncated
+        and FETCH_SERVER_SIDE_CURSOR
+        and FETCH_COUNT_TRUNCATED_ROWS
+    )
+
+
+def fetch_db_data(state: QueryState) -> Dict[str, any]:
+    started = time.perf_counter()
+    sql_query = state["sql"]
+    cached = _cached_result(state)
+    if cached is not None:
+        # Newly generated SQL whose result is cached ran before as well
+        remember_sql(state)
+        return cached
+
     try:
-        with psycopg2.connect(connection_string) as conn:
-            with conn.cursor() as cursor:
+        with connection_pools.connection(state["db_config"]) as conn:
+            with conn.cursor() as setup:
+                for statement, params in read_only_statements(SQL_STATEMENT_TIMEOUT_MS):
+                    setup.execute(statement, params)
+            # A named cursor is server-side: rows arrive in batches of FETCH_ITERSIZE
+            # instead of the whole result being buffered by the client
+            cursor_name = CURSOR_NAME if FETCH_SERVER_SIDE_CURSOR else None
+            with conn.cursor(name=cursor_name) as cursor:
+                cursor.itersize = FETCH_ITERSIZE
                 cursor.execute(sql_query)
-                column_names = [desc[0] for desc in cursor.description]
-                rows = cursor.fetchall()
-                return {"data": [dict(zip(column_names, row)) for row in rows]}
+                collector = _fetch_bounded(cursor)
+                remaining = None
+                if _count_truncated(collector):
+                    remaining = _count_remaining_rows(conn)
+                update = _fetch_update(collector, cursor, remaining)
+        remember_sql(state)
+        _remember_result(state, update)
+        return {
+            **update,
+            **attempt_entry(state.get("sql_attempts", 0), "fetch", started),
+        }
 
     except psycopg2.Error as e:
-        error_message = str(e)
+        return sql_error_update(state, e, "fetch", started)
+
+
+async def afetch_db_data(state: QueryState) -> Dict[str, any]:
+    started = time.perf_counter()
+    sql_query = state["sql"]
+    cached = _cached_result(state)
+    if cached is not None:
+        # Newly generated SQL whose result is cached ran before as well
+        remember_sql(state)
+        return cached
+
+    try:
+        async with async_connection_pools.connection(state["db_config"]) as conn:
+            for statement, params in read_only_statements(SQL_STATEMENT_TIMEOUT_MS):
+                await conn.execute(statement, params)
+            cursor_name = CURSOR_NAME if FETCH_SERVER_SIDE_CURSOR else None
+            async with conn.cursor(name=cursor_name) as cursor:
+                if FETCH_SERVER_SIDE_CURSOR:
+                    cursor.itersize = FETCH_ITERSIZE
+                await cursor.execute(sql_query)
+                collector = await _afetch_bounded(cursor)
+                remaining = None
+                if _count_truncated(collector):
+                    remaining = await _acount_remaining_rows(conn)
+                update = _fetch_update(collector, cursor, remaining)
+        remember_sql(state)
+        _remember_result(state, update)
         return {
-            "is_error": True,
-            "messages": [HumanMessagePromptTemplate.from_template(error_message)],
+            **update,
+            **attempt_entry(state.get("sql_attempts", 0), "fetch", started),
         }
 
+    except psycopg.Error as e:
+        return sql_error_update(state, e, "fetch", started)
+
 
 if __name__ == "__main__":
     db_config = {
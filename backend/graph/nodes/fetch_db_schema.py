@@ -1,37 +1,34 @@
 from typing import Dict
 
-from langchain_community.utilities import SQLDatabase
-from langchain_community.agent_toolkits import SQLDatabaseToolkit
-from langchain_core.prompts import (
-    HumanMessagePromptTemplate,
-)
-from langchain_openai import ChatOpenAI
-
+from backend.config import SCHEMA_SAMPLE_ROWS
+from backend.db.async_pool import async_connection_pools
+from backend.db.introspection import DatabaseCatalog, render_ddl
+from backend.db.pool import connection_pools
+from backend.db.schema_refresh import arefresh_catalog, refresh_catalog
 from backend.graph.state import QueryState
-from dotenv import load_dotenv, find_dotenv
-
-load_dotenv(find_dotenv())
-llm = ChatOpenAI(temperature=0)
 
 
 def fetch_db_schema_details(state: QueryState) -> Dict[str, any]:
-    db_config_details = state["db_config"]
-    db = SQLDatabase.from_uri(
-        f"postgresql://{db_config_details.get("username")}:{db_config_details.get("password")}@{db_config_details.get("host")}:{db_config_details.get("port")}/{db_config_details.get("database")}"
-    )
-    toolkit = SQLDatabaseToolkit(db=db, llm=llm)
-    tools = toolkit.get_tools()
-    list_tables_tool = next(tool for tool in tools if tool.name == "sql_db_list_tables")
-    get_schema_tool = next(tool for tool in tools if tool.name == "sql_db_schema")
-    table_names = list_tables_tool.invoke("")
-    # return {"messages": [("user", get_schema_tool.invoke(table_names))]}
-    return {
-        "messages": [
-            HumanMessagePromptTemplate.from_template(
-                get_schema_tool.invoke(table_names)
-            ).format()
-        ]
-    }
+    with connection_pools.connection(state["db_config"]) as conn:
+        # Only the tables changed since the last read of this database are introspected
+        catalog, _ = refresh_catalog(
+            conn, state["db_config"], sample_rows=SCHEMA_SAMPLE_ROWS
+        )
+    return _schema_details(catalog)
+
+
+async def afetch_db_schema_details(state: QueryState) -> Dict[str, any]:
+    async with async_connection_pools.connection(state["db_config"]) as conn:
+        catalog, _ = await arefresh_catalog(
+            conn, state["db_config"], sample_rows=SCHEMA_SAMPLE_ROWS
+        )
+    return _schema_details(catalog)
+
+
+def _schema_details(catalog: DatabaseCatalog) -> Dict[str, any]:
+    # Only the structured catalog is kept; the prompt gets the compact schema
+    # rendered from it by format_db_schema
+    return {"db_catalog": catalog}
 
 
 if __name__ == "__main__":
@@ -43,4 +40,4 @@ if __name__ == "__main__":
         "password": "password",
     }
     state = QueryState(db_config=db_config)
-    print(fetch_db_schema_details(state))
+    print(render_ddl(fetch_db_schema_details(state)["db_catalog"]))
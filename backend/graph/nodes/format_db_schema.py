@@ -1,25 +1,178 @@
-from typing import Dict
+import hashlib
+from typing import Dict, List, Tuple
 
 from langchain_core.prompts import HumanMessagePromptTemplate
 
-from backend.graph.nodes.fetch_db_schema import fetch_db_schema_details
+from backend.cache.schema_cache import schema_cache, schema_description_cache
+from backend.config import (
+    SCHEMA_DESCRIPTION_BATCH_TOKENS,
+    SCHEMA_DESCRIPTION_CONCURRENCY,
+    SCHEMA_DESCRIPTIONS_ENABLED,
+    SCHEMA_PROMPT_MAX_TOKENS,
+)
+from backend.db.catalog import schema_cache_key
+from backend.db.async_pool import async_connection_pools
+from backend.db.introspection import aintrospect_database, introspect_database
+from backend.db.pool import connection_pools
+from backend.db.schema_builder import build_database_schema
+from backend.db.schema_prompt import render_compact_schema, schema_batches
 from backend.graph.state import QueryState
 
-from backend.graph.chains.db_schema_formatter import db_schema_formatter_chain
-import json
+from backend.graph.chains.db_schema_formatter import (
+    DatabaseSchema,
+    SchemaDescriptions,
+    TableDescription,
+    TableInfo,
+    apply_schema_descriptions,
+    get_db_schema_formatter_chain,
+)
 
-
-def format_db_schema(state: QueryState) -> Dict[str, any]:
-    all_table_schema = state["messages"][-1].content
-    # print(f"Schema : {all_table_schema}")
-    schema = db_schema_formatter_chain.invoke({"ddl": all_table_schema})
-    template = """
-    The following is database schema:
+SCHEMA_TEMPLATE = """
+    The following is database schema, one table per line as
+    table(column type [pk] [fk→table.column] [note] [e.g. example], ...) -- description:
     {schema}
     """
-    schema_str = schema.json()
-    prompt = HumanMessagePromptTemplate.from_template(template)
-    return {"messages": [prompt.format(schema=schema_str)]}
+
+
+def schema_message(schema_str: str):
+    prompt = HumanMessagePromptTemplate.from_template(SCHEMA_TEMPLATE)
+    return prompt.format(schema=schema_str)
+
+
+def _description_cache_key(table: TableInfo) -> str:
+    # Example values come from the data, so they do not invalidate a description
+    structure = table.model_dump_json(
+        exclude_none=True, exclude={"columns": {"__all__": {"example"}}}
+    )
+    return "table-description@" + hashlib.sha256(structure.encode("utf-8")).hexdigest()
+
+
+def _cached_descriptions(
+    schema: DatabaseSchema,
+) -> Tuple[List[TableDescription], List[TableInfo]]:
+    described, missing = [], []
+    for table in schema.tables:
+        cached = schema_description_cache.get(_description_cache_key(table))
+        if cached is not None:
+            described.append(TableDescription.model_validate_json(cached))
+        else:
+            missing.append(table)
+    return described, missing
+
+
+def _batch_inputs(batches: List[List[TableInfo]]) -> List[Dict[str, str]]:
+    return [
+        {"schema": DatabaseSchema(tables=batch).model_dump_json(exclude_none=True)}
+        for batch in batches
+    ]
+
+
+def _remember_descriptions(
+    batches: List[List[TableInfo]], results: List
+) -> Tuple[List[TableDescription], bool]:
+    described, failed = [], False
+    for batch, result in zip(batches, results):
+        # A failed batch (e.g. over the context limit) leaves its tables with the
+        # catalog comments only; they are retried the next time the schema is formatted
+        if isinstance(result, Exception):
+            failed = True
+            continue
+        descriptions = {table.table_name: table for table in result.tables}
+        for table in batch:
+            description = descriptions.get(table.table_name)
+            if description is None:
+                continue
+            schema_description_cache.set(
+                _description_cache_key(table), description.model_dump_json()
+            )
+            described.append(description)
+    return described, failed
+
+
+def describe_schema(schema: DatabaseSchema) -> Tuple[DatabaseSchema, bool]:
+    """
+    Returns the schema with its table descriptions, and whether a describer
+    batch failed, leaving some tables without one.
+    """
+    described, missing = _cached_descriptions(schema)
+    failed = False
+    if missing:
+        # Map: one describer call per batch of tables, reduce: merge the results
+        batches = schema_batches(missing, SCHEMA_DESCRIPTION_BATCH_TOKENS)
+        results = get_db_schema_formatter_chain().batch(
+            _batch_inputs(batches),
+            config={"max_concurrency": SCHEMA_DESCRIPTION_CONCURRENCY},
+            return_exceptions=True,
+        )
+        remembered, failed = _remember_descriptions(batches, results)
+        described += remembered
+    described_schema = apply_schema_descriptions(
+        schema, SchemaDescriptions(tables=described)
+    )
+    return described_schema, failed
+
+
+async def adescribe_schema(schema: DatabaseSchema) -> Tuple[DatabaseSchema, bool]:
+    described, missing = _cached_descriptions(schema)
+    failed = False
+    if missing:
+        batches = schema_batches(missing, SCHEMA_DESCRIPTION_BATCH_TOKENS)
+        results = await get_db_schema_formatter_chain().abatch(
+            _batch_inputs(batches),
+            config={"max_concurrency": SCHEMA_DESCRIPTION_CONCURRENCY},
+            return_exceptions=True,
+        )
+        remembered, failed = _remember_descriptions(batches, results)
+        described += remembered
+    described_schema = apply_schema_descriptions(
+        schema, SchemaDescriptions(tables=described)
+    )
+    return described_schema, failed
+
+
+def format_db_schema(state: QueryState) -> Dict[str, any]:
+    catalog = state.get("db_catalog")
+    if catalog is None:
+        with connection_pools.connection(state["db_config"]) as conn:
+            catalog = introspect_database(conn)
+    schema = build_database_schema(catalog)
+    partial = False
+    if SCHEMA_DESCRIPTIONS_ENABLED:
+        schema, partial = describe_schema(schema)
+    return _formatted_schema(state, schema, partial)
+
+
+async def aformat_db_schema(state: QueryState) -> Dict[str, any]:
+    catalog = state.get("db_catalog")
+    if catalog is None:
+        async with async_connection_pools.connection(state["db_config"]) as conn:
+            catalog = await aintrospect_database(conn)
+    schema = build_database_schema(catalog)
+    partial = False
+    if SCHEMA_DESCRIPTIONS_ENABLED:
+        schema, partial = await adescribe_schema(schema)
+    return _formatted_schema(state, schema, partial)
+
+
+def schema_update(schema_str: str, schema: DatabaseSchema) -> Dict[str, any]:
+    # The schema is kept in dedicated fields, outside the message history
+    return {
+        "db_schema": schema_str,
+        "database_schema": schema,
+        "schema_prompt": render_compact_schema(schema, SCHEMA_PROMPT_MAX_TOKENS),
+    }
+
+
+def _formatted_schema(
+    state: QueryState, schema: DatabaseSchema, partial: bool
+) -> Dict[str, any]:
+    schema_str = schema.model_dump_json(exclude_none=True)
+    fingerprint = state.get("schema_fingerprint")
+    # A partially described schema is used for this request only, so the next
+    # one describes the missing tables again instead of finding it cached
+    if fingerprint and not partial:
+        schema_cache.set(schema_cache_key(state["db_config"], fingerprint), schema_str)
+    return schema_update(schema_str, schema)
 
 
 if __name__ == "__main__":
@@ -31,6 +184,5 @@ if __name__ == "__main__":
         "password": "password",
     }
     state = QueryState(db_config=db_config)
-    state["messages"] = fetch_db_schema_details(state)["messages"]
     result = format_db_schema(state)
-    pass
+    print(result["schema_prompt"])
@@ -0,0 +1,9 @@
+import threading
+from typing import Dict
+
+from backend.graph.state import QueryState
+
+
+def prepare_request(state: QueryState) -> Dict[str, any]:
+    # Shared by the parallel branches so a failing branch can stop the other one
+    return {"cancellation": threading.Event()}
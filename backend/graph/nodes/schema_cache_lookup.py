@@ -0,0 +1,72 @@
+from typing import Dict
+
+import psycopg
+import psycopg2
+
+from backend.cache.schema_cache import schema_cache
+from backend.db.async_pool import async_connection_pools
+from backend.db.catalog import (
+    afetch_catalog_fingerprint,
+    fetch_catalog_fingerprint,
+    schema_cache_key,
+)
+from backend.db.pool import connection_pools
+from backend.graph.chains.db_schema_formatter import DatabaseSchema
+from backend.graph.nodes.format_db_schema import schema_update
+from backend.graph.schema_refresher import schema_refresher
+from backend.graph.state import QueryState
+
+
+def schema_cache_lookup(state: QueryState) -> Dict[str, any]:
+    if state.get("db_schema"):
+        # Resolved once by the caller and passed in with the request
+        return {"schema_cache_hit": True}
+    db_config = state["db_config"]
+    if state.get("schema_fingerprint"):
+        # Already read by the SQL cache lookup for this request
+        return _lookup(db_config, state["schema_fingerprint"])
+    try:
+        with connection_pools.connection(db_config) as conn:
+            fingerprint = fetch_catalog_fingerprint(conn)
+    except psycopg2.Error:
+        # Without a fingerprint the cache cannot be trusted, so fetch the schema again
+        return {"schema_fingerprint": None, "schema_cache_hit": False}
+    return _lookup(db_config, fingerprint)
+
+
+async def aschema_cache_lookup(state: QueryState) -> Dict[str, any]:
+    if state.get("db_schema"):
+        return {"schema_cache_hit": True}
+    db_config = state["db_config"]
+    if state.get("schema_fingerprint"):
+        return _lookup(db_config, state["schema_fingerprint"])
+    try:
+        async with async_connection_pools.connection(db_config) as conn:
+            fingerprint = await afetch_catalog_fingerprint(conn)
+    except psycopg.Error:
+        return {"schema_fingerprint": None, "schema_cache_hit": False}
+    return _lookup(db_config, fingerprint)
+
+
+def _lookup(db_config: Dict[str, str], fingerprint: str) -> Dict[str, any]:
+    schema_refresher.watch(db_config)
+    schema_str = schema_cache.get(schema_cache_key(db_config, fingerprint))
+    if schema_str is None:
+        return {"schema_fingerprint": fingerprint, "schema_cache_hit": False}
+    return {
+        "schema_fingerprint": fingerprint,
+        "schema_cache_hit": True,
+        **schema_update(schema_str, DatabaseSchema.model_validate_json(schema_str)),
+    }
+
+
+if __name__ == "__main__":
+    db_config = {
+        "host": "localhost",
+        "port": "6432",
+        "database": "online_store",
+        "username": "admin",
+        "password": "password",
+    }
+    state = QueryState(db_config=db_config)
+    print(schema_cache_lookup(state))
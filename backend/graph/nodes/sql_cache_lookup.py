@@ -0,0 +1,95 @@
+from typing import Dict, Optional
+
+import psycopg
+import psycopg2
+
+from backend.cache.sql_cache import sql_cache
+from backend.config import SQL_CACHE_ENABLED
+from backend.db.async_pool import async_connection_pools
+from backend.db.catalog import (
+    afetch_catalog_fingerprint,
+    fetch_catalog_fingerprint,
+    role_key,
+)
+from backend.db.pool import connection_pools
+from backend.graph.state import QueryState
+
+
+def sql_cache_lookup(state: QueryState) -> Dict[str, any]:
+    if not SQL_CACHE_ENABLED:
+        return {"question": state["messages"][-1].content, "sql_cache_hit": False}
+    if state.get("db_schema"):
+        # Schema resolved by the caller (e.g. once for a batch), with its fingerprint
+        return _lookup(state, state.get("schema_fingerprint"))
+    try:
+        with connection_pools.connection(state["db_config"]) as conn:
+            fingerprint = fetch_catalog_fingerprint(conn)
+    except psycopg2.Error:
+        # Left to the db config checker to explain
+        fingerprint = None
+    return _lookup(state, fingerprint)
+
+
+async def asql_cache_lookup(state: QueryState) -> Dict[str, any]:
+    if not SQL_CACHE_ENABLED:
+        return {"question": state["messages"][-1].content, "sql_cache_hit": False}
+    if state.get("db_schema"):
+        return _lookup(state, state.get("schema_fingerprint"))
+    try:
+        async with async_connection_pools.connection(state["db_config"]) as conn:
+            fingerprint = await afetch_catalog_fingerprint(conn)
+    except psycopg.Error:
+        fingerprint = None
+    return _lookup(state, fingerprint)
+
+
+def _lookup(state: QueryState, fingerprint: Optional[str]) -> Dict[str, any]:
+    question = state["messages"][-1].content
+    if fingerprint is None:
+        return {"question": question, "sql_cache_hit": False}
+    # The fingerprint is reused by the schema cache lookup on a miss
+    sql = sql_cache.get(role_key(state["db_config"]), fingerprint, question)
+    update = {
+        "question": question,
+        "schema_fingerprint": fingerprint,
+        "sql_cache_hit": sql is not None,
+    }
+    if sql is not None:
+        update["sql"] = sql
+    return update
+
+
+def remember_sql(state: QueryState) -> None:
+    """Caches SQL that was generated for this request and ran successfully."""
+    if not SQL_CACHE_ENABLED or state.get("sql_cache_hit"):
+        return
+    fingerprint = state.get("schema_fingerprint")
+    question = state.get("question")
+    if fingerprint and question and state.get("sql"):
+        sql_cache.set(role_key(state["db_config"]), fingerprint, question, state["sql"])
+
+
+def forget_sql(state: QueryState) -> None:
+    """Drops the cached SQL of this request, e.g. after it failed to run."""
+    fingerprint = state.get("schema_fingerprint")
+    question = state.get("question")
+    if fingerprint and question:
+        sql_cache.forget(role_key(state["db_config"]), fingerprint, question)
+
+
+if __name__ == "__main__":
+    from langchain_core.messages import HumanMessage
+
+    db_config = {
+        "host": "localhost",
+        "port": "6432",
+        "database": "online_store",
+        "username": "admin",
+        "password": "password",
+    }
+    state = QueryState(
+        db_config=db_config,
+        messages=[HumanMessage("Is there any customer who ordered multiple times?")],
+    )
+    print(sql_cache_lookup(state))
+    print(sql_cache.stats())
@@ -0,0 +1,149 @@
+import time
+from typing import Dict, Optional
+
+import psycopg
+import psycopg2
+
+from backend.config import (
+    FETCH_MAX_ROWS,
+    SQL_COST_ACTION,
+    SQL_GUARD_ENABLED,
+    SQL_MAX_ATTEMPTS,
+    SQL_MAX_COST,
+    SQL_MAX_PLAN_ROWS,
+    SQL_STATEMENT_TIMEOUT_MS,
+)
+from backend.db.async_pool import async_connection_pools
+from backend.db.pool import connection_pools
+from backend.db.sql_guard import (
+    SqlPlanEstimate,
+    add_limit,
+    check_read_only,
+    explain_query,
+    has_top_level_limit,
+    parse_plan,
+    read_only_statements,
+)
+from backend.graph.nodes.sql_errors import attempt_entry, sql_error_update
+from backend.graph.state import QueryState
+
+
+def _exceeds_limits(estimate: SqlPlanEstimate) -> bool:
+    return estimate.total_cost > SQL_MAX_COST or estimate.plan_rows > SQL_MAX_PLAN_ROWS
+
+
+def _should_add_limit(sql: str, estimate: SqlPlanEstimate) -> bool:
+    return (
+        SQL_COST_ACTION == "limit"
+        and _exceeds_limits(estimate)
+        and not has_top_level_limit(sql)
+    )
+
+
+def _describe(estimate: SqlPlanEstimate) -> str:
+    return (
+        f"estimated cost {estimate.total_cost:,.0f} (limit {SQL_MAX_COST:,.0f}) and "
+        f"{estimate.plan_rows:,.0f} rows (limit {SQL_MAX_PLAN_ROWS:,.0f})"
+    )
+
+
+def _gate(
+    state: QueryState, sql: str, estimate: SqlPlanEstimate, started: float
+) -> Dict[str, any]:
+    summary = {"total_cost": estimate.total_cost, "plan_rows": estimate.plan_rows}
+    timing = attempt_entry(state.get("sql_attempts", 0), "check", started)
+    if not _exceeds_limits(estimate):
+        return {"sql": sql, "sql_estimate": summary, "sql_feedback": None, **timing}
+    if (
+        SQL_COST_ACTION == "regenerate"
+        and state.get("sql_attempts", 0) < SQL_MAX_ATTEMPTS
+    ):
+        return {
+            **timing,
+            "sql_estimate": summary,
+            "sql_feedback": (
+                f"The query is too expensive to run: {_describe(estimate)}. Make it "
+                "more selective with filters, aggregation or a LIMIT."
+            ),
+        }
+    return {
+        **timing,
+        "is_error": True,
+        "sql_estimate": summary,
+        "error_explanation": (
+            f"The generated query was not run because it is too expensive: "
+            f"{_describe(estimate)}. Try a more specific question."
+        ),
+    }
+
+
+def _rejected(sql: str) -> Optional[Dict[str, any]]:
+    reason = check_read_only(sql)
+    if reason is None:
+        return None
+    return {"is_error": True, "error_explanation": reason}
+
+
+def check_sql(state: QueryState) -> Dict[str, any]:
+    started = time.perf_counter()
+    sql = state["sql"]
+    rejected = _rejected(sql)
+    if rejected is not None:
+        return rejected
+    if not SQL_GUARD_ENABLED:
+        return {"sql_feedback": None}
+
+    try:
+        with connection_pools.connection(state["db_config"]) as conn:
+            with conn.cursor() as cursor:
+                for statement, params in read_only_statements(SQL_STATEMENT_TIMEOUT_MS):
+                    cursor.execute(statement, params)
+                cursor.execute(explain_query(sql))
+                estimate = parse_plan(cursor.fetchone()[0])
+                if _should_add_limit(sql, estimate):
+                    sql = add_limit(sql, FETCH_MAX_ROWS + 1)
+                    cursor.execute(explain_query(sql))
+                    estimate = parse_plan(cursor.fetchone()[0])
+    except psycopg2.Error as e:
+        return sql_error_update(state, e, "check", started)
+    return _gate(state, sql, estimate, started)
+
+
+async def acheck_sql(state: QueryState) -> Dict[str, any]:
+    started = time.perf_counter()
+    sql = state["sql"]
+    rejected = _rejected(sql)
+    if rejected is not None:
+        return rejected
+    if not SQL_GUARD_ENABLED:
+        return {"sql_feedback": None}
+
+    try:
+        async with async_connection_pools.connection(state["db_config"]) as conn:
+            async with conn.cursor() as cursor:
+                for statement, params in read_only_statements(SQL_STATEMENT_TIMEOUT_MS):
+                    await cursor.execute(statement, params)
+                await cursor.execute(explain_query(sql))
+                estimate = parse_plan((await cursor.fetchone())[0])
+                if _should_add_limit(sql, estimate):
+                    sql = add_limit(sql, FETCH_MAX_ROWS + 1)
+                    await cursor.execute(explain_query(sql))
+                    estimate = parse_plan((await cursor.fetchone())[0])
+    except psycopg.Error as e:
+        return sql_error_update(state, e, "check", started)
+    return _gate(state, sql, estimate, started)
+
+
+if __name__ == "__main__":
+    db_config = {
+        "host": "localhost",
+        "port": "6432",
+        "database": "online_store",
+        "username": "admin",
+        "password": "password",
+    }
+    state = QueryState(
+        db_config=db_config,
+        sql="SELECT * FROM orders o CROSS JOIN order_items oi CROSS JOIN products p",
+    )
+    print(check_sql(state))
@@ -0,0 +1,55 @@
+import time
+from typing import Dict, Optional
+
+from backend.config import SQL_MAX_ATTEMPTS
+from backend.graph.nodes.sql_cache_lookup import forget_sql
+from backend.graph.state import QueryState
+
+# SQLSTATE classes a regenerated query can fix: syntax errors, unknown or
+# ambiguous tables/columns/functions, type mismatches and data exceptions
+RETRYABLE_SQLSTATE_CLASSES = ("42", "22")
+# Statement timeout: worth retrying with a cheaper query
+RETRYABLE_SQLSTATES = {"57014"}
+# Missing privileges do not go away by rewriting the query
+NON_RETRYABLE_SQLSTATES = {"42501"}
+
+
+def is_retryable(error: Exception) -> bool:
+    sqlstate = getattr(error, "pgcode", None) or getattr(error, "sqlstate", None)
+    if not sqlstate or sqlstate in NON_RETRYABLE_SQLSTATES:
+        return False
+    return sqlstate in RETRYABLE_SQLSTATES or sqlstate[:2] in RETRYABLE_SQLSTATE_CLASSES
+
+
+def attempt_entry(
+    attempt: int, stage: str, started: float, error: Optional[str] = None
+) -> Dict[str, any]:
+    entry = {
+        "attempt": attempt,
+        "stage": stage,
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+    if error:
+        entry["error"] = error
+    return {"sql_attempt_log": [entry]}
+
+
+def sql_error_update(
+    state: QueryState, error: Exception, stage: str, started: float
+) -> Dict[str, any]:
+    """
+    Sends a fixable database error back to the SQL generator while attempts
+    remain, otherwise fails the request with the error. Cached SQL that fails
+    is dropped from the SQL cache, so it is regenerated rather than reused.
+    """
+    error_message = str(error).strip()
+    update = attempt_entry(state.get("sql_attempts", 0), stage, started, error_message)
+    if state.get("sql_cache_hit"):
+        forget_sql(state)
+        update["sql_cache_hit"] = False
+    if is_retryable(error) and state.get("sql_attempts", 0) < SQL_MAX_ATTEMPTS:
+        update["sql_feedback"] = error_message
+        return update
+    update["is_error"] = True
+    update["error_explanation"] = error_message
+    return update
@@ -1,14 +1,111 @@
-from typing import Dict
+import time
+from typing import Dict, List
 
+from langchain_core.prompts import HumanMessagePromptTemplate
+
+from backend.config import (
+    SCHEMA_PROMPT_MAX_TOKENS,
+    SCHEMA_RETRIEVAL_ENABLED,
+    SCHEMA_RETRIEVAL_MAX_JOIN_HOPS,
+    SCHEMA_RETRIEVAL_MIN_TABLES,
+    SCHEMA_RETRIEVAL_TOP_K,
+)
+from backend.db.schema_prompt import render_compact_schema
+from backend.graph.nodes.format_db_schema import schema_message
+from backend.graph.nodes.sql_errors import attempt_entry
 from backend.graph.state import QueryState
-from backend.graph.chains.sql_query_generator import sql_query_generator_chain
+from backend.graph.chains.sql_query_generator import get_sql_query_generator_chain
+from backend.retrieval.table_index import table_indexes
 
+FEEDBACK_TEMPLATE = """
+    The previous query failed:
+    {sql}
+    Reason: {feedback}
+    Generate a corrected query.
+    """
 
-def sql_generation(state: QueryState) -> Dict[str, any]:
-    result = sql_query_generator_chain.invoke({"messages": state["messages"]})
+JOIN_PATHS_TEMPLATE = """
+    Tables can be joined along these foreign key paths:
+    {join_paths}
+    """
+
+
+def _generator_messages(state: QueryState) -> List:
+    feedback = state.get("sql_feedback")
+    # A retry only needs the question, the schema and the error, not the history
+    messages = _question_and_schema(state, compact=bool(feedback))
+    if feedback:
+        messages = messages + [
+            HumanMessagePromptTemplate.from_template(FEEDBACK_TEMPLATE).format(
+                sql=state["sql"], feedback=state["sql_feedback"]
+            )
+        ]
+    return messages
+
+
+def _question_message(question: str):
+    return HumanMessagePromptTemplate.from_template("{question}").format(
+        question=question
+    )
+
+
+def _question_and_schema(state: QueryState, compact: bool) -> List:
+    question = state.get("question")
+    if compact and question:
+        messages = [_question_message(question)]
+    else:
+        messages = state["messages"]
+    schema_str = state.get("db_schema")
+    if not schema_str:
+        return messages
+    index = table_indexes.get(schema_str) if SCHEMA_RETRIEVAL_ENABLED else None
+    if index is None or len(index.tables) <= SCHEMA_RETRIEVAL_MIN_TABLES:
+        return messages + [schema_message(state["schema_prompt"])]
+
+    # Large schemas: send only the relevant tables so the prompt size stays flat
+    schema, join_paths = index.select(
+        question, SCHEMA_RETRIEVAL_TOP_K, SCHEMA_RETRIEVAL_MAX_JOIN_HOPS
+    )
+    messages = messages + [
+        schema_message(render_compact_schema(schema, SCHEMA_PROMPT_MAX_TOKENS))
+    ]
+    if join_paths:
+        paths = "\n".join(" -> ".join(path) for path in join_paths)
+        messages.append(
+            HumanMessagePromptTemplate.from_template(JOIN_PATHS_TEMPLATE).format(
+                join_paths=paths
+            )
+        )
+    return messages
+
+
+def _sql_generation_update(state: QueryState, result, started: float) -> Dict[str, any]:
+    attempt = state.get("sql_attempts", 0) + 1
     if result.is_error:
         return {
             "is_error": result.is_error,
             "error_explanation": result.error_explanation,
+            **attempt_entry(attempt, "generation", started, result.error_explanation),
         }
-    return {"sql": result.query}
+    return {
+        "sql": result.query,
+        "sql_attempts": attempt,
+        "sql_feedback": None,
+        **attempt_entry(attempt, "generation", started),
+    }
+
+
+def sql_generation(state: QueryState) -> Dict[str, any]:
+    started = time.perf_counter()
+    result = get_sql_query_generator_chain().invoke(
+        {"messages": _generator_messages(state)}
+    )
+    return _sql_generation_update(state, result, started)
+
+
+async def asql_generation(state: QueryState) -> Dict[str, any]:
+    started = time.perf_counter()
+    result = await get_sql_query_generator_chain().ainvoke(
+        {"messages": _generator_messages(state)}
+    )
+    return _sql_generation_update(state, result, started)
@@ -1,20 +1,55 @@
-from typing import Dict
+from typing import Dict, Optional
 
-from backend.graph.state import QueryState
+from backend.classifier.intent import intent_classifier
+from backend.config import INPUT_CLASSIFIER_ENABLED
+from backend.graph.state import QueryState, cancel
 from backend.graph.chains.user_input_validator import (
-    user_input_validator_chain,
+    get_user_input_validator_chain,
     UserInputValidator,
 )
 
 
-def user_input_validator_agent(state: QueryState) -> Dict[str, any]:
-    user_input = state["messages"][-1].content
-    result: UserInputValidator = user_input_validator_chain.invoke(
-        {"question": user_input}
-    )
+def _validation_update(state: QueryState, result: UserInputValidator) -> Dict[str, any]:
     if result.is_error:
+        cancel(state)
         return {
             "is_error": result.is_error,
             "error_explanation": result.error_explanation,
         }
     return {"is_error": False}
+
+
+def _classify_locally(user_input: str) -> Optional[UserInputValidator]:
+    # Clear selection or modification requests skip the LLM round trip
+    if not INPUT_CLASSIFIER_ENABLED:
+        return None
+    decision = intent_classifier.classify(user_input)
+    if decision is None:
+        return None
+    if not decision.is_error:
+        return UserInputValidator(is_error=False)
+    return UserInputValidator(
+        is_error=True, error_explanation=decision.error_explanation
+    )
+
+
+def user_input_validator_agent(state: QueryState) -> Dict[str, any]:
+    user_input = state["messages"][-1].content
+    result = _classify_locally(user_input)
+    if result is not None:
+        return _validation_update(state, result)
+    result: UserInputValidator = get_user_input_validator_chain().invoke(
+        {"question": user_input}
+    )
+    return _validation_update(state, result)
+
+
+async def auser_input_validator_agent(state: QueryState) -> Dict[str, any]:
+    user_input = state["messages"][-1].content
+    result = _classify_locally(user_input)
+    if result is not None:
+        return _validation_update(state, result)
+    result: UserInputValidator = await get_user_input_validator_chain().ainvoke(
+        {"question": user_input}
+    )
+    return _validation_update(state, result)
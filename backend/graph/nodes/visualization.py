@@ -0,0 +1,15 @@
+from typing import Dict
+
+from backend.graph.state import QueryState
+from backend.graph.chains.visualizer import (
+    asuggest_visualization,
+    suggest_visualization,
+)
+
+
+def plan_chart(state: QueryState) -> Dict[str, any]:
+    return {"visualization": suggest_visualization(state["sql"], state["data"])}
+
+
+async def aplan_chart(state: QueryState) -> Dict[str, any]:
+    return {"visualization": await asuggest_visualization(state["sql"], state["data"])}
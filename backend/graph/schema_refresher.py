@@ -0,0 +1,78 @@
+import threading
+from typing import Dict, Optional
+
+from backend.cache.schema_cache import schema_cache
+from backend.config import (
+    SCHEMA_REFRESH_INTERVAL,
+    SCHEMA_RETRIEVAL_ENABLED,
+    SCHEMA_SAMPLE_ROWS,
+)
+from backend.db.catalog import fetch_catalog_fingerprint, role_key, schema_cache_key
+from backend.db.pool import connection_pools
+from backend.db.schema_refresh import SchemaChanges, refresh_catalog
+from backend.graph.nodes.format_db_schema import format_db_schema
+from backend.retrieval.table_index import table_indexes
+
+
+class SchemaRefresher:
+    """
+    Refreshes the schema of every database the graph has seen each
+    ``interval`` seconds, in a daemon thread started by the first ``watch``.
+    Changed tables are introspected and described in the background, so the
+    next question finds the new schema in the schema cache.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._databases: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, db_config: Dict[str, str]) -> None:
+        if self.interval <= 0:
+            return
+        with self._lock:
+            self._databases[role_key(db_config)] = dict(db_config)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="schema-refresher", daemon=True
+                )
+                self._thread.start()
+
+    def refresh(self, db_config: Dict[str, str]) -> SchemaChanges:
+        with connection_pools.connection(db_config) as conn:
+            fingerprint = fetch_catalog_fingerprint(conn)
+            if schema_cache.get(schema_cache_key(db_config, fingerprint)) is not None:
+                return SchemaChanges([], [], [])
+            catalog, changes = refresh_catalog(
+                conn, db_config, sample_rows=SCHEMA_SAMPLE_ROWS
+            )
+        update = format_db_schema(
+            {
+                "db_config": db_config,
+                "db_catalog": catalog,
+                "schema_fingerprint": fingerprint,
+            }
+        )
+        if SCHEMA_RETRIEVAL_ENABLED:
+            table_indexes.get(update["db_schema"])
+        return changes
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                databases = list(self._databases.values())
+            for db_config in databases:
+                try:
+                    self.refresh(db_config)
+                except Exception:
+                    # Unreachable database or failed LLM call: retried next interval,
+                    # and requests still fall back to fetching the schema themselves
+                    continue
+
+
+schema_refresher = SchemaRefresher(SCHEMA_REFRESH_INTERVAL)
@@ -1,14 +1,79 @@
-from typing import List, Dict, TypedDict, Annotated
+import operator
+import threading
+from typing import List, Dict, TypedDict, Annotated, Optional
 
 from langgraph.graph import add_messages
-from marshmallow.fields import Boolean
+
+from backend.db.introspection import DatabaseCatalog
+from backend.db.result import ColumnarResult
+from backend.graph.chains.db_schema_formatter import DatabaseSchema
+from backend.graph.chains.visualizer import VisualizationConfig
+
+
+def _as_bool(value) -> bool:
+    # Structured LLM output occasionally returns "True"/"False" strings
+    return value == "True" if isinstance(value, str) else bool(value)
+
+
+def merge_is_error(left, right) -> bool:
+    # Parallel branches may both report; any failure fails the request
+    return _as_bool(left) or _as_bool(right)
+
+
+def keep_first_explanation(left: str, right: str) -> str:
+    return left or right
 
 
 class QueryState(TypedDict):
     db_config: Dict[str, str]
+    cancellation: threading.Event
+    question: str
+    schema_fingerprint: Optional[str]
+    sql_cache_hit: bool
+    schema_cache_hit: bool
+    db_catalog: DatabaseCatalog
+    # JSON of the structured schema (cache and index key), the schema itself
+    # and its compact rendering for prompts
+    db_schema: str
+    database_schema: DatabaseSchema
+    schema_prompt: str
     messages: Annotated[list, add_messages]
-    is_error: Boolean
-    error_explanation: str
+    is_error: Annotated[bool, merge_is_error]
+    error_explanation: Annotated[str, keep_first_explanation]
     sql: str
-    data: List[Dict[str, any]]
+    sql_attempts: int
+    sql_feedback: Optional[str]
+    sql_estimate: Optional[Dict[str, float]]
+    sql_attempt_log: Annotated[List[Dict[str, any]], operator.add]
+    use_result_cache: bool
+    result_cache_hit: bool
+    data: ColumnarResult
+    is_truncated: bool
+    total_row_count: Optional[int]
     explanation: str
+    visualization: VisualizationConfig
+
+
+class SchemaPreparationOutput(TypedDict):
+    # Fields the schema branch hands back to the main graph. Returning its whole
+    # state would add the SQL attempt log to itself when the branch runs to
+    # regenerate failed cached SQL.
+    is_error: Annotated[bool, merge_is_error]
+    error_explanation: Annotated[str, keep_first_explanation]
+    schema_fingerprint: Optional[str]
+    schema_cache_hit: bool
+    db_catalog: DatabaseCatalog
+    db_schema: str
+    database_schema: DatabaseSchema
+    schema_prompt: str
+
+
+def is_cancelled(state: QueryState) -> bool:
+    cancellation = state.get("cancellation")
+    return cancellation is not None and cancellation.is_set()
+
+
+def cancel(state: QueryState) -> None:
+    cancellation = state.get("cancellation")
+    if cancellation is not None:
+        cancellation.set()
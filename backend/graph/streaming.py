@@ -0,0 +1,57 @@
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+from langchain_core.utils.json import parse_partial_json
+
+from backend.graph.consts import DATA_EXPLAINER_NODE
+from backend.graph.graph import compiled_graph
+
+UPDATE = "update"
+EXPLANATION = "explanation"
+
+
+class GraphEvent(NamedTuple):
+    # UPDATE: value is the state update returned by ``node``;
+    # EXPLANATION: value is the explanation written so far
+    kind: str
+    node: str
+    value: Any
+
+
+def _explanation_so_far(arguments: str) -> Optional[str]:
+    # The explainer answers with a DataExplain tool call whose JSON arguments
+    # arrive in fragments, e.g. '{"explanation": "The orders wi'
+    try:
+        parsed = parse_partial_json(arguments)
+    except ValueError:
+        return None
+    if isinstance(parsed, dict):
+        return parsed.get("explanation")
+    return None
+
+
+def stream_request(request: Dict[str, Any]) -> Iterator[GraphEvent]:
+    """
+    Runs the graph on ``request`` and yields each node's state update as soon
+    as the node finishes, plus the partial explanation while the data
+    explainer's tokens arrive, so callers can show the SQL and the data long
+    before the explanation and the chart are done.
+    """
+    arguments = ""
+    explanation = None
+    for mode, chunk in compiled_graph().stream(
+        request, stream_mode=["updates", "messages"]
+    ):
+        if mode == "updates":
+            for node, update in chunk.items():
+                yield GraphEvent(UPDATE, node, update or {})
+            continue
+
+        message, metadata = chunk
+        if metadata.get("langgraph_node") != DATA_EXPLAINER_NODE:
+            continue
+        for tool_call in getattr(message, "tool_call_chunks", None) or []:
+            arguments += tool_call.get("args") or ""
+        text = _explanation_so_far(arguments) if arguments else None
+        if text and text != explanation:
+            explanation = text
+            yield GraphEvent(EXPLANATION, DATA_EXPLAINER_NODE, text)
@@ -0,0 +1,194 @@
+import functools
+import inspect
+import sys
+import time
+from typing import Any, Callable, Dict
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
+
+from backend.db.result import ColumnarResult
+from backend.metrics.registry import (
+    CACHE_LOOKUPS,
+    CHAIN_DURATION,
+    CHAIN_ERRORS,
+    CHAIN_TOKENS,
+    NODE_DURATION,
+    NODE_ERRORS,
+    NODE_STATE_BYTES,
+    ROWS_FETCHED,
+    metrics,
+)
+
+
+def state_bytes(value: Any) -> int:
+    # Approximation: text and result arrays dominate the state, so the
+    # container overhead is not counted
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, ColumnarResult):
+        return value.nbytes
+    if isinstance(value, BaseMessage):
+        return state_bytes(value.content)
+    if isinstance(value, BaseModel):
+        return len(value.model_dump_json())
+    if isinstance(value, dict):
+        return sum(state_bytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(state_bytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _record_node(name: str, elapsed: float, update: Dict[str, Any]) -> None:
+    metrics.observe(NODE_DURATION, elapsed, node=name)
+    if not update:
+        return
+    metrics.observe(NODE_STATE_BYTES, state_bytes(update), node=name)
+    if update.get("is_error") in (True, "True"):
+        metrics.increment(NODE_ERRORS, node=name)
+    data = update.get("data")
+    if data is not None:
+        metrics.observe(ROWS_FETCHED, len(data), node=name)
+    for key, value in update.items():
+        if key.endswith("_cache_hit"):
+            metrics.increment(
+                CACHE_LOOKUPS,
+                cache=key[: -len("_cache_hit")],
+                result="hit" if value else "miss",
+            )
+
+
+def instrument_node(name: str, node: Callable) -> Callable:
+    """
+    Wraps a graph node to record its wall time, the size of its state update,
+    fetched rows, cache hits and errors. Returns the node itself when metrics
+    are disabled.
+    """
+    if not metrics.enabled:
+        return node
+
+    if inspect.iscoroutinefunction(node):
+
+        @functools.wraps(node)
+        async def instrumented(state):
+            started = time.perf_counter()
+            try:
+                update = await node(state)
+            except Exception:
+                metrics.increment(NODE_ERRORS, node=name)
+                raise
+            _record_node(name, time.perf_counter() - started, update)
+            return update
+
+        return instrumented
+
+    @functools.wraps(node)
+    def instrumented(state):
+        started = time.perf_counter()
+        try:
+            update = node(state)
+        except Exception:
+            metrics.increment(NODE_ERRORS, node=name)
+            raise
+        _record_node(name, time.perf_counter() - started, update)
+        return update
+
+    return instrumented
+
+
+def timed_nodes(
+    nodes: Dict[str, Callable], record: Callable[[str, float], None]
+) -> Dict[str, Callable]:
+    """
+    Wraps graph nodes to pass each node name and its wall time to ``record``,
+    also when the node raises. Unlike ``instrument_node`` it works whether or
+    not metrics are enabled, for callers keeping per-run timings.
+    """
+
+    def wrap(name: str, node: Callable) -> Callable:
+        if inspect.iscoroutinefunction(node):
+
+            @functools.wraps(node)
+            async def timed_async(state):
+                started = time.perf_counter()
+                try:
+                    return await node(state)
+                finally:
+                    record(name, time.perf_counter() - started)
+
+            return timed_async
+
+        @functools.wraps(node)
+        def timed(state):
+            started = time.perf_counter()
+            try:
+                return node(state)
+            finally:
+                record(name, time.perf_counter() - started)
+
+        return timed
+
+    return {name: wrap(name, node) for name, node in nodes.items()}
+
+
+def _token_usage(response: LLMResult) -> Dict[str, int]:
+    usage = (response.llm_output or {}).get("token_usage")
+    if usage:
+        return {
+            "prompt": usage.get("prompt_tokens", 0),
+            "completion": usage.get("completion_tokens", 0),
+        }
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            metadata = getattr(message, "usage_metadata", None)
+            if metadata:
+                return {
+                    "prompt": metadata.get("input_tokens", 0),
+                    "completion": metadata.get("output_tokens", 0),
+                }
+    return {}
+
+
+class ChainMetricsHandler(BaseCallbackHandler):
+    """Records latency and token usage of the LLM calls made by one chain."""
+
+    # Only bookkeeping, so async runs call it directly instead of in a thread
+    run_inline = True
+
+    def __init__(self, chain: str):
+        self.chain = chain
+        self._started: Dict[UUID, float] = {}
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id: UUID, **kwargs
+    ) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            metrics.observe(
+                CHAIN_DURATION, time.perf_counter() - started, chain=self.chain
+            )
+        for kind, tokens in _token_usage(response).items():
+            metrics.observe(CHAIN_TOKENS, tokens, chain=self.chain, kind=kind)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._started.pop(run_id, None)
+        metrics.increment(CHAIN_ERRORS, chain=self.chain)
+
+
+def instrument_chain(name: str, chain: Runnable) -> Runnable:
+    if not metrics.enabled:
+        return chain
+    return chain.with_config(callbacks=[ChainMetricsHandler(name)])
@@ -0,0 +1,176 @@
+import bisect
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+from backend.config import METRICS_ENABLED
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 2048, 4096, 8192, 16384, 32768)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # One slot per upper bound plus the +Inf bucket, not cumulative
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        bounds = [_format_number(bound) for bound in self.buckets] + ["+Inf"]
+        total = 0
+        result = []
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class MetricsRegistry:
+    """
+    Histograms and counters keyed by metric name and label values, exposed in
+    the Prometheus text format or as a JSON-compatible snapshot. Metrics must
+    be declared before they are recorded.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._definitions: Dict[str, Tuple[str, str, Sequence[float]]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float]) -> str:
+        self._definitions[name] = ("histogram", help_text, tuple(buckets))
+        self._histograms[name] = {}
+        return name
+
+    def counter(self, name: str, help_text: str) -> str:
+        self._definitions[name] = ("counter", help_text, ())
+        self._counters[name] = {}
+        return name
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._definitions[name][2])
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + amount
+
+    def reset(self) -> None:
+        with self._lock:
+            for series in self._histograms.values():
+                series.clear()
+            for series in self._counters.values():
+                series.clear()
+
+    def prometheus_text(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, _) in self._definitions.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "counter":
+                    for labels, value in self._counters[name].items():
+                        lines.append(
+                            f"{name}{_format_labels(labels)} {_format_number(value)}"
+                        )
+                    continue
+                for labels, histogram in self._histograms[name].items():
+                    for bound, count in histogram.cumulative():
+                        lines.append(
+                            f"{name}_bucket{_format_labels(labels, (('le', bound),))} {count}"
+                        )
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(
+                        f"{name}_count{_format_labels(labels)} {histogram.count}"
+                    )
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        histograms = {}
+        counters = {}
+        with self._lock:
+            for name, series in self._histograms.items():
+                histograms[name] = [
+                    {
+                        "labels": dict(labels),
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "buckets": dict(histogram.cumulative()),
+                    }
+                    for labels, histogram in series.items()
+                ]
+            for name, series in self._counters.items():
+                counters[name] = [
+                    {"labels": dict(labels), "value": value}
+                    for labels, value in series.items()
+                ]
+        return {"enabled": self.enabled, "histograms": histograms, "counters": counters}
+
+
+metrics = MetricsRegistry(METRICS_ENABLED)
+
+NODE_DURATION = metrics.histogram(
+    "text2sql_node_duration_seconds", "Wall time of a graph node.", DURATION_BUCKETS
+)
+NODE_STATE_BYTES = metrics.histogram(
+    "text2sql_node_state_bytes",
+    "Approximate size of the state update returned by a node.",
+    BYTE_BUCKETS,
+)
+NODE_ERRORS = metrics.counter(
+    "text2sql_node_errors_total",
+    "Node runs that raised or reported is_error.",
+)
+ROWS_FETCHED = metrics.histogram(
+    "text2sql_rows_fetched", "Rows returned to the graph by a node.", ROW_BUCKETS
+)
+CACHE_LOOKUPS = metrics.counter(
+    "text2sql_cache_lookups_total", "Cache lookups by cache and result (hit or miss)."
+)
+CHAIN_DURATION = metrics.histogram(
+    "text2sql_chain_duration_seconds",
+    "Wall time of an LLM call made by a chain.",
+    DURATION_BUCKETS,
+)
+CHAIN_TOKENS = metrics.histogram(
+    "text2sql_chain_tokens",
+    "Prompt and completion tokens per LLM call made by a chain.",
+    TOKEN_BUCKETS,
+)
+CHAIN_ERRORS = metrics.counter(
+    "text2sql_chain_errors_total", "LLM calls made by a chain that failed."
+)
@@ -0,0 +1,223 @@
+import hashlib
+import math
+import re
+import threading
+from collections import Counter, OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+from backend.config import SCHEMA_CACHE_MAX_ENTRIES
+from backend.graph.chains.db_schema_formatter import DatabaseSchema, TableInfo
+
+_CAMEL_CASE = re.compile(r"([a-z0-9])([A-Z])")
+_WORDS = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = {
+    "a", "all", "an", "and", "any", "are", "at", "be", "by", "did", "do", "does",
+    "each", "find", "for", "from", "get", "give", "has", "have", "how", "i", "in",
+    "is", "it", "list", "many", "me", "most", "of", "on", "or", "per", "show",
+    "than", "that", "the", "there", "this", "to", "was", "were", "what", "which",
+    "who", "with",
+}  # fmt: skip
+
+# Field weights: a table is mostly identified by its own name, then its columns
+TABLE_NAME_WEIGHT = 3
+COLUMN_NAME_WEIGHT = 2
+TEXT_WEIGHT = 1
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("ses", "xes", "ches", "shes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    text = _CAMEL_CASE.sub(r"\1 \2", text).lower()
+    return [_stem(word) for word in _WORDS.findall(text) if word not in _STOP_WORDS]
+
+
+def _related_tables(table: TableInfo) -> List[str]:
+    if not table.relation_ship:
+        return []
+    return [name.strip() for name in table.relation_ship.split(",") if name.strip()]
+
+
+def _table_terms(table: TableInfo, neighbours: List[str]) -> Counter:
+    terms = Counter()
+    for token in tokenize(table.table_name):
+        terms[token] += TABLE_NAME_WEIGHT
+    for column in table.columns:
+        for token in tokenize(column.name):
+            terms[token] += COLUMN_NAME_WEIGHT
+        for token in tokenize(column.explanation):
+            terms[token] += TEXT_WEIGHT
+    for token in tokenize(table.description):
+        terms[token] += TEXT_WEIGHT
+    for neighbour in neighbours:
+        for token in tokenize(neighbour):
+            terms[token] += TEXT_WEIGHT
+    return terms
+
+
+class TableIndex:
+    """
+    BM25 index with one document per table: its name, column names, table and
+    column descriptions, and the names of the tables it has foreign keys with.
+    Documents of tables unchanged since ``previous`` are reused from it.
+    """
+
+    def __init__(
+        self,
+        schema: DatabaseSchema,
+        k1: float = 1.5,
+        b: float = 0.75,
+        previous: Optional["TableIndex"] = None,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.tables: Dict[str, TableInfo] = {
+            table.table_name: table for table in schema.tables
+        }
+        self.neighbours: Dict[str, List[str]] = {name: [] for name in self.tables}
+        for table in schema.tables:
+            for other in _related_tables(table):
+                if other not in self.tables:
+                    continue
+                for name, neighbour in (
+                    (table.table_name, other),
+                    (other, table.table_name),
+                ):
+                    if neighbour not in self.neighbours[name]:
+                        self.neighbours[name].append(neighbour)
+
+        self._term_frequencies: Dict[str, Counter] = {}
+        document_frequencies: Counter = Counter()
+        for name, table in self.tables.items():
+            if (
+                previous is not None
+                and previous.tables.get(name) == table
+                and previous.neighbours.get(name) == self.neighbours[name]
+            ):
+                terms = previous._term_frequencies[name]
+            else:
+                terms = _table_terms(table, self.neighbours[name])
+            self._term_frequencies[name] = terms
+            document_frequencies.update(terms.keys())
+
+        count = len(self.tables)
+        self._idf = {
+            term: math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequencies.items()
+        }
+        self._lengths = {
+            name: sum(terms.values()) for name, terms in self._term_frequencies.items()
+        }
+        self._average_length = sum(self._lengths.values()) / count if count else 0.0
+
+    def search(self, question: str, top_k: int) -> List[Tuple[str, float]]:
+        query_terms = set(tokenize(question))
+        scores = []
+        for name, terms in self._term_frequencies.items():
+            length_norm = (
+                1
+                - self.b
+                + self.b * self._lengths[name] / (self._average_length or 1.0)
+            )
+            score = 0.0
+            for term in query_terms:
+                frequency = terms.get(term)
+                if frequency:
+                    score += (
+                        self._idf[term]
+                        * frequency
+                        * (self.k1 + 1)
+                        / (frequency + self.k1 * length_norm)
+                    )
+            if score > 0:
+                scores.append((name, score))
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[:top_k]
+
+    def join_path(self, start: str, end: str, max_hops: int) -> Optional[List[str]]:
+        previous = {start: None}
+        queue = deque([(start, 0)])
+        while queue:
+            name, hops = queue.popleft()
+            if name == end:
+                path = []
+                while name is not None:
+                    path.append(name)
+                    name = previous[name]
+                return path[::-1]
+            if hops == max_hops:
+                continue
+            for neighbour in self.neighbours[name]:
+                if neighbour not in previous:
+                    previous[neighbour] = name
+                    queue.append((neighbour, hops + 1))
+        return None
+
+    def select(
+        self, question: str, top_k: int, max_hops: int
+    ) -> Tuple[DatabaseSchema, List[List[str]]]:
+        """
+        Returns the top-k tables for the question plus the tables on the join
+        paths connecting them to the best match, and those join paths.
+        """
+        matches = [name for name, _ in self.search(question, top_k)]
+        if not matches:
+            # Nothing matched lexically: fall back to the most connected tables
+            matches = sorted(self.tables, key=lambda name: -len(self.neighbours[name]))
+            matches = matches[:top_k]
+
+        selected = list(matches)
+        join_paths = []
+        for name in matches[1:]:
+            path = self.join_path(matches[0], name, max_hops)
+            if path is None:
+                continue
+            join_paths.append(path)
+            for table in path:
+                if table not in selected:
+                    selected.append(table)
+
+        tables = [self.tables[name] for name in selected]
+        return DatabaseSchema(tables=tables), join_paths
+
+
+class TableIndexCache:
+    """
+    Indexes keyed by a hash of the formatted schema, so each is built once per
+    schema version. A new version is built on top of the most recently used
+    index, so after a schema change only the changed tables are tokenized.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._indexes: OrderedDict[str, TableIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, schema_str: str) -> TableIndex:
+        key = hashlib.sha256(schema_str.encode("utf-8")).hexdigest()
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+            previous = next(reversed(self._indexes.values()), None)
+        index = TableIndex(
+            DatabaseSchema.model_validate_json(schema_str), previous=previous
+        )
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index
+
+
+table_indexes = TableIndexCache(SCHEMA_CACHE_MAX_ENTRIES)
@@ -0,0 +1,158 @@
+import asyncio
+import functools
+import importlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from backend.graph.chains.data_explainer import DataExplain
+from backend.graph.chains.db_connection_error_explainer import DBConnectionValidator
+from backend.graph.chains.db_schema_formatter import (
+    ColumnDescription,
+    SchemaDescriptions,
+    TableDescription,
+)
+from backend.graph.chains.sql_query_generator import SQLQueryResult
+from backend.graph.chains.user_input_validator import UserInputValidator
+from backend.graph.chains.visualizer import VisualizationConfig
+
+
+class FakeChain:
+    """
+    Deterministic stand-in for an LLM chain: sleeps for ``latency`` seconds and
+    returns ``respond(input)``. Supports the ``invoke``, ``ainvoke``, ``batch``
+    and ``abatch`` calls the nodes make and counts them.
+    """
+
+    def __init__(self, respond, latency: float):
+        self.respond = respond
+        self.latency = latency
+        self.calls = 0
+
+    def invoke(self, input: Dict, config=None, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.respond(input)
+
+    async def ainvoke(self, input: Dict, config=None, **kwargs):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.respond(input)
+
+    def batch(self, inputs: List[Dict], config=None, return_exceptions=False, **kwargs):
+        def invoke(input: Dict):
+            try:
+                return self.invoke(input)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return e
+
+        workers = (config or {}).get("max_concurrency") or len(inputs) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(invoke, inputs))
+
+    async def abatch(
+        self, inputs: List[Dict], config=None, return_exceptions=False, **kwargs
+    ):
+        semaphore = asyncio.Semaphore((config or {}).get("max_concurrency") or 1000)
+
+        async def bounded(input: Dict):
+            async with semaphore:
+                return await self.ainvoke(input)
+
+        return await asyncio.gather(
+            *(bounded(input) for input in inputs), return_exceptions=return_exceptions
+        )
+
+
+def _question(input: Dict) -> str:
+    for message in input.get("messages", []):
+        if getattr(message, "type", None) == "human":
+            return message.content
+    return ""
+
+
+def _describe_schema(input: Dict) -> SchemaDescriptions:
+    schema = json.loads(input["schema"])
+    return SchemaDescriptions(
+        tables=[
+            TableDescription(
+                table_name=table["table_name"],
+                description=f"Stores {table['table_name'].replace('_', ' ')}.",
+                columns=[
+                    ColumnDescription(
+                        name=column["name"],
+                        explanation=f"The {column['name'].replace('_', ' ')}.",
+                    )
+                    for column in table["columns"]
+                    if not column.get("explanation")
+                ],
+            )
+            for table in schema["tables"]
+        ]
+    )
+
+
+def fake_chains(workload: Dict[str, str], latency: float) -> Dict[str, FakeChain]:
+    """Stand-ins for all chains; the SQL generator answers from ``workload`` (question -> SQL)."""
+
+    def generate_sql(input: Dict) -> SQLQueryResult:
+        sql = workload.get(_question(input).strip())
+        if sql is None:
+            return SQLQueryResult(
+                is_error=True, error_explanation="Question is not in the workload."
+            )
+        return SQLQueryResult(query=sql)
+
+    return {
+        "user_input_validator_chain": FakeChain(
+            lambda input: UserInputValidator(is_error=False), latency
+        ),
+        "db_schema_formatter_chain": FakeChain(_describe_schema, latency),
+        "sql_query_generator_chain": FakeChain(generate_sql, latency),
+        "data_explainer_chain": FakeChain(
+            lambda input: DataExplain(explanation="Benchmark explanation."), latency
+        ),
+        "visualizer_chain": FakeChain(
+            lambda input: VisualizationConfig(
+                is_visualization_possible=False,
+                explanation="Benchmark visualization.",
+            ),
+            latency,
+        ),
+        "db_connection_error_explain_chain": FakeChain(
+            lambda input: DBConnectionValidator(
+                is_error=True, error_explanation=input["error"]
+            ),
+            latency,
+        ),
+    }
+
+
+# Modules that import the getter of each chain (``get_<name>``)
+CHAIN_MODULES: Dict[str, List[str]] = {
+    "user_input_validator_chain": ["backend.graph.nodes.user_input_checker"],
+    "db_schema_formatter_chain": ["backend.graph.nodes.format_db_schema"],
+    "sql_query_generator_chain": ["backend.graph.nodes.sql_generation"],
+    "data_explainer_chain": ["backend.graph.nodes.data_explain"],
+    "visualizer_chain": ["backend.graph.chains.visualizer"],
+    "db_connection_error_explain_chain": ["backend.graph.nodes.db_config_checker"],
+}
+
+
+def _installed(chain: FakeChain) -> FakeChain:
+    return chain
+
+
+def install_fake_chains(chains: Dict[str, FakeChain]) -> None:
+    for name, modules in CHAIN_MODULES.items():
+        for module_name in modules:
+            setattr(
+                importlib.import_module(module_name),
+                f"get_{name}",
+                functools.partial(_installed, chains[name]),
+            )
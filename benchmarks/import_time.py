@@ -0,0 +1,98 @@
+"""
+Cold-start benchmark: imports the graph module in fresh interpreters and
+reports the import time, the time to compile the first graph and where the
+import time goes, per package.
+
+    python -m benchmarks.import_time --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+{module}.compiled_graph()
+compiled = time.perf_counter()
+print(json.dumps({{"import": imported - started, "compile": compiled - imported}}))
+"""
+
+
+def _python_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    return env
+
+
+def measure(module: str) -> Dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", PROBE.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=_python_env(),
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def import_time_by_package(module: str, top: int) -> List[Dict[str, object]]:
+    # -X importtime writes "import time: self [us] | cumulative | name" to stderr;
+    # self times are summed per top-level package (per module for this repo)
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=_python_env(),
+    )
+    totals: Dict[str, int] = defaultdict(int)
+    for line in output.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        name = name.strip()
+        if not name.startswith(("backend.", "frontend.")):
+            name = name.split(".", 1)[0]
+        totals[name] += int(self_us)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return [{"module": name, "ms": total / 1000} for name, total in ranked[:top]]
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="backend.graph.graph")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    result = {
+        "module": args.module,
+        "import_s": statistics.median(run["import"] for run in runs),
+        "compile_s": statistics.median(run["compile"] for run in runs),
+        "runs": runs,
+        "import_time_by_package": import_time_by_package(args.module, args.top),
+    }
+
+    print(f"import {args.module}: {result['import_s'] * 1000:.0f} ms (median)")
+    print(f"first graph compile: {result['compile_s'] * 1000:.0f} ms (median)")
+    print(f"\n{'package':50} {'ms':>9}")
+    for entry in result["import_time_by_package"]:
+        print(f"{entry['module']:50} {entry['ms']:9.1f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
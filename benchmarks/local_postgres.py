@@ -0,0 +1,99 @@
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from typing import Dict, Optional
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _binary(bin_dir: Optional[str], name: str) -> str:
+    path = os.path.join(bin_dir, name) if bin_dir else shutil.which(name)
+    if not path or not os.path.exists(path):
+        raise RuntimeError(
+            f"{name} not found; install PostgreSQL, set PG_BIN to its bin directory "
+            "or pass --host to use a running server"
+        )
+    return path
+
+
+class LocalPostgres:
+    """
+    Throwaway PostgreSQL cluster in a temporary directory, started with the
+    ``initdb``/``pg_ctl`` binaries from ``bin_dir`` (default: PATH). PostgreSQL
+    refuses to run as root, so run the benchmarks as a regular user.
+    """
+
+    def __init__(
+        self, bin_dir: Optional[str] = None, user: str = "admin", port: int = 0
+    ):
+        self.bin_dir = bin_dir or os.getenv("PG_BIN")
+        self.user = user
+        self.port = port or _free_port()
+        self.directory = None
+
+    def __enter__(self) -> "LocalPostgres":
+        self.directory = tempfile.mkdtemp(prefix="text2sql-bench-")
+        data_dir = os.path.join(self.directory, "data")
+        subprocess.run(
+            [
+                _binary(self.bin_dir, "initdb"),
+                "-D",
+                data_dir,
+                "-U",
+                self.user,
+                "--auth=trust",
+                "--no-sync",
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        # Durability is irrelevant for a throwaway benchmark cluster
+        options = f"-p {self.port} -k {self.directory} -c fsync=off -c synchronous_commit=off -c full_page_writes=off"
+        subprocess.run(
+            [
+                _binary(self.bin_dir, "pg_ctl"),
+                "-D",
+                data_dir,
+                "-o",
+                options,
+                "-l",
+                os.path.join(self.directory, "postgres.log"),
+                "-w",
+                "start",
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        return self
+
+    def __exit__(self, *exc) -> None:
+        subprocess.run(
+            [
+                _binary(self.bin_dir, "pg_ctl"),
+                "-D",
+                os.path.join(self.directory, "data"),
+                "-m",
+                "immediate",
+                "stop",
+            ],
+            stdout=subprocess.DEVNULL,
+        )
+        # The server may take a moment to release its files
+        time.sleep(0.2)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def db_config(self, database: str) -> Dict[str, str]:
+        return {
+            "host": "127.0.0.1",
+            "port": str(self.port),
+            "database": database,
+            "username": self.user,
+            "password": "",
+        }
@@ -0,0 +1,276 @@
+"""
+Offline benchmark: the LLM chains are replaced by deterministic stand-ins and
+the graph runs against a PostgreSQL database seeded at several sizes.
+
+    python -m benchmarks.run --tables 10 100 1000 --rows 1000 1000000
+
+By default a throwaway cluster is started with initdb/pg_ctl (set PG_BIN if
+they are not on PATH); pass --host/--port/--username/--password to use a
+running server instead. Results are printed and written as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Dict, List
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.fake_chains import fake_chains, install_fake_chains
+from benchmarks.local_postgres import LocalPostgres
+from benchmarks.seed import seed_online_store
+from benchmarks.workload import WORKLOAD
+from backend.metrics.instrument import timed_nodes
+from backend.metrics.registry import metrics
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(percent / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": round(statistics.fmean(values) * 1000, 3),
+        "p50_ms": round(_percentile(values, 50) * 1000, 3),
+        "p95_ms": round(_percentile(values, 95) * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3),
+    }
+
+
+def clear_caches() -> None:
+    from backend.cache.catalog_cache import catalog_cache
+    from backend.cache.health_cache import db_health_cache, error_explanation_cache
+    from backend.cache.result_cache import result_cache
+    from backend.cache.schema_cache import schema_cache, schema_description_cache
+    from backend.cache.sql_cache import sql_cache
+
+    for cache in (
+        catalog_cache,
+        schema_cache,
+        schema_description_cache,
+        sql_cache,
+        result_cache,
+        db_health_cache,
+        error_explanation_cache,
+    ):
+        cache.clear()
+
+
+def _request(question: str, db_config: Dict[str, str]) -> Dict:
+    return {"messages": [HumanMessage(question)], "db_config": db_config}
+
+
+def run_scenario(
+    db_config: Dict[str, str],
+    use_async: bool,
+    requests: int,
+    concurrency: int,
+    cold: bool,
+    trace_memory: bool,
+) -> Dict:
+    from backend.db.async_pool import async_connection_pools
+    from backend.db.pool import connection_pools
+    from backend.graph.graph import ASYNC_NODES, SYNC_NODES, build_graph
+
+    timings: Dict[str, List[float]] = defaultdict(list)
+    graph = build_graph(
+        timed_nodes(
+            ASYNC_NODES if use_async else SYNC_NODES,
+            lambda name, elapsed: timings[name].append(elapsed),
+        )
+    )
+    questions = list(WORKLOAD)
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    def record(result: Dict, started: float) -> None:
+        latencies.append(time.perf_counter() - started)
+        if result.get("is_error"):
+            errors.append(result.get("error_explanation") or "unknown error")
+
+    def run_one(number: int) -> None:
+        if cold:
+            clear_caches()
+        started = time.perf_counter()
+        result = graph.invoke(_request(questions[number % len(questions)], db_config))
+        record(result, started)
+
+    async def run_async() -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one_async(number: int) -> None:
+            async with semaphore:
+                if cold:
+                    clear_caches()
+                started = time.perf_counter()
+                result = await graph.ainvoke(
+                    _request(questions[number % len(questions)], db_config)
+                )
+                record(result, started)
+
+        try:
+            await asyncio.gather(*(run_one_async(n) for n in range(requests)))
+        finally:
+            await async_connection_pools.close_all()
+
+    clear_caches()
+    connection_pools.close_all()
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    if use_async:
+        asyncio.run(run_async())
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(run_one, range(requests)))
+    elapsed = time.perf_counter() - started
+    peak_traced = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    if trace_memory:
+        tracemalloc.stop()
+    connection_pools.close_all()
+
+    return {
+        "end_to_end": summarize(latencies),
+        "nodes": {name: summarize(values) for name, values in sorted(timings.items())},
+        "throughput_rps": round(requests / elapsed, 3),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "peak_traced_mib": (
+            round(peak_traced / 2**20, 2) if peak_traced is not None else None
+        ),
+        # ru_maxrss is in KiB on Linux
+        "max_rss_mib": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2
+        ),
+    }
+
+
+def print_report(scenario: Dict) -> None:
+    print(
+        f"\n== {scenario['tables']} tables, {scenario['rows']} rows, "
+        f"{scenario['mode']} caches, {scenario['runner']} =="
+    )
+    result = scenario["result"]
+    print(
+        f"throughput {result['throughput_rps']} req/s, errors {result['errors']}, "
+        f"max RSS {result['max_rss_mib']} MiB"
+        + (
+            f", peak traced {result['peak_traced_mib']} MiB"
+            if result["peak_traced_mib"] is not None
+            else ""
+        )
+    )
+    if result["first_error"]:
+        print(f"first error: {result['first_error']}")
+    print(f"{'stage':<32}{'count':>7}{'mean ms':>11}{'p50 ms':>11}{'p95 ms':>11}")
+    rows = [("end_to_end", result["end_to_end"])] + list(result["nodes"].items())
+    for name, stats in rows:
+        if not stats["count"]:
+            continue
+        print(
+            f"{name:<32}{stats['count']:>7}{stats['mean_ms']:>11}"
+            f"{stats['p50_ms']:>11}{stats['p95_ms']:>11}"
+        )
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 1000000])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--llm-latency",
+        type=float,
+        default=0.0,
+        help="Seconds each fake chain call takes",
+    )
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=["cold", "warm"],
+        default=["cold", "warm"],
+        help="cold clears every cache before each request",
+    )
+    parser.add_argument("--async", dest="use_async", action="store_true")
+    parser.add_argument("--trace-memory", action="store_true")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--host", help="Use a running server instead of initdb")
+    parser.add_argument("--port", default="5432")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--pg-bin", help="Directory with initdb and pg_ctl")
+    args = parser.parse_args(argv)
+
+    install_fake_chains(fake_chains(WORKLOAD, args.llm_latency))
+
+    server = (
+        nullcontext(None)
+        if args.host
+        else LocalPostgres(bin_dir=args.pg_bin, user=args.username)
+    )
+    scenarios = []
+    with server as local:
+        if local is not None:
+            admin_config = local.db_config("postgres")
+        else:
+            admin_config = {
+                "host": args.host,
+                "port": args.port,
+                "database": "postgres",
+                "username": args.username,
+                "password": args.password,
+            }
+        for tables in args.tables:
+            for rows in args.rows:
+                database = f"bench_{tables}t_{rows}r"
+                seeded = time.perf_counter()
+                db_config = seed_online_store(admin_config, database, tables, rows)
+                print(
+                    f"seeded {database} in {time.perf_counter() - seeded:.1f}s",
+                    file=sys.stderr,
+                )
+                for mode in args.modes:
+                    metrics.reset()
+                    scenario = {
+                        "tables": tables,
+                        "rows": rows,
+                        "mode": mode,
+                        "runner": "async" if args.use_async else "sync",
+                        "concurrency": args.concurrency,
+                        "llm_latency": args.llm_latency,
+                        "result": run_scenario(
+                            db_config,
+                            args.use_async,
+                            args.requests,
+                            args.concurrency,
+                            mode == "cold",
+                            args.trace_memory,
+                        ),
+                    }
+                    if metrics.enabled:
+                        # METRICS_ENABLED=1 also records the instrumented graph
+                        scenario["metrics"] = metrics.snapshot()
+                    print_report(scenario)
+                    scenarios.append(scenario)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(scenarios, file, indent=2)
+    print(f"\nwrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+from typing import Dict
+
+import psycopg2
+
+CORE_TABLES = 5
+
+SCHEMA_DDL = """
+CREATE TABLE categories (
+    category_id SERIAL PRIMARY KEY,
+    category_name TEXT NOT NULL
+);
+CREATE TABLE products (
+    product_id SERIAL PRIMARY KEY,
+    product_name TEXT NOT NULL,
+    category_id INTEGER NOT NULL REFERENCES categories (category_id),
+    price NUMERIC(10, 2) NOT NULL
+);
+CREATE TABLE users (
+    user_id SERIAL PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    email TEXT NOT NULL UNIQUE,
+    created_at TIMESTAMP NOT NULL
+);
+CREATE TABLE orders (
+    order_id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users (user_id),
+    order_date TIMESTAMP NOT NULL,
+    total_amount NUMERIC(12, 2) NOT NULL
+);
+CREATE TABLE order_items (
+    order_item_id SERIAL PRIMARY KEY,
+    order_id INTEGER NOT NULL REFERENCES orders (order_id),
+    product_id INTEGER NOT NULL REFERENCES products (product_id),
+    quantity INTEGER NOT NULL,
+    unit_price NUMERIC(10, 2) NOT NULL
+);
+"""
+
+# generate_series keeps seeding on the server; the modulo arithmetic makes the
+# data deterministic for a given size
+SEED_DATA = """
+INSERT INTO categories (category_name)
+SELECT 'Category ' || i FROM generate_series(1, 10) AS i;
+INSERT INTO products (product_name, category_id, price)
+SELECT 'Product ' || i, 1 + i %% 10, 1 + (i * 37 %% 500) FROM generate_series(1, %(products)s) AS i;
+INSERT INTO users (first_name, last_name, email, created_at)
+SELECT 'First' || i, 'Last' || (i %% 997), 'user' || i || '@example.com',
+       TIMESTAMP '2022-01-01' + (i %% 730) * INTERVAL '1 day'
+FROM generate_series(1, %(users)s) AS i;
+INSERT INTO orders (user_id, order_date, total_amount)
+SELECT 1 + (i * 7919) %% %(users)s, TIMESTAMP '2023-01-01' + (i %% 365) * INTERVAL '1 day',
+       (i * 13 %% 100000) / 100.0
+FROM generate_series(1, %(rows)s) AS i;
+INSERT INTO order_items (order_id, product_id, quantity, unit_price)
+SELECT i, 1 + (i * 31) %% %(products)s, 1 + i %% 5, 1 + (i * 37 %% 500)
+FROM generate_series(1, %(rows)s) AS i;
+"""
+
+EXTRA_TABLE_DDL = """
+CREATE TABLE {name} (
+    {name}_id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users (user_id),
+    product_id INTEGER REFERENCES products (product_id),
+    note TEXT,
+    amount NUMERIC(10, 2),
+    recorded_at TIMESTAMP
+);
+INSERT INTO {name} (user_id, product_id, note, amount, recorded_at)
+SELECT 1 + i %% %(users)s, 1 + i %% %(products)s, 'note ' || i, i, TIMESTAMP '2023-01-01'
+FROM generate_series(1, 10) AS i;
+"""
+
+
+def seed_sizes(rows: int) -> Dict[str, int]:
+    return {
+        "rows": rows,
+        "users": max(rows // 10, 10),
+        "products": max(min(rows // 100, 10000), 10),
+    }
+
+
+def seed_online_store(
+    admin_config: Dict[str, str], database: str, tables: int, rows: int
+) -> Dict[str, str]:
+    """
+    (Re)creates ``database`` with the online_store tables (categories, products,
+    users, orders, order_items; ``rows`` orders and order items) plus filler
+    tables referencing users and products up to ``tables`` tables in total.
+    Returns the db_config of the new database.
+    """
+    conn = psycopg2.connect(
+        host=admin_config["host"],
+        port=admin_config["port"],
+        dbname=admin_config["database"],
+        user=admin_config["username"],
+        password=admin_config["password"],
+    )
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(f'DROP DATABASE IF EXISTS "{database}" WITH (FORCE)')
+        cursor.execute(f'CREATE DATABASE "{database}"')
+    conn.close()
+
+    db_config = {**admin_config, "database": database}
+    sizes = seed_sizes(rows)
+    conn = psycopg2.connect(
+        host=db_config["host"],
+        port=db_config["port"],
+        dbname=database,
+        user=db_config["username"],
+        password=db_config["password"],
+    )
+    with conn, conn.cursor() as cursor:
+        cursor.execute(SCHEMA_DDL)
+        cursor.execute(SEED_DATA, sizes)
+        for number in range(1, max(tables - CORE_TABLES, 0) + 1):
+            cursor.execute(EXTRA_TABLE_DDL.format(name=f"extra_{number:04d}"), sizes)
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    conn.close()
+    return db_config
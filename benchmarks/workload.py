@@ -0,0 +1,39 @@
+# Questions and the SQL the fake generator answers them with. The questions are
+# phrased so the local input classifier accepts them, as most real traffic is.
+WORKLOAD = {
+    "is there any customer who ordered multiple times": """
+        SELECT u.user_id, u.first_name, u.last_name, COUNT(o.order_id) AS order_count
+        FROM users u JOIN orders o ON o.user_id = u.user_id
+        GROUP BY u.user_id, u.first_name, u.last_name
+        HAVING COUNT(o.order_id) > 1
+        ORDER BY order_count DESC
+        LIMIT 100
+    """,
+    "what are the total sales grouped by product categories": """
+        SELECT c.category_name, SUM(oi.quantity * oi.unit_price) AS total_sales
+        FROM order_items oi
+        JOIN products p ON p.product_id = oi.product_id
+        JOIN categories c ON c.category_id = p.category_id
+        GROUP BY c.category_name
+        ORDER BY total_sales DESC
+    """,
+    "what is the monthly revenue": """
+        SELECT date_trunc('month', order_date) AS month, SUM(total_amount) AS revenue
+        FROM orders
+        GROUP BY month
+        ORDER BY month
+    """,
+    "which are the top 10 products by quantity sold": """
+        SELECT p.product_name, SUM(oi.quantity) AS quantity_sold
+        FROM order_items oi JOIN products p ON p.product_id = oi.product_id
+        GROUP BY p.product_name
+        ORDER BY quantity_sold DESC
+        LIMIT 10
+    """,
+    "list the latest orders with customer names": """
+        SELECT o.order_id, o.order_date, o.total_amount, u.first_name, u.last_name
+        FROM orders o JOIN users u ON u.user_id = o.user_id
+        ORDER BY o.order_date DESC, o.order_id DESC
+        LIMIT 500
+    """,
+}
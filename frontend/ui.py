@@ -1,23 +1,78 @@
 import pandas as pd
 import altair as alt
 import streamlit as st
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Optional
 
 from langchain_core.prompts import HumanMessagePromptTemplate
 
-from backend.graph.graph import graph
-from frontend.visualizer import visualizer_chain
+from backend.config import METRICS_ENABLED, METRICS_PORT
+from backend.graph.consts import (
+    DATA_EXPLAINER_NODE,
+    DATA_FETCH_NODE,
+    VISUALIZATION_NODE,
+)
+from backend.graph.streaming import EXPLANATION, GraphEvent, stream_request
+from backend.metrics.server import serve_metrics
+
+
+@st.cache_resource
+def metrics_server():
+    # Streamlit reruns this script on every interaction; the server starts once
+    return serve_metrics(METRICS_PORT)
 
 
-def backend_call(db_config: Dict[str, str], query: str):
+def backend_call(
+    db_config: Dict[str, str], query: str, use_result_cache: bool
+) -> Iterator[GraphEvent]:
     messages = [HumanMessagePromptTemplate.from_template(query).format()]
-    result = graph.invoke({"messages": messages, "db_config": db_config})
-    return result
+    return stream_request(
+        {
+            "messages": messages,
+            "db_config": db_config,
+            "use_result_cache": use_result_cache,
+        }
+    )
 
 
-def create_chart(visual_config):
-    # Convert data to DataFrame
-    df = pd.DataFrame(visual_config.data)
+def show_data(placeholder, update: Dict[str, Any]) -> Optional[pd.DataFrame]:
+    with placeholder.container():
+        st.subheader("Data")
+        if not update["data"]:
+            st.write("No data found.")
+            return None
+        if update.get("is_truncated"):
+            total = update.get("total_row_count")
+            st.warning(
+                f"Showing the first {len(update['data'])} rows"
+                + (f" of {total}." if total else ".")
+            )
+        # Shares the fetched column arrays instead of copying them
+        df = update["data"].to_pandas()
+        st.dataframe(df)
+        return df
+
+
+def show_chart(placeholder, visual_config, df: pd.DataFrame) -> None:
+    with placeholder.container():
+        if visual_config.is_visualization_possible:
+            chart = create_chart(visual_config, df)
+            if chart:
+                st.altair_chart(chart, use_container_width=True)
+        else:
+            st.error("Visualization is not possible.")
+            st.write(visual_config.explanation)
+
+
+def create_chart(visual_config, df: pd.DataFrame):
+    tooltip = (
+        visual_config.other_options.tooltip if visual_config.other_options else None
+    )
+    # Exact NUMERIC values are only rounded to floats for plotting
+    df = df.copy(deep=False)
+    for position in range(df.shape[1]):
+        column = df.iloc[:, position]
+        if pd.api.types.infer_dtype(column, skipna=True) == "decimal":
+            df.isetitem(position, column.astype("float64"))
 
     # Check if y_axis is a list and reshape the data if necessary
     if isinstance(visual_config.y_axis, list):
@@ -42,7 +97,7 @@ def create_chart(visual_config):
                     x=alt.X(visual_config.x_axis),
                     y=alt.Y("Value"),
                     color=alt.Color("Metric"),
-                    tooltip=visual_config.other_options.tooltip,
+                    tooltip=tooltip,
                 )
                 .properties(title="Bar Chart", width=800, height=400)
             )
@@ -53,7 +108,7 @@ def create_chart(visual_config):
                 .encode(
                     x=alt.X(visual_config.x_axis),
                     y=alt.Y(visual_config.y_axis),
-                    tooltip=visual_config.other_options.tooltip,
+                    tooltip=tooltip,
                 )
                 .properties(title="Bar Chart", width=800, height=400)
             )
@@ -75,7 +130,7 @@ def create_chart(visual_config):
                     "Metric" if isinstance(visual_config.y_axis, list) else None,
                     title="Metric",
                 ),
-                tooltip=visual_config.other_options.tooltip,
+                tooltip=tooltip,
             )
             .properties(title="Line Chart", width=800, height=400)
         )
@@ -89,7 +144,7 @@ def create_chart(visual_config):
             .encode(
                 theta=alt.Theta(visual_config.y_axis),
                 color=alt.Color(visual_config.x_axis),
-                tooltip=visual_config.other_options.tooltip,
+                tooltip=tooltip,
             )
             .properties(title="Pie Chart", width=400, height=400)
         )
@@ -101,6 +156,9 @@ def create_chart(visual_config):
 
 
 # Streamlit App
+if METRICS_ENABLED and METRICS_PORT:
+    metrics_server()
+
 st.set_page_config(
     page_title="SmartSQL Assistant", layout="wide", initial_sidebar_state="expanded"
 )
@@ -121,40 +179,51 @@ user_query = st.text_area(
     "Enter your query:",
     placeholder="e.g., is there any customer who order multiple times",
 )
+use_result_cache = not st.checkbox(
+    "Always fetch fresh data", help="Skip recently cached results for this query."
+)
 
 if st.button("Execute Query"):
-    with st.spinner("Processing query..."):
-        # Call the backend with user inputs
-        result = backend_call(db_config, user_query)
+    # Filled in as the graph's nodes finish: the SQL and the data first, then
+    # the explanation token by token and the chart, whichever is ready first
+    status_area = st.empty()
+    sql_area = st.empty()
+    explanation_area = st.empty()
+    data_area = st.empty()
+    chart_area = st.empty()
+    error = None
+    df = None
 
-    # Display the result
-    if result["is_error"]:
-        st.error(f"Error: {result['error_explanation']}")
+    with st.spinner("Processing query..."):
+        for event in backend_call(db_config, user_query, use_result_cache):
+            if event.kind == EXPLANATION:
+                with explanation_area.container():
+                    st.subheader("Explanation")
+                    st.write(event.value)
+                continue
+
+            update = event.value
+            if update.get("is_error") in (True, "True"):
+                error = error or update.get("error_explanation")
+            if error:
+                continue
+            if update.get("sql"):
+                with sql_area.container():
+                    st.subheader("SQL Query")
+                    st.code(update["sql"], language="sql")
+            if event.node == DATA_FETCH_NODE and "data" in update:
+                df = show_data(data_area, update)
+            elif event.node == DATA_EXPLAINER_NODE:
+                with explanation_area.container():
+                    st.subheader("Explanation")
+                    st.write(update["explanation"])
+            elif event.node == VISUALIZATION_NODE and df is not None:
+                show_chart(chart_area, update["visualization"], df)
+
+    if error:
+        status_area.error(f"Error: {error}")
     else:
-        st.success("Your query processed successfully!")
-
-        st.subheader("SQL Query")
-        st.code(result["sql"], language="sql")
-
-        st.subheader("Explanation")
-        st.write(result["explanation"])
-
-        st.subheader("Data")
-        if result["data"]:
-            st.table(result["data"])
-            llm_output = visualizer_chain.invoke(
-                {"sql": result["data"], "data": result["data"]}
-            )
-            pass
-            if llm_output.is_visualization_possible:
-                chart = create_chart(llm_output)
-                if chart:
-                    st.altair_chart(chart, use_container_width=True)
-            else:
-                st.error("Visualization is not possible.")
-                st.write(llm_output["explanation"])
-        else:
-            st.write("No data found.")
+        status_area.success("Your query processed successfully!")
 
 # Footer
 st.sidebar.markdown("---")
@@ -0,0 +1,46 @@
+import os
+from contextlib import nullcontext
+
+import pytest
+
+from benchmarks.fake_chains import fake_chains, install_fake_chains
+from benchmarks.local_postgres import LocalPostgres
+from benchmarks.run import clear_caches
+from benchmarks.seed import seed_online_store
+from benchmarks.workload import WORKLOAD
+
+
+@pytest.fixture(scope="session")
+def db_config():
+    """
+    Seeded online_store database on TEST_PG_HOST/TEST_PG_PORT when set, else
+    on a throwaway cluster; skipped when neither is available.
+    """
+    host = os.getenv("TEST_PG_HOST")
+    if host:
+        server = nullcontext(None)
+    else:
+        server = LocalPostgres()
+    try:
+        with server as local:
+            if local is not None:
+                admin_config = local.db_config("postgres")
+            else:
+                admin_config = {
+                    "host": host,
+                    "port": os.getenv("TEST_PG_PORT", "5432"),
+                    "database": "postgres",
+                    "username": os.getenv("TEST_PG_USER", "admin"),
+                    "password": os.getenv("TEST_PG_PASSWORD", ""),
+                }
+            yield seed_online_store(admin_config, "text2sql_test", tables=10, rows=100)
+    except RuntimeError as e:
+        pytest.skip(str(e))
+
+
+@pytest.fixture(autouse=True)
+def fake_llm():
+    install_fake_chains(fake_chains(WORKLOAD, latency=0.0))
+    clear_caches()
+    yield
+    clear_caches()
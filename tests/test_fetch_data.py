@@ -0,0 +1,40 @@
+from backend.db.result import ColumnarResult
+from backend.graph.nodes import fetch_data
+from backend.graph.nodes.fetch_data import _cached_result, _remember_result
+
+DB_CONFIG = {"host": "localhost", "port": "5432", "database": "shop"}
+
+
+def _state(username: str):
+    return {
+        "db_config": {**DB_CONFIG, "username": username},
+        "schema_fingerprint": "f1",
+        "sql": "SELECT id FROM orders",
+    }
+
+
+def test_cached_result_is_not_shared_across_roles():
+    data = ColumnarResult.from_columns(["id"], [[1]])
+    update = {"data": data, "is_truncated": False, "total_row_count": 1}
+    _remember_result(_state("analyst"), update)
+
+    assert _cached_result(_state("analyst"))["result_cache_hit"]
+    assert _cached_result(_state("support")) is None
+
+
+def test_total_row_count_includes_rows_dropped_from_the_last_batch(
+    db_config, monkeypatch
+):
+    # The cap falls in the middle of the second batch of 100 rows
+    monkeypatch.setattr(fetch_data, "FETCH_MAX_ROWS", 150)
+    monkeypatch.setattr(fetch_data, "FETCH_ITERSIZE", 100)
+    monkeypatch.setattr(fetch_data, "FETCH_SERVER_SIDE_CURSOR", True)
+    monkeypatch.setattr(fetch_data, "FETCH_COUNT_TRUNCATED_ROWS", True)
+
+    update = fetch_data.fetch_db_data(
+        {"db_config": db_config, "sql": "SELECT generate_series(1, 1000) AS n"}
+    )
+
+    assert update["is_truncated"]
+    assert len(update["data"]) == 150
+    assert update["total_row_count"] == 1000
@@ -0,0 +1,67 @@
+from backend.cache.schema_cache import schema_cache
+from backend.db.catalog import schema_cache_key
+from backend.graph.chains.db_schema_formatter import (
+    ColumnInfo,
+    DatabaseSchema,
+    TableInfo,
+)
+from backend.graph.nodes import format_db_schema as node
+from benchmarks.fake_chains import FakeChain, fake_chains, install_fake_chains
+from benchmarks.workload import WORKLOAD
+
+DB_CONFIG = {"host": "localhost", "port": "5432", "database": "shop"}
+
+SCHEMA = DatabaseSchema(
+    tables=[
+        TableInfo(
+            table_name="orders",
+            columns=[ColumnInfo(name="id", type="integer", is_primary_key=True)],
+        )
+    ]
+)
+
+
+def _failing_describer(input):
+    raise RuntimeError("context length exceeded")
+
+
+def _install_describer(describer: FakeChain) -> None:
+    chains = fake_chains(WORKLOAD, latency=0.0)
+    chains["db_schema_formatter_chain"] = describer
+    install_fake_chains(chains)
+
+
+def test_partially_described_schema_is_not_cached():
+    _install_describer(FakeChain(_failing_describer, latency=0.0))
+    state = {"db_config": DB_CONFIG, "schema_fingerprint": "f1"}
+
+    schema, partial = node.describe_schema(SCHEMA)
+    update = node._formatted_schema(state, schema, partial)
+
+    assert partial
+    assert update["database_schema"].tables[0].description is None
+    assert schema_cache.get(schema_cache_key(DB_CONFIG, "f1")) is None
+
+
+def test_fully_described_schema_is_cached():
+    state = {"db_config": DB_CONFIG, "schema_fingerprint": "f2"}
+
+    schema, partial = node.describe_schema(SCHEMA)
+    update = node._formatted_schema(state, schema, partial)
+
+    assert not partial
+    assert update["database_schema"].tables[0].description == "Stores orders."
+    assert schema_cache.get(schema_cache_key(DB_CONFIG, "f2")) == update["db_schema"]
+
+
+def test_formatted_schema_is_not_shared_across_roles():
+    analyst = {**DB_CONFIG, "username": "analyst"}
+    support = {**DB_CONFIG, "username": "support"}
+
+    schema, partial = node.describe_schema(SCHEMA)
+    node._formatted_schema(
+        {"db_config": analyst, "schema_fingerprint": "f3"}, schema, partial
+    )
+
+    assert schema_cache.get(schema_cache_key(analyst, "f3")) is not None
+    assert schema_cache.get(schema_cache_key(support, "f3")) is None
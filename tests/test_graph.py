@@ -0,0 +1,82 @@
+import asyncio
+
+import psycopg
+import pytest
+
+from langchain_core.messages import HumanMessage
+
+from backend.cache.sql_cache import sql_cache
+from backend.db.async_pool import async_connection_pools
+from backend.db.catalog import role_key
+from backend.graph.graph import ASYNC_NODES, SYNC_NODES, build_graph
+from benchmarks.workload import WORKLOAD
+
+QUESTION = next(iter(WORKLOAD))
+
+
+def _request(db_config):
+    return {"messages": [HumanMessage(QUESTION)], "db_config": db_config}
+
+
+def _assert_answered(result):
+    assert not result["is_error"], result.get("error_explanation")
+    assert result["sql"].strip() == WORKLOAD[QUESTION].strip()
+    assert len(result["data"]) > 0
+    assert result["explanation"] == "Benchmark explanation."
+    assert result["visualization"] is not None
+
+
+def test_graph_answers_question(db_config):
+    graph = build_graph(SYNC_NODES)
+    _assert_answered(graph.invoke(_request(db_config)))
+    # Second run is served from the SQL cache
+    result = graph.invoke(_request(db_config))
+    _assert_answered(result)
+    assert result["sql_cache_hit"]
+
+
+def test_failing_cached_sql_is_regenerated(db_config):
+    graph = build_graph(SYNC_NODES)
+    fingerprint = graph.invoke(_request(db_config))["schema_fingerprint"]
+    key = (role_key(db_config), fingerprint, QUESTION)
+    sql_cache.set(*key, "SELECT missing_column FROM missing_table")
+
+    result = graph.invoke(_request(db_config))
+    _assert_answered(result)
+    assert not result["sql_cache_hit"]
+    # The regenerated SQL replaced the failing entry
+    assert sql_cache.get(*key).strip() == WORKLOAD[QUESTION].strip()
+
+
+def test_async_graph_answers_question(db_config):
+    graph = build_graph(ASYNC_NODES)
+
+    async def run():
+        try:
+            return await graph.ainvoke(_request(db_config))
+        finally:
+            await async_connection_pools.close_all()
+
+    _assert_answered(asyncio.run(run()))
+
+
+def test_async_graph_runs_on_successive_event_loops(db_config):
+    graph = build_graph(ASYNC_NODES)
+
+    async def run():
+        return await graph.ainvoke(_request(db_config))
+
+    # Each asyncio.run has its own loop and pools, closed when the loop ends
+    for _ in range(3):
+        _assert_answered(asyncio.run(run()))
+
+
+def test_async_connection_error_is_reported_by_the_pool(db_config):
+    async def connect():
+        async with async_connection_pools.connection(
+            {**db_config, "database": "text2sql_missing"}
+        ):
+            pass
+
+    with pytest.raises(psycopg.OperationalError, match="text2sql_missing"):
+        asyncio.run(asyncio.wait_for(connect(), timeout=5))
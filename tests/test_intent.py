@@ -0,0 +1,46 @@
+import pytest
+
+from backend.classifier.intent import intent_classifier
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Add up total sales by month",
+        "Change in revenue month over month",
+        "Set of products never ordered",
+        "Reset count per user?",
+        "Remove duplicates and show unique emails",
+    ],
+)
+def test_read_questions_starting_with_a_dml_verb_are_not_rejected(question):
+    decision = intent_classifier.classify(question)
+    # Accepted locally or left to the LLM validator
+    assert decision is None or not decision.is_error
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Delete all orders from last year",
+        "Update product 5 to cost 20 dollars",
+        "Please drop the orders table",
+        "Remove rows with a missing email",
+        "DELETE FROM orders WHERE id = 3",
+    ],
+)
+def test_modifications_of_records_are_rejected_by_rules(question):
+    decision = intent_classifier.classify(question)
+    assert decision.is_error
+    assert decision.source == "rules"
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Get rid of all inactive users",
+        "Double the salary of employees in sales",
+    ],
+)
+def test_modifications_without_a_dml_verb_are_escalated(question):
+    assert intent_classifier.classify(question) is None
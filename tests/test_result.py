@@ -0,0 +1,56 @@
+import decimal
+
+import pandas as pd
+import pytest
+
+from backend.db.profile import profile_result
+from backend.db.result import ColumnarResult
+
+
+def test_numeric_values_stay_exact():
+    price = decimal.Decimal("12345678901234567.89")
+    result = ColumnarResult.from_rows(["price"], [(price,), (None,)])
+
+    assert result[0]["price"] == price
+    assert result[1]["price"] is None
+    assert result.to_pandas()["price"][0] == price
+
+
+def test_integers_with_nulls_stay_integers():
+    big = 2**53 + 1
+    result = ColumnarResult.from_rows(["quantity"], [(1,), (None,), (big,)])
+
+    assert [row["quantity"] for row in result] == [1, None, big]
+    series = result.to_pandas()["quantity"]
+    assert series.dtype == "Int64"
+    assert series[2] == big
+    assert pd.isna(series[1])
+
+
+def test_numeric_columns_are_profiled_as_numbers():
+    result = ColumnarResult.from_rows(
+        ["price"], [(decimal.Decimal("1.50"),), (decimal.Decimal("2.50"),)]
+    )
+
+    column = profile_result(result)["columns"][0]
+    assert column["type"] == "number"
+    assert column["mean"] == 2.0
+
+
+def test_cached_result_is_not_modified_through_its_frame():
+    result = ColumnarResult.from_rows(["id", "quantity"], [(1, 2), (2, None)])
+
+    frame = result.to_pandas()
+    for position in (0, 1):
+        try:
+            frame.iloc[0, position] = 5
+        except ValueError:
+            # The shared values are read-only (pandas copies on write instead)
+            pass
+    frame["total"] = 0
+
+    assert result[0] == {"id": 1, "quantity": 2}
+    assert result.to_pandas().iloc[0].tolist() == [1, 2]
+    assert list(result.to_pandas().columns) == ["id", "quantity"]
+    with pytest.raises(ValueError):
+        result.arrays[0][0] = 5
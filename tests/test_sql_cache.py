@@ -0,0 +1,34 @@
+from langchain_core.messages import HumanMessage
+
+from backend.cache.sql_cache import SqlCache
+from backend.graph.nodes.sql_cache_lookup import _lookup, remember_sql
+
+DB_CONFIG = {"host": "localhost", "port": "5432", "database": "shop"}
+QUESTION = "How many orders are there?"
+SQL = "SELECT count(*) FROM orders"
+
+
+def _state(username: str):
+    return {
+        "db_config": {**DB_CONFIG, "username": username},
+        "messages": [HumanMessage(QUESTION)],
+        "question": QUESTION,
+        "schema_fingerprint": "f1",
+        "sql": SQL,
+    }
+
+
+def test_cached_sql_is_not_shared_across_roles():
+    remember_sql(_state("analyst"))
+
+    assert _lookup(_state("analyst"), "f1")["sql"] == SQL
+    assert not _lookup(_state("support"), "f1")["sql_cache_hit"]
+
+
+def test_persisted_sql_is_keyed_by_role(tmp_path):
+    path = str(tmp_path / "sql_cache.sqlite")
+    SqlCache(10, 60, path).set("analyst@shop", "f1", QUESTION, SQL)
+
+    reopened = SqlCache(10, 60, path)
+    assert reopened.get("analyst@shop", "f1", QUESTION) == SQL
+    assert reopened.get("support@shop", "f1", QUESTION) is None
@@ -0,0 +1,46 @@
+import datetime
+from decimal import Decimal
+
+import pandas as pd
+
+from backend.graph.chains.visualizer import plan_visualization
+
+DAYS = [datetime.date(2024, 1, day) for day in (1, 2, 3)]
+
+
+def test_time_series_is_a_line_chart():
+    config = plan_visualization(pd.DataFrame({"day": DAYS, "sales": [5.0, 3.0, 4.5]}))
+    assert config.chart_type == "Line Chart"
+    assert config.x_axis == "day"
+    assert config.y_axis == "sales"
+
+
+def test_time_series_per_category_is_left_to_the_llm():
+    df = pd.DataFrame(
+        {"day": DAYS, "region": ["north", "south", "north"], "sales": [5, 3, 4]}
+    )
+    assert plan_visualization(df) is None
+
+
+def test_integer_year_is_not_a_measure():
+    df = pd.DataFrame({"year": [2022, 2023, 2024], "sales": [5.0, 3.0, 4.5]})
+    config = plan_visualization(df)
+    assert config.chart_type == "Line Chart"
+    assert config.x_axis == "year"
+    assert config.y_axis == "sales"
+
+
+def test_integer_month_is_not_a_measure():
+    df = pd.DataFrame({"order_month": [1, 2, 3], "orders": [7, 9, 4]})
+    config = plan_visualization(df)
+    assert config.x_axis == "order_month"
+    assert config.y_axis == "orders"
+
+
+def test_numeric_decimal_column_is_a_measure():
+    df = pd.DataFrame(
+        {"region": ["north", "south"], "revenue": [Decimal("1.50"), Decimal("2.25")]}
+    )
+    config = plan_visualization(df)
+    assert config.x_axis == "region"
+    assert config.y_axis == "revenue"